@@ -0,0 +1,55 @@
+import argparse
+import json
+import sys
+
+## regression gate: compares a results file of bench/loadgen (-out) or bench/overhead.py (--out) with a baseline
+## of the same scenario, exits 1 if a metric got worse by more than the tolerance.
+## metrics that are missing on either side are listed but don't fail the gate, neither do ms metrics that changed less
+## than --min-ms (a test with 1ms of overhead shouldn't fail the gate for taking 2ms)
+##
+##   python3 bench/compare.py bench/baseline/dispatch.json /tmp/bench/dispatch.json --tolerance 0.2
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("scenario", path), {m["name"]: m for m in data.get("metrics", [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compare bench results with a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("results")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed change for the worse, 0.2 is 20%%")
+    parser.add_argument("--min-ms", type=float, default=5, help="ms metrics have to get worse by at least this much too")
+    args = parser.parse_args()
+
+    scenario, baseline = load(args.baseline)
+    _, results = load(args.results)
+
+    regressions = 0
+    print(f"{scenario}:")
+    for name, metric in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f" - {name}: {metric['value']:.4g} {metric['unit']} (not in the baseline)")
+            continue
+        before, after = base["value"], metric["value"]
+        change = (after - before) / before if before else 0.0
+        worse = -change if metric["higher_is_better"] else change
+        status = "ok"
+        if worse > args.tolerance and (metric["unit"] != "ms" or abs(after - before) >= args.min_ms):
+            status = "REGRESSION"
+            regressions += 1
+        print(f" - {name}: {before:.4g} -> {after:.4g} {metric['unit']} ({change:+.0%}) {status}")
+    for name in baseline.keys() - results.keys():
+        print(f" - {name}: missing from the results")
+
+    if regressions:
+        print(f"Error: {regressions} metric(s) of {scenario} got more than {args.tolerance:.0%} worse")
+        sys.exit(1)
+    print(f"Success: {scenario} is within {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+package main
+
+import (
+	"context"
+	"encoding/json"
+	"flag"
+	"fmt"
+	"hash/fnv"
+	"log"
+	"os"
+	"path/filepath"
+	"slices"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+
+	"google.golang.org/grpc"
+	"google.golang.org/grpc/credentials/insecure"
+)
+
+// load generator for the controller's dispatch path: N simulated workers do the handshake, heartbeat
+// and pull/report tasks without running anything, until the controller says the queue is drained.
+// prints dispatch throughput and ReceiveTask/ReportResult latencies as the workers see them.
+// slots use SubscribeTasks streams like the real worker, -poll makes them poll ReceiveTask instead
+// (for the stream the latency is from sending the previous report to getting the next task).
+//
+//	go run ./bench/loadgen -make-tests /tmp/bench-tests -tasks 20000
+//	TEST_DIR=/tmp/bench-tests HISTORY_FILE=/tmp/bench-history.json REPORT_DIR=/tmp/bench-reports go run ./controller
+//	go run ./bench/loadgen -workers 1000
+//
+// controller's own view (lock wait/hold, ReceiveTask handling time) is on its /metrics meanwhile
+
+func main() {
+	controller := flag.String("controller", "localhost:50051", "controller address")
+	workers := flag.Int("workers", 1000, "simulated workers")
+	slots := flag.Int("slots", 1, "slots per simulated worker")
+	conns := flag.Int("conns", 16, "grpc connections shared by the workers (a real worker has its own)")
+	taskTime := flag.Duration("task-time", 0, "how long a simulated task takes")
+	taskTimeMax := flag.Duration("task-time-max", 0, "if set, tasks take between -task-time and this (fixed per task id, like real tests)")
+	makeTests := flag.String("make-tests", "", "write -tasks empty test files to this folder for TEST_DIR and exit")
+	tasks := flag.Int("tasks", 20000, "test files written by -make-tests")
+	poll := flag.Bool("poll", false, "poll ReceiveTask instead of keeping a SubscribeTasks stream per slot")
+	scenario := flag.String("scenario", "loadgen", "name of the run in the -out file")
+	out := flag.String("out", "", "write the numbers to this json file (bench/compare.py checks them against a baseline)")
+	flag.Parse()
+
+	if *makeTests != "" {
+		if err := writeTests(*makeTests, *tasks); err != nil {
+			log.Fatalf("failed to write test files: %v", err)
+		}
+		fmt.Printf("wrote %d test files to %s\n", *tasks, *makeTests)
+		return
+	}
+
+	clients := make([]pb.TestExecutorClient, *conns)
+	for i := range clients {
+		conn, err := grpc.NewClient(*controller, grpc.WithTransportCredentials(insecure.NewCredentials()))
+		if err != nil {
+			log.Fatalf("failed to connect to controller: %v", err)
+		}
+		defer conn.Close()
+		clients[i] = pb.NewTestExecutorClient(conn)
+	}
+
+	var stats stats
+	start := time.Now()
+	var wg sync.WaitGroup
+	for i := 0; i < *workers; i++ {
+		wg.Add(1)
+		go func(i int) {
+			defer wg.Done()
+			w := &simWorker{id: fmt.Sprintf("sim-%05d", i), client: clients[i%len(clients)], taskTime: *taskTime, taskTimeMax: *taskTimeMax, poll: *poll, stats: &stats}
+			if err := w.run(*slots); err != nil {
+				log.Printf("worker %s: %v", w.id, err)
+			}
+		}(i)
+	}
+	wg.Wait()
+	elapsed := time.Since(start)
+
+	fmt.Printf("%d workers x %d slots, %d tasks in %s: %.0f tasks/s\n",
+		*workers, *slots, stats.dispatched.Load(), elapsed.Round(time.Millisecond), float64(stats.dispatched.Load())/elapsed.Seconds())
+	if *poll {
+		fmt.Printf("ReceiveTask: %d calls (%d came back empty), %s\n", len(stats.receive), stats.empty.Load(), stats.percentiles(stats.receive))
+	} else {
+		fmt.Printf("SubscribeTasks: %d tasks received, %s\n", len(stats.receive), stats.percentiles(stats.receive))
+	}
+	fmt.Printf("ReportResult: %d calls, %s\n", len(stats.report), stats.percentiles(stats.report))
+
+	// makespan against a perfect packing of the task times onto every slot, handshakes included
+	ideal := time.Duration(stats.busy.Load()) / time.Duration(*workers**slots)
+	efficiency := 0.0
+	if elapsed > 0 {
+		efficiency = ideal.Seconds() / elapsed.Seconds()
+	}
+	fmt.Printf("makespan %s, ideal %s, %.0f%% efficient\n", elapsed.Round(time.Millisecond), ideal.Round(time.Millisecond), efficiency*100)
+
+	if *out != "" {
+		receive, report := stats.quantile(stats.receive, 0.99), stats.quantile(stats.report, 0.99)
+		err := writeResults(*out, *scenario, []metric{
+			{"dispatch_throughput", float64(stats.dispatched.Load()) / elapsed.Seconds(), "tasks/s", true},
+			{"receive_p99", receive.Seconds() * 1000, "ms", false},
+			{"report_p99", report.Seconds() * 1000, "ms", false},
+			{"makespan", elapsed.Seconds(), "s", false},
+			{"makespan_efficiency", efficiency, "ratio", true},
+		})
+		if err != nil {
+			log.Fatalf("failed to write results: %v", err)
+		}
+	}
+}
+
+// same format as bench/overhead.py writes, bench/compare.py reads both
+type metric struct {
+	Name           string  `json:"name"`
+	Value          float64 `json:"value"`
+	Unit           string  `json:"unit"`
+	HigherIsBetter bool    `json:"higher_is_better"`
+}
+
+func writeResults(path, scenario string, metrics []metric) error {
+	data, err := json.MarshalIndent(map[string]any{"scenario": scenario, "metrics": metrics}, "", "  ")
+	if err != nil {
+		return err
+	}
+	return os.WriteFile(path, append(data, '\n'), 0644)
+}
+
+type stats struct {
+	dispatched atomic.Int64
+	empty      atomic.Int64
+	busy       atomic.Int64 // simulated task time of every slot, in ns
+	mu         sync.Mutex
+	receive    []time.Duration
+	report     []time.Duration
+}
+
+func (s *stats) add(into *[]time.Duration, d time.Duration) {
+	s.mu.Lock()
+	*into = append(*into, d)
+	s.mu.Unlock()
+}
+
+func (s *stats) percentiles(d []time.Duration) string {
+	if len(d) == 0 {
+		return "no calls"
+	}
+	return fmt.Sprintf("p50 %s, p90 %s, p99 %s, max %s", s.quantile(d, 0.5), s.quantile(d, 0.9), s.quantile(d, 0.99), s.quantile(d, 1))
+}
+
+func (s *stats) quantile(d []time.Duration, p float64) time.Duration {
+	if len(d) == 0 {
+		return 0
+	}
+	sorted := slices.Clone(d)
+	slices.Sort(sorted)
+	return sorted[int(p*float64(len(sorted)-1))]
+}
+
+type simWorker struct {
+	id          string
+	client      pb.TestExecutorClient
+	taskTime    time.Duration
+	taskTimeMax time.Duration
+	poll        bool
+	stats       *stats
+}
+
+func (w *simWorker) run(slots int) error {
+	ctx, cancel := context.WithTimeout(context.Background(), 30*time.Second)
+	resp, err := w.client.StartHandshake(ctx, &pb.HandshakeRequest{Message: w.id, Slots: int32(slots)})
+	cancel()
+	if err != nil {
+		return fmt.Errorf("handshake failed: %v", err)
+	}
+
+	stop := make(chan struct{})
+	defer close(stop)
+	go w.heartbeat(time.Duration(resp.GetHeartbeatIntervalMs())*time.Millisecond, stop)
+
+	var wg sync.WaitGroup
+	errs := make(chan error, slots)
+	for i := 0; i < slots; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			errs <- w.slot()
+		}()
+	}
+	wg.Wait()
+	close(errs)
+	return <-errs
+}
+
+func (w *simWorker) heartbeat(interval time.Duration, stop <-chan struct{}) {
+	if interval <= 0 {
+		return
+	}
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-stop:
+			return
+		case <-ticker.C:
+			ctx, cancel := context.WithTimeout(context.Background(), interval)
+			w.client.Heartbeat(ctx, &pb.HeartbeatRequest{WorkerId: w.id})
+			cancel()
+		}
+	}
+}
+
+func (w *simWorker) slot() error {
+	if !w.poll {
+		return w.subscribe()
+	}
+	for {
+		ctx, cancel := context.WithTimeout(context.Background(), time.Minute)
+		start := time.Now()
+		task, err := w.client.ReceiveTask(ctx, &pb.TaskRequest{WorkerId: w.id})
+		w.stats.add(&w.stats.receive, time.Since(start))
+		cancel()
+		if err != nil {
+			return fmt.Errorf("failed to receive task: %v", err)
+		}
+		if task.GetDrained() {
+			return nil
+		}
+		if task.GetTaskId() == "" {
+			w.stats.empty.Add(1)
+			time.Sleep(time.Duration(task.GetRetryAfterMs()) * time.Millisecond)
+			continue
+		}
+		if err := w.runTask(task); err != nil {
+			return err
+		}
+	}
+}
+
+func (w *simWorker) subscribe() error {
+	ctx, cancel := context.WithCancel(context.Background())
+	defer cancel()
+	stream, err := w.client.SubscribeTasks(ctx, &pb.TaskRequest{WorkerId: w.id})
+	if err != nil {
+		return fmt.Errorf("failed to subscribe to tasks: %v", err)
+	}
+	for {
+		start := time.Now()
+		task, err := stream.Recv()
+		if err != nil {
+			return fmt.Errorf("failed to receive task: %v", err)
+		}
+		if task.GetDrained() {
+			return nil
+		}
+		w.stats.add(&w.stats.receive, time.Since(start))
+		if err := w.runTask(task); err != nil {
+			return err
+		}
+	}
+}
+
+// between taskTime and taskTimeMax, the same every time for a task so the controller's history can schedule by it
+func (w *simWorker) duration(taskID string) time.Duration {
+	if w.taskTimeMax <= w.taskTime {
+		return w.taskTime
+	}
+	h := fnv.New64a()
+	h.Write([]byte(taskID))
+	return w.taskTime + time.Duration(h.Sum64()%uint64(w.taskTimeMax-w.taskTime))
+}
+
+func (w *simWorker) runTask(task *pb.TaskResponse) error {
+	w.stats.dispatched.Add(1)
+	taskTime := w.duration(task.GetTaskId())
+	time.Sleep(taskTime)
+	w.stats.busy.Add(int64(taskTime))
+
+	ctx, cancel := context.WithTimeout(context.Background(), time.Minute)
+	start := time.Now()
+	_, err := w.client.ReportResult(ctx, &pb.TaskResult{
+		WorkerId: w.id, Filename: task.GetFilename(), TaskId: task.GetTaskId(), LeaseId: task.GetLeaseId(),
+		Passed: true, DurationMs: taskTime.Milliseconds(),
+	})
+	w.stats.add(&w.stats.report, time.Since(start))
+	cancel()
+	if err != nil {
+		return fmt.Errorf("failed to report result: %v", err)
+	}
+	return nil
+}
+
+// files without @test_case are one task each, they're never run
+func writeTests(dir string, n int) error {
+	if err := os.MkdirAll(dir, 0755); err != nil {
+		return err
+	}
+	for i := 0; i < n; i++ {
+		path := filepath.Join(dir, fmt.Sprintf("test_bench_%05d.py", i))
+		if err := os.WriteFile(path, []byte("# generated by bench/loadgen, the simulated workers never run it\n"), 0644); err != nil {
+			return err
+		}
+	}
+	return nil
+}
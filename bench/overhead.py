@@ -0,0 +1,103 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+## per-test overhead scenario: runs the test files in-process with the resident runner's run_file, the driver
+## pool hands out fake sessions driving bench/site/insider.yaml (insider_py_wrapper/fake_driver.py), so no
+## network and no chrome. per test it reports the wall time, the time spent waiting on the "site" and in
+## webdriver commands (tracing.py) and what's left of it, our own overhead (GenericPage, tracing, the test code),
+## plus how many webdriver round trips the test took
+##
+##   python3 bench/overhead.py --runs 5 --out /tmp/bench/overhead.json
+##
+## needs the wrapper's requirements (selenium, colorama, PyYAML), run it with the wrapper's venv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-test overhead of the python wrapper against a fake site")
+    parser.add_argument("--tests", default=os.path.join(ROOT, "controller", "tests"), help="folder with the test_*.py files")
+    parser.add_argument("--site", default=os.path.join(ROOT, "bench", "site", "insider.yaml"), help="site file for the fake driver")
+    parser.add_argument("--runs", type=int, default=3, help="times every file is run, medians are reported")
+    parser.add_argument("--out", help="write the numbers to this json file (bench/compare.py checks them against a baseline)")
+    parser.add_argument("--verbose", action="store_true", help="show the tests' own output")
+    args = parser.parse_args()
+
+    os.environ["INSIDER_FAKE_SITE"] = os.path.abspath(args.site)
+    sys.path.insert(0, os.path.join(ROOT, "worker"))
+    from insider_py_wrapper import helpers, runner, tracing
+    from insider_py_wrapper.driver_pool import get_pool
+    from insider_py_wrapper.fake_driver import FakeDriver
+
+    # per test description: lists of duration/wait/action/overhead ms and webdriver commands, one entry per run
+    samples = {}
+    failures = []
+    started = {}
+
+    def on_start(description):
+        started["commands"] = FakeDriver.total_commands
+
+    def on_result(result):
+        if result["status"] != "passed":
+            failures.append(f"{result['name']}: {result['status']} {result['failure_message']}")
+        test = samples.setdefault(result["name"], {"duration": [], "wait": [], "action": [], "overhead": [], "commands": []})
+        test["duration"].append(result["duration_ms"])
+        test["wait"].append(result["wait_ms"])
+        test["action"].append(result["action_ms"])
+        test["overhead"].append(result["duration_ms"] - result["wait_ms"] - result["action_ms"])
+        test["commands"].append(FakeDriver.total_commands - started.get("commands", 0))
+
+    files = sorted(glob.glob(os.path.join(args.tests, "test_*.py")))
+    if not files:
+        print(f"Error: no test files in {args.tests}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        for path in files:
+            helpers.start_sink, helpers.result_sink = on_start, on_result
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+            with output:
+                error = runner.run_file(path)
+            if error:
+                failures.append(f"{os.path.basename(path)}: {error}")
+            helpers.registered_tests.clear()
+            helpers.results.clear()
+            get_pool().reclaim()
+            tracing.reset()
+    elapsed = time.perf_counter() - start
+    get_pool().shutdown()
+
+    print(f"{len(files)} files x {args.runs} runs in {elapsed:.1f}s against {os.path.basename(args.site)}, medians per test:")
+    metrics = []
+    for name, test in samples.items():
+        median = {key: statistics.median(values) for key, values in test.items()}
+        print(f" - {name}: {median['duration']:.0f}ms, {median['wait']:.0f}ms waiting, {median['action']:.0f}ms in webdriver, "
+              f"{median['overhead']:.0f}ms overhead, {median['commands']:.0f} webdriver commands")
+        metrics += [
+            {"name": f"{name} duration", "value": median["duration"], "unit": "ms", "higher_is_better": False},
+            {"name": f"{name} overhead", "value": median["overhead"], "unit": "ms", "higher_is_better": False},
+            {"name": f"{name} webdriver commands", "value": median["commands"], "unit": "commands", "higher_is_better": False},
+        ]
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"scenario": "overhead", "metrics": metrics}, f, indent=2)
+            f.write("\n")
+
+    # the numbers of a test that failed against the fake site don't mean much, the site file is out of sync
+    if failures:
+        print("Error: tests didn't pass against the fake site:")
+        for failure in failures:
+            print(f" - {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
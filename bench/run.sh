@@ -0,0 +1,85 @@
+#!/bin/bash
+# offline benchmark suite, runs without network access or a cluster:
+#  - dispatch: 1000 simulated workers against the real controller over localhost grpc, empty tasks (dispatch throughput, latencies)
+#  - makespan: 100 workers x 2 slots, tasks of 50-500ms (end-to-end makespan against a perfect packing)
+#  - overhead: the tests under controller/tests in-process with a fake webdriver (per-test python/webdriver overhead)
+# results go to BENCH_OUT, every scenario is compared with bench/baseline/<scenario>.json and the script fails if a
+# metric got more than BENCH_TOLERANCE worse, or if a scenario has no baseline (a gate without one would always pass,
+# BENCH_SKIP_MISSING_BASELINE=1 lets it through on purpose). --update-baseline (or UPDATE_BASELINE=1) records the
+# results as the baseline instead of comparing, the controller numbers depend on the machine so record them where the gate runs
+#
+#   bench/run.sh
+#   PYTHON=worker/insider_py_wrapper/env/bin/python3 bench/run.sh --update-baseline
+
+cd "$(dirname "$0")/.."
+OUT=${BENCH_OUT:-/tmp/insider-bench}
+PYTHON=${PYTHON:-python3}
+TOLERANCE=${BENCH_TOLERANCE:-0.2}
+BASELINE=bench/baseline
+if [ "$1" = "--update-baseline" ]; then
+  UPDATE_BASELINE=1
+elif [ -n "$1" ]; then
+  echo "usage: bench/run.sh [--update-baseline]"
+  exit 2
+fi
+
+rm -rf $OUT && mkdir -p $OUT
+go build -o $OUT/controller ./controller && go build -o $OUT/loadgen ./bench/loadgen
+if [ $? -ne 0 ]; then
+  echo "failed to build the controller/loadgen"
+  exit 1
+fi
+
+# scenario name, number of tasks, loadgen flags. fresh tests/history/reports for every run so runs compare
+controller_scenario() {
+  name=$1
+  tasks=$2
+  shift 2
+  dir=$OUT/$name
+  $OUT/loadgen -make-tests $dir/tests -tasks $tasks > /dev/null
+
+  TEST_DIR=$dir/tests HISTORY_FILE=$dir/history.json REPORT_DIR=$dir/reports LOG_DIR=$dir/logs \
+    $OUT/controller > $dir/controller.log 2>&1 &
+  controller=$!
+  for i in $(seq 1 60); do
+    grep -q "controller waiting for workers" $dir/controller.log && break
+    sleep 0.5
+  done
+
+  echo "== $name"
+  $OUT/loadgen -scenario $name -out $OUT/$name.json "$@"
+  status=$?
+  kill $controller
+  wait $controller 2> /dev/null
+  if [ $status -ne 0 ]; then
+    echo "$name failed, controller log: $dir/controller.log"
+    exit 1
+  fi
+}
+
+controller_scenario dispatch 20000 -workers 1000
+controller_scenario makespan 4000 -workers 100 -slots 2 -task-time 50ms -task-time-max 500ms
+
+echo "== overhead"
+$PYTHON bench/overhead.py --runs 3 --out $OUT/overhead.json
+if [ $? -ne 0 ]; then
+  echo "overhead failed"
+  exit 1
+fi
+
+failed=0
+for results in $OUT/*.json; do
+  baseline=$BASELINE/$(basename $results)
+  if [ "$UPDATE_BASELINE" = "1" ]; then
+    mkdir -p $BASELINE && cp $results $baseline
+    echo "baseline updated: $baseline"
+  elif [ -f $baseline ]; then
+    $PYTHON bench/compare.py $baseline $results --tolerance $TOLERANCE || failed=1
+  elif [ "$BENCH_SKIP_MISSING_BASELINE" = "1" ]; then
+    echo "no baseline for $(basename $results .json), skipped (BENCH_SKIP_MISSING_BASELINE=1)"
+  else
+    echo "Error: no baseline for $(basename $results .json) at $baseline, bench/run.sh --update-baseline records one on the gate machine"
+    failed=1
+  fi
+done
+exit $failed
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+## GenericPage.verify_urls_in_tabs against the fake driver when webdriver commands fail halfway: every url still
+## gets an outcome and the tabs it opened are closed
+##
+##   python3 bench/test_verify_urls.py
+##
+## needs the wrapper's requirements (selenium, colorama, PyYAML), run it with the wrapper's venv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "worker"))
+
+from insider_py_wrapper.fake_driver import FakeDriver, FakeSite
+from insider_py_wrapper.generic_page import GenericPage
+
+URLS = ["https://jobs.lever.co/insiderone/1", "https://jobs.lever.co/insiderone/2", "https://jobs.lever.co/insiderone/3"]
+
+
+class VerifyUrlsInTabsTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = FakeDriver(FakeSite("test", {"pages": {}}))
+        self.page = GenericPage(self.driver, "https://insiderone.com/careers/open-positions/")
+        self.original = self.driver.current_window_handle
+
+    def verify(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.page.verify_urls_in_tabs(URLS, "lever.co", 1, "View Role", max_tabs=2)
+
+    def test_open_tab_raises(self):
+        open_tab = self.page._open_tab
+        calls = []
+
+        def failing_open_tab(url):
+            calls.append(url)
+            if len(calls) == 2:
+                raise RuntimeError("tab crashed")
+            return open_tab(url)
+
+        self.page._open_tab = failing_open_tab
+        outcomes = self.verify()
+
+        self.assertEqual([outcome["url"] for outcome in outcomes], URLS)
+        self.assertFalse(any(outcome["passed"] for outcome in outcomes))
+        self.assertEqual(self.driver.window_handles, [self.original])
+        self.assertEqual(self.driver.current_window_handle, self.original)
+
+    def test_close_raises_after_check(self):
+        close = self.driver.close
+        calls = []
+
+        def failing_close():
+            calls.append(self.driver._current)
+            if len(calls) == 1:
+                raise RuntimeError("close failed")
+            close()
+
+        self.driver.close = failing_close
+        outcomes = self.verify()
+
+        # the first tab was checked before its close failed, that outcome is kept
+        self.assertTrue(outcomes[0]["passed"])
+        self.assertEqual(outcomes[0]["final_url"], URLS[0])
+        self.assertEqual([outcome["url"] for outcome in outcomes], URLS)
+        self.assertEqual(self.driver.current_window_handle, self.original)
+
+
+if __name__ == "__main__":
+    unittest.main()
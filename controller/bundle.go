@@ -0,0 +1,189 @@
+package main
+
+import (
+	"context"
+	"crypto/sha256"
+	"encoding/binary"
+	"encoding/hex"
+	"fmt"
+	"os"
+	"path/filepath"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// test bundles: every test file together with the support files under the tests folder (locators etc.),
+// loaded and hashed once instead of reading the file on every dispatch. tasks only carry the hash,
+// workers keep bundles by hash and download one with FetchBundle only when they don't have it yet.
+// a poller reloads the bundles when something under the tests folder changes (no fsnotify in go.mod,
+// stat-ing a handful of files every few seconds is cheap enough)
+
+type bundle struct {
+	hash  string
+	files []*pb.BundleFile // test file first, then the support files sorted by path
+}
+
+type bundleCache struct {
+	testDir   string
+	mu        sync.RWMutex       // separate from server.mu, the watcher swaps the maps while tasks are handed out
+	byTest    map[string]*bundle // test file path -> its bundle
+	byHash    map[string]*bundle
+	previous  map[string]*bundle // byHash before the last reload, for tasks handed out just before it
+	signature string             // names, sizes and mtimes of everything under testDir when it was loaded
+}
+
+func newBundleCache(testDir string) (*bundleCache, error) {
+	c := &bundleCache{testDir: testDir}
+	if err := c.reload(); err != nil {
+		return nil, err
+	}
+	return c, nil
+}
+
+// bundle of a test file, nil if the file is gone
+func (c *bundleCache) forTest(testFile string) *bundle {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	return c.byTest[testFile]
+}
+
+func (c *bundleCache) byContentHash(hash string) *bundle {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	if b, ok := c.byHash[hash]; ok {
+		return b
+	}
+	return c.previous[hash]
+}
+
+// reads and hashes everything under testDir and swaps the maps in one go
+func (c *bundleCache) reload() error {
+	signature, err := dirSignature(c.testDir)
+	if err != nil {
+		return err
+	}
+
+	var tests []string
+	var support []*pb.BundleFile
+	err = walkTestDir(c.testDir, func(path, rel string) error {
+		// top level .py files are the tests themselves
+		if filepath.Dir(rel) == "." && strings.HasSuffix(rel, ".py") {
+			tests = append(tests, path)
+			return nil
+		}
+		content, err := os.ReadFile(path)
+		if err != nil {
+			return err
+		}
+		support = append(support, &pb.BundleFile{Path: filepath.ToSlash(rel), Content: content})
+		return nil
+	})
+	if err != nil {
+		return fmt.Errorf("failed to load test bundles: %v", err)
+	}
+	sort.Slice(support, func(i, j int) bool { return support[i].Path < support[j].Path })
+
+	byTest := make(map[string]*bundle)
+	byHash := make(map[string]*bundle)
+	for _, test := range tests {
+		content, err := os.ReadFile(test)
+		if err != nil {
+			return fmt.Errorf("failed to read test file: %v", err)
+		}
+		files := append([]*pb.BundleFile{{Path: filepath.Base(test), Content: content}}, support...)
+		b := &bundle{hash: bundleHash(files), files: files}
+		byTest[test] = b
+		byHash[b.hash] = b
+	}
+
+	c.mu.Lock()
+	c.previous = c.byHash
+	c.byTest, c.byHash, c.signature = byTest, byHash, signature
+	c.mu.Unlock()
+	return nil
+}
+
+// polls the tests folder and reloads the bundles if anything changed
+func (c *bundleCache) watch(interval time.Duration) {
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for range ticker.C {
+		signature, err := dirSignature(c.testDir)
+		if err != nil {
+			fmt.Printf("failed to check tests folder for changes: %v\n", err)
+			continue
+		}
+		c.mu.RLock()
+		changed := signature != c.signature
+		c.mu.RUnlock()
+		if !changed {
+			continue
+		}
+		if err := c.reload(); err != nil {
+			fmt.Printf("tests folder changed but reloading failed, keeping the old bundles: %v\n", err)
+			continue
+		}
+		fmt.Printf("tests folder changed, test bundles reloaded\n")
+	}
+}
+
+// sha256 over path, size and content of every file, the worker checks downloads with the same function
+func bundleHash(files []*pb.BundleFile) string {
+	h := sha256.New()
+	var size [8]byte
+	for _, f := range files {
+		h.Write([]byte(f.GetPath()))
+		h.Write([]byte{0})
+		binary.BigEndian.PutUint64(size[:], uint64(len(f.GetContent())))
+		h.Write(size[:])
+		h.Write(f.GetContent())
+	}
+	return hex.EncodeToString(h.Sum(nil))
+}
+
+// cheap change detection, stat only
+func dirSignature(testDir string) (string, error) {
+	var sb strings.Builder
+	err := walkTestDir(testDir, func(path, rel string) error {
+		info, err := os.Stat(path)
+		if err != nil {
+			return err
+		}
+		fmt.Fprintf(&sb, "%s:%d:%d\n", rel, info.Size(), info.ModTime().UnixNano())
+		return nil
+	})
+	return sb.String(), err
+}
+
+// every file under the tests folder except python caches
+func walkTestDir(testDir string, fn func(path, rel string) error) error {
+	return filepath.WalkDir(testDir, func(path string, d os.DirEntry, err error) error {
+		if err != nil {
+			return err
+		}
+		if d.IsDir() {
+			if d.Name() == "__pycache__" {
+				return filepath.SkipDir
+			}
+			return nil
+		}
+		rel, err := filepath.Rel(testDir, path)
+		if err != nil {
+			return err
+		}
+		return fn(path, rel)
+	})
+}
+
+// worker didn't have the bundle of its task in its cache
+func (s *server) FetchBundle(ctx context.Context, req *pb.BundleRequest) (*pb.Bundle, error) {
+	b := s.bundles.byContentHash(req.GetHash())
+	if b == nil {
+		return nil, fmt.Errorf("unknown bundle %s, tests folder may have changed, ask for a new task", req.GetHash())
+	}
+	return &pb.Bundle{Hash: b.hash, Files: b.files}, nil
+}
@@ -3,48 +3,95 @@ package main
 import (
 	"context"
 	"fmt"
+	"io"
 	"log"
 	"net"
 	"os"
 	"path/filepath"
+	"strconv"
 	"strings"
 	"sync"
+	"time"
 
 	pb "insider-test-executor/testexecutor-grpc"
 
 	"google.golang.org/grpc"
+	"google.golang.org/grpc/codes"
+	"google.golang.org/grpc/status"
+)
+
+const (
+	defaultLeaseTimeout = 15 * time.Minute // filter qa jobs test alone can take a few minutes
+	retryAfter          = 5 * time.Second  // how long idle workers wait before asking again
+	defaultWorkerTTL    = 30 * time.Second // workers without a heartbeat for this long are removed
 )
 
 // worker struct for distributing/scheduling the tests
 type WorkerInfo struct {
-	ID      string
-	Address string
+	ID          string
+	Address     string
+	CPUMillis   int64 // what the worker advertised at handshake
+	MemoryBytes int64
+	Slots       int       // tests the worker runs at the same time, it's never given more than this
+	LastSeen    time.Time // last heartbeat (or any other call), the worker is removed after workerTTL without one
+
+	WrapperVersion string // hash of the worker's insider_py_wrapper, empty for older workers
 }
 
-// gRPC server struct
+// gRPC server struct. two locks, never held at the same time: workersMu for the worker registry
+// (handshakes don't wait for dispatch, heartbeats only for renewing their leases) and mu for the queue. nothing does I/O under either,
+// log lines are collected while locked and printed after
 type server struct {
 	pb.UnimplementedTestExecutorServer
-	mu         sync.Mutex            // mutex for the race condition (not sure if it'll happen for our case)
+	workersMu  sync.Mutex            // guards workers and workerList
 	workers    map[string]WorkerInfo // worker uuid map for lookups
 	workerList []string              // slice because map didn't keep the worker join order
-	nextWorker int                   // keeps track of the next worker to receive a task (basic RR scheduling, can be improved)
-	testCases  []string              // test cases under controler/tests
+	mu         timedMutex            // guards queue and history, wait/hold times go to the metrics
+	queue      *taskQueue            // pending/in-flight/done test cases under controler/tests
+	startedAt  time.Time             // when the controller loaded the tests, start of the run
+	bundles    *bundleCache          // test files + support files, hashed and kept in memory
+	reportDir  string                // report.json and junit.xml go here when the run is over
+	logDir     string                // test output streamed by the workers, one file per task
+	history    *historyStore         // past durations/outcomes per task, saved when the run is over
+	workerTTL  time.Duration         // how long a worker can go without a heartbeat before it's removed
+	metrics    *metrics              // served on METRICS_ADDR/metrics
+	changed    chan struct{}         // guarded by mu, closed when tasks go back to pending or the queue drains
+
+	incremental    bool          // INCREMENTAL=1, tests that passed with the same inputs aren't run again
+	incrementalTTL time.Duration // a pass older than this doesn't count, the test runs again
 }
 
 // wait handshake
 func (s *server) StartHandshake(ctx context.Context, req *pb.HandshakeRequest) (*pb.HandshakeResponse, error) {
-	s.mu.Lock()
-	defer s.mu.Unlock()
+	var out strings.Builder
+	defer func() { fmt.Print(out.String()) }() // runs after the unlock
+	s.workersMu.Lock()
+	defer s.workersMu.Unlock()
 
 	workerID := req.GetMessage()
 	workerInfo := WorkerInfo{
-		ID: workerID,
+		ID:          workerID,
+		CPUMillis:   req.GetCpuMillis(),
+		MemoryBytes: req.GetMemoryBytes(),
+		Slots:       max(int(req.GetSlots()), 1), // older workers don't send it, they run one test at a time
+		LastSeen:    time.Now(),
+
+		WrapperVersion: req.GetWrapperVersion(),
+	}
+	// a worker that was removed as dead (or a restarted controller) sees unknown_worker and comes back with the same id
+	if _, ok := s.workers[workerID]; ok {
+		fmt.Fprintf(&out, "worker-%s did the handshake again\n", workerID)
+	} else {
+		s.workerList = append(s.workerList, workerID) // add worker to list
+		fmt.Fprintf(&out, "a new worker joined to the queue! - worker-%s (%d slots, %dm cpu, %dMi memory)\n",
+			workerID, workerInfo.Slots, workerInfo.CPUMillis, workerInfo.MemoryBytes/(1024*1024))
 	}
 	s.workers[workerID] = workerInfo
-	s.workerList = append(s.workerList, workerID) // add worker to list
-	fmt.Printf("a new worker joined to the queue! - worker-%s\n", workerID)
 
-	return &pb.HandshakeResponse{Response: "handshake acknowledged"}, nil
+	return &pb.HandshakeResponse{
+		Response:            "handshake acknowledged",
+		HeartbeatIntervalMs: s.heartbeatInterval().Milliseconds(),
+	}, nil
 }
 
 func loadTestCases(testDir string) ([]string, error) {
@@ -63,47 +110,266 @@ func loadTestCases(testDir string) ([]string, error) {
 }
 
 // send and wait for a worker to receive a task (test py file)
-func (s *server) ReceiveTask(ctx context.Context, req *pb.Empty) (*pb.TaskResponse, error) {
+// workers keep calling this until the response says the queue is drained,
+// SubscribeTasks is the same without the polling
+func (s *server) ReceiveTask(ctx context.Context, req *pb.TaskRequest) (*pb.TaskResponse, error) {
+	if s.metrics != nil {
+		defer func(start time.Time) { s.metrics.receiveTask.observe(time.Since(start).Seconds()) }(time.Now())
+	}
+	// only workers that did the handshake (and are still alive) can ask for tasks,
+	// NotFound tells the worker to do the handshake again
+	now := time.Now()
+	worker, otherWorkers, ok := s.seen(req.GetWorkerId(), now)
+	if !ok {
+		return nil, status.Errorf(codes.NotFound, "unknown worker-%s, handshake first", req.GetWorkerId())
+	}
+
+	var out strings.Builder
+	defer func() { fmt.Print(out.String()) }() // runs after the unlock
 	s.mu.Lock()
 	defer s.mu.Unlock()
+	return s.assign(worker, otherWorkers, now, &out)
+}
+
+// hands the worker its next task. a response without a task id means there's nothing for it right now,
+// s.mu must be held
+func (s *server) assign(worker WorkerInfo, otherWorkers bool, now time.Time, out io.Writer) (*pb.TaskResponse, error) {
+	s.requeueExpired(now, out)
 
-	// check if any workers are available
-	if len(s.workers) == 0 {
-		return nil, fmt.Errorf("no workers available")
+	// every test case is done, the workers can shut down
+	if s.queue.drained() {
+		fmt.Fprintf(out, "no test cases left for worker-%s, queue drained\n", worker.ID)
+		return &pb.TaskResponse{Drained: true, Message: "queue drained"}, nil
 	}
 
-	// check if there are test cases available
-	if len(s.testCases) == 0 {
-		return nil, fmt.Errorf("no test cases available")
+	// scheduling is per slot, not per worker: a worker asking while all of its slots hold a lease
+	// lost a task somewhere (e.g. its report didn't go through), that one has to expire first
+	if busy := s.queue.inFlightOn(worker.ID); busy >= worker.Slots {
+		return &pb.TaskResponse{
+			Message:      fmt.Sprintf("all %d slots of the worker are busy", worker.Slots),
+			RetryAfterMs: retryAfter.Milliseconds(),
+		}, nil
 	}
 
-	// select the next worker for the next task
-	workerID := s.workerList[s.nextWorker%len(s.workerList)] // Round-robin selection even with one worker
-	worker := s.workers[workerID]
+	for {
+		// nothing pending but some tests are still running somewhere, their lease may run out
+		// so the worker shouldn't leave yet
+		t := s.queue.acquire(worker.ID, now, otherWorkers)
+		if t == nil {
+			msg := "waiting for in-flight tasks"
+			if len(s.queue.pending) > 0 {
+				msg = "pending tasks failed on this worker, waiting for another worker to retry them"
+			}
+			return &pb.TaskResponse{Message: msg, RetryAfterMs: retryAfter.Milliseconds()}, nil
+		}
+
+		b := s.bundles.forTest(t.File)
+		if b == nil {
+			// test file was deleted since the start, no point in handing it out again
+			err := fmt.Errorf("test file %s is gone", t.File)
+			if t, ok := s.queue.complete(t.ID, t.leaseID, false); ok {
+				t.result = &pb.TaskResult{TaskId: t.ID, Filename: filepath.Base(t.File), ExitCode: -1, Error: err.Error()}
+			}
+			s.notify()
+			return nil, err
+		}
+
+		// incremental run: unchanged tests are done right here and the worker gets the next one
+		t.fingerprint = taskFingerprint(t, b.hash, worker.WrapperVersion)
+		if last, ok := s.unchanged(t, worker, now); ok {
+			s.skipUnchanged(t, last, worker, out)
+			if s.queue.drained() {
+				write := s.finishRun(out)
+				go write() // s.mu is held here, the files are written without it
+				return &pb.TaskResponse{Drained: true, Message: "queue drained"}, nil
+			}
+			continue
+		}
+		return s.dispatch(t, b, worker, out), nil
+	}
+}
 
-	// choose the test case to send (wrap around the test cases if one worker)
-	testFile := s.testCases[s.nextWorker%len(s.testCases)]
-	fileContent, err := os.ReadFile(testFile)
+// the task goes out to the worker, s.mu must be held
+func (s *server) dispatch(t *task, b *bundle, worker WorkerInfo, out io.Writer) *pb.TaskResponse {
+	s.metrics.taskDispatched()
+	fmt.Fprintf(out, "sending task '%s' to worker-%s (lease %d, attempt %d, %d/%d slots busy)\n",
+		t.ID, worker.ID, t.leaseID, t.attempts, s.queue.inFlightOn(worker.ID), worker.Slots)
+
+	// only the bundle hash goes out, the worker fetches the files if it doesn't have them
+	return &pb.TaskResponse{
+		Filename:   filepath.Base(t.File),
+		Message:    "run the test script",
+		TaskId:     t.ID,
+		LeaseId:    t.leaseID,
+		Tests:      t.Tests,
+		BundleHash: b.hash,
+	}
+}
+
+// worker calls this after every task, this is the ack that takes the task out of the queue
+func (s *server) ReportResult(ctx context.Context, res *pb.TaskResult) (*pb.Empty, error) {
+	// trace goes to a file before taking the lock and isn't kept with the result
+	if len(res.GetTrace()) > 0 {
+		if path, err := writeTrace(s.reportDir, res); err != nil {
+			log.Printf("failed to save trace of '%s': %v", res.GetTaskId(), err)
+		} else {
+			fmt.Printf("trace of '%s' written to %s\n", res.GetTaskId(), path)
+		}
+		res.Trace = nil
+	}
+
+	s.seen(res.GetWorkerId(), time.Now())
+
+	var out strings.Builder
+	defer func() { fmt.Print(out.String()) }() // runs after the unlock
+	s.mu.Lock()
+
+	status := "passed"
+	if !res.GetPassed() {
+		status = fmt.Sprintf("failed (exit code %d) %s", res.GetExitCode(), res.GetError())
+	}
+
+	// failed attempts go back to pending while the task has attempts left, preferably to another worker
+	if !res.GetPassed() {
+		if t, retried := s.queue.retry(res.GetTaskId(), res.GetLeaseId(), res.GetWorkerId(), time.Now()); retried {
+			s.history.record(t.ID, res.GetDurationMs(), false, time.Now())
+			s.metrics.taskRetried(t.ID, time.Duration(res.GetDurationMs())*time.Millisecond)
+			s.notify()
+			fmt.Fprintf(&out, "worker-%s failed '%s' on attempt %d/%d in %dms: %s, retrying\n",
+				res.GetWorkerId(), t.ID, t.attempts, s.queue.maxAttempts, res.GetDurationMs(), status)
+			s.mu.Unlock()
+			return &pb.Empty{}, nil
+		}
+	}
+
+	t, accepted := s.queue.complete(res.GetTaskId(), res.GetLeaseId(), res.GetPassed())
+	if t == nil {
+		s.mu.Unlock()
+		return nil, fmt.Errorf("unknown task '%s'", res.GetTaskId())
+	}
+	if !accepted {
+		s.mu.Unlock()
+		fmt.Fprintf(&out, "worker-%s reported '%s' again (lease %d), already done, ignoring\n", res.GetWorkerId(), res.GetTaskId(), res.GetLeaseId())
+		return &pb.Empty{}, nil
+	}
+	t.result = res
+	s.history.record(t.ID, res.GetDurationMs(), res.GetPassed(), time.Now())
+	if t.fingerprint != "" {
+		last := lastResult{Fingerprint: t.fingerprint, Passed: res.GetPassed() && t.failures == 0, At: time.Now()}
+		for _, c := range res.GetCases() {
+			last.Cases = append(last.Cases, c.GetName())
+		}
+		s.history.recordResult(t.ID, last)
+	}
+	s.metrics.taskCompleted(t.ID, res.GetPassed(), time.Duration(res.GetDurationMs())*time.Millisecond)
+	switch {
+	case t.quarantined && !res.GetPassed():
+		status += " (quarantined, not failing the run)"
+	case res.GetPassed() && t.failures > 0:
+		status += fmt.Sprintf(" (flaky, passed after %d failed attempts)", t.failures)
+	}
+	fmt.Fprintf(&out, "worker-%s finished '%s' in %dms: %s\n", res.GetWorkerId(), res.GetFilename(), res.GetDurationMs(), status)
+	for _, c := range res.GetCases() {
+		fmt.Fprintf(&out, " - %s: %s (%dms, %dms waiting, %dms in webdriver) %s\n", c.GetName(), c.GetStatus(), c.GetDurationMs(), c.GetWaitMs(), c.GetActionMs(), c.GetFailureMessage())
+	}
+
+	// last test is in, write the report and the history outside of the lock
+	var write func()
+	if s.queue.drained() {
+		write = s.finishRun(&out)
+	}
+	s.mu.Unlock()
+	fmt.Print(out.String())
+	out.Reset()
+	if write != nil {
+		write()
+	}
+
+	return &pb.Empty{}, nil
+}
+
+// the queue just drained: summary, report and history are put together under s.mu (must be held),
+// the returned func writes them and has to be called after it's released
+func (s *server) finishRun(out io.Writer) func() {
+	s.notify() // idle task streams send drained
+	s.printSummary(out)
+	report := s.buildReport(time.Now())
+	history, err := s.history.encode()
 	if err != nil {
-		return nil, fmt.Errorf("failed to read test file: %v", err)
+		log.Printf("failed to encode test history: %v", err)
 	}
 
-	fmt.Printf("sending task '%s' to worker-%s\n", testFile, worker.ID)
+	return func() {
+		if err := writeReport(s.reportDir, report); err != nil {
+			log.Printf("failed to write run report: %v", err)
+		} else {
+			fmt.Printf("run report written to %s (report.json, junit.xml)\n", s.reportDir)
+		}
+		if history != nil {
+			if err := writeHistory(s.history.path, history); err != nil {
+				log.Printf("failed to save test history: %v", err)
+			} else {
+				fmt.Printf("test history saved to %s\n", s.history.path)
+			}
+		}
+	}
+}
 
-	// update the nextWorker counter to distribute the next task
-	s.nextWorker = (s.nextWorker + 1) % len(s.testCases) // wrap around the test cases
+// puts tests whose worker didn't report back in time back to pending, s.mu must be held
+func (s *server) requeueExpired(now time.Time, out io.Writer) {
+	expired := s.queue.expire(now)
+	if len(expired) > 0 {
+		s.notify()
+	}
+	for _, t := range expired {
+		s.metrics.leaseExpired()
+		fmt.Fprintf(out, "lease %d on '%s' expired (worker-%s didn't report back), back to pending\n", t.leaseID, t.ID, t.workerID)
+	}
+}
 
-	// send the test file to the worker
-	return &pb.TaskResponse{
-		Filename: filepath.Base(testFile),
-		Content:  fileContent,
-		Message:  "run the test script",
-	}, nil
+// leases are also checked when workers ask for tasks, this is for when nobody is asking
+func (s *server) reapLeases(interval time.Duration) {
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for now := range ticker.C {
+		var out strings.Builder
+		s.mu.Lock()
+		s.requeueExpired(now, &out)
+		s.mu.Unlock()
+		fmt.Print(out.String())
+	}
+}
+
+// s.mu must be held
+func (s *server) printSummary(out io.Writer) {
+	passed, flaky, unchanged, quarantined := 0, 0, 0, 0
+	for _, id := range s.queue.order {
+		t := s.queue.tasks[id]
+		switch {
+		case t.passed:
+			passed++
+			if t.failures > 0 {
+				flaky++
+			}
+			if t.unchanged {
+				unchanged++
+			}
+		case t.quarantined:
+			quarantined++
+		}
+	}
+	failed := len(s.queue.tasks) - passed - quarantined
+	fmt.Fprintf(out, "run finished, all %d test cases are done: %d passed (%d after a retry, %d unchanged and not run), %d failed, %d quarantined failed\n",
+		len(s.queue.tasks), passed, flaky, unchanged, failed, quarantined)
 }
 
 func main() {
 	// load all test cases from the tests folder
-	testCases, err := loadTestCases("controller/tests")
+	testDir := os.Getenv("TEST_DIR")
+	if testDir == "" {
+		testDir = "controller/tests"
+	}
+	testCases, err := loadTestCases(testDir)
 	if err != nil {
 		log.Fatalf("failed to load test cases: %v", err)
 	}
@@ -114,6 +380,40 @@ func main() {
 		fmt.Printf(" - %s\n", filepath.Base(testCase))
 	}
 
+	// split the files into tasks by their @test_case functions
+	tasks, err := discoverTasks(testCases)
+	if err != nil {
+		log.Fatalf("failed to discover tests: %v", err)
+	}
+
+	// test files + support files are read and hashed once, the poller picks up edits
+	bundles, err := newBundleCache(testDir)
+	if err != nil {
+		log.Fatalf("failed to load test bundles: %v", err)
+	}
+	bundlePoll := 2 * time.Second
+	if v := os.Getenv("BUNDLE_POLL_INTERVAL"); v != "" {
+		bundlePoll, err = time.ParseDuration(v)
+		if err == nil && bundlePoll <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid BUNDLE_POLL_INTERVAL '%s': %v", v, err)
+		}
+	}
+	go bundles.watch(bundlePoll)
+
+	// durations of the previous runs decide the order tasks are handed out in
+	historyFile := os.Getenv("HISTORY_FILE")
+	if historyFile == "" {
+		historyFile = "controller/history.json"
+	}
+	history, err := loadHistory(historyFile)
+	if err != nil {
+		log.Fatalf("failed to load test history: %v", err)
+	}
+	fmt.Printf("loaded history of %d tasks from %s\n", len(history.Tests), historyFile)
+
 	// grpc server on 50051
 	fmt.Printf("Started accepting worker nodes\n")
 
@@ -122,13 +422,115 @@ func main() {
 		log.Fatalf("can't listen on port 50051: %v", err)
 	}
 
-	s := grpc.NewServer()
-	pb.RegisterTestExecutorServer(s, &server{
+	// a test that isn't reported back within this time goes back to the queue, heartbeats of its worker renew it (up to maxLeaseRenewal times this)
+	leaseTimeout := defaultLeaseTimeout
+	if v := os.Getenv("LEASE_TIMEOUT"); v != "" {
+		leaseTimeout, err = time.ParseDuration(v)
+		if err == nil && leaseTimeout <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid LEASE_TIMEOUT '%s': %v", v, err)
+		}
+	}
+	fmt.Printf("task lease timeout: %s\n", leaseTimeout)
+
+	// workers send heartbeats every WORKER_TTL/3, a worker that misses all of them is removed and its tests are requeued
+	workerTTL := defaultWorkerTTL
+	if v := os.Getenv("WORKER_TTL"); v != "" {
+		workerTTL, err = time.ParseDuration(v)
+		if err == nil && workerTTL <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid WORKER_TTL '%s': %v", v, err)
+		}
+	}
+	fmt.Printf("worker ttl: %s\n", workerTTL)
+
+	reportDir := os.Getenv("REPORT_DIR")
+	if reportDir == "" {
+		reportDir = "controller/reports"
+	}
+	logDir := os.Getenv("LOG_DIR")
+	if logDir == "" {
+		logDir = "controller/logs"
+	}
+
+	// failed tests are retried (on another worker if possible) until they've run MAX_ATTEMPTS times
+	maxAttempts := 2
+	if v := os.Getenv("MAX_ATTEMPTS"); v != "" {
+		if maxAttempts, err = strconv.Atoi(v); err != nil || maxAttempts < 1 {
+			log.Fatalf("invalid MAX_ATTEMPTS '%s': must be a positive number", v)
+		}
+	}
+	// tests that passed less than this share of their recent runs are quarantined
+	minPassRate := 0.8
+	if v := os.Getenv("QUARANTINE_PASS_RATE"); v != "" {
+		if minPassRate, err = strconv.ParseFloat(v, 64); err != nil || minPassRate < 0 || minPassRate > 1 {
+			log.Fatalf("invalid QUARANTINE_PASS_RATE '%s': must be between 0 and 1", v)
+		}
+	}
+	fmt.Printf("max attempts per test: %d, quarantine under %.0f%% passed\n", maxAttempts, minPassRate*100)
+
+	// INCREMENTAL=1 skips tests that passed cleanly with the same inputs within INCREMENTAL_TTL (see incremental.go)
+	incremental := os.Getenv("INCREMENTAL") == "1" || os.Getenv("INCREMENTAL") == "true"
+	incrementalTTL := defaultIncrementalTTL
+	if v := os.Getenv("INCREMENTAL_TTL"); v != "" {
+		incrementalTTL, err = time.ParseDuration(v)
+		if err == nil && incrementalTTL <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid INCREMENTAL_TTL '%s': %v", v, err)
+		}
+	}
+	if incremental {
+		fmt.Printf("incremental run: tests that passed within %s with the same test file, locators and wrapper aren't run again\n", incrementalTTL)
+	}
+
+	queue := newTaskQueue(tasks, leaseTimeout, maxAttempts) // pass the discovered tasks to the server
+	queue.prioritize(history)
+	for _, t := range queue.quarantine(history, minPassRate) {
+		fmt.Printf("quarantined '%s': passed %.0f%% of its recent runs, its failures won't fail the run\n", t.ID, (1-history.failureRate(t.ID))*100)
+	}
+	fmt.Printf("scheduling %d tasks, longest first:\n", len(tasks))
+	for _, t := range queue.pending {
+		if _, ok := history.expectedDuration(t.ID); ok {
+			fmt.Printf(" - %s (~%dms, %.0f%% failed recently)\n", t.ID, t.expected, history.failureRate(t.ID)*100)
+		} else {
+			fmt.Printf(" - %s (no history yet)\n", t.ID)
+		}
+	}
+
+	srv := &server{
 		workers:    make(map[string]WorkerInfo),
 		workerList: []string{},
-		nextWorker: 0,
-		testCases:  testCases, // pass the loaded test cases to the server
-	})
+		queue:      queue,
+		startedAt:  time.Now(),
+		bundles:    bundles,
+		reportDir:  reportDir,
+		logDir:     logDir,
+		history:    history,
+		workerTTL:  workerTTL,
+		metrics:    newMetrics(),
+
+		incremental:    incremental,
+		incrementalTTL: incrementalTTL,
+	}
+	srv.mu.metrics = srv.metrics
+	go srv.reapLeases(leaseTimeout / 4)
+	go srv.reapWorkers(srv.heartbeatInterval())
+
+	// prometheus text format on /metrics
+	metricsAddr := os.Getenv("METRICS_ADDR")
+	if metricsAddr == "" {
+		metricsAddr = ":9090"
+	}
+	go srv.listenMetrics(metricsAddr)
+
+	s := grpc.NewServer()
+	pb.RegisterTestExecutorServer(s, srv)
 
 	fmt.Println("controller waiting for workers on port 50051...")
 
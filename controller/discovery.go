@@ -0,0 +1,183 @@
+package main
+
+import (
+	"bufio"
+	"fmt"
+	"os"
+	"path/filepath"
+	"regexp"
+	"strings"
+)
+
+// test discovery without python (controller image doesn't have it): reads the
+// @test_case("description", depends_on=["test_a"]) decorators helpers.py asks for (also written as
+// @helpers.test_case, or split over several lines) and the def under them.
+// every group of tests connected through depends_on becomes one task (they share the page state,
+// so they have to run on the same worker in order), independent tests become tasks of their own.
+// files without any @test_case are still sent as a whole
+
+var (
+	testCaseStart     = regexp.MustCompile(`^@(helpers\.)?test_case\b`)
+	testCaseDecorator = regexp.MustCompile(`^@(?:helpers\.)?test_case\((.*)\)\s*(#.*)?$`)
+	testCaseImport    = regexp.MustCompile(`^from\s+[\w.]+\s+import\s.*\btest_case\b`)
+	dependsOnArg      = regexp.MustCompile(`depends_on\s*=\s*[\[(]([^\])]*)[\])]`)
+	quotedString      = regexp.MustCompile(`"([^"]*)"|'([^']*)'`)
+	testFunctionDef   = regexp.MustCompile(`^def\s+(\w+)\s*\(`)
+)
+
+// one schedulable unit, whole file or some of its tests
+type taskSpec struct {
+	ID    string   // file name, or file.py::test_a,test_b for split files
+	File  string   // path of the test file on the controller
+	Tests []string // @test_case functions to run, empty runs the whole file
+}
+
+type discoveredTest struct {
+	Name      string
+	DependsOn []string
+}
+
+// splits every test file into tasks
+func discoverTasks(testFiles []string) ([]taskSpec, error) {
+	var specs []taskSpec
+	for _, file := range testFiles {
+		tests, err := discoverTests(file)
+		if err != nil {
+			return nil, err
+		}
+		if len(tests) == 0 {
+			specs = append(specs, taskSpec{ID: filepath.Base(file), File: file})
+			continue
+		}
+		for _, group := range groupTests(file, tests) {
+			specs = append(specs, taskSpec{
+				ID:    filepath.Base(file) + "::" + strings.Join(group, ","),
+				File:  file,
+				Tests: group,
+			})
+		}
+	}
+	return specs, nil
+}
+
+// @test_case functions of a file in declaration order
+func discoverTests(file string) ([]discoveredTest, error) {
+	f, err := os.Open(file)
+	if err != nil {
+		return nil, fmt.Errorf("failed to read test file: %v", err)
+	}
+	defer f.Close()
+
+	var tests []discoveredTest
+	var pending *discoveredTest // decorator seen, waiting for its def
+	var decorator string        // decorator split over several lines, until its parentheses close
+	decorators, imported := 0, false
+	scanner := bufio.NewScanner(f)
+	for scanner.Scan() {
+		line := strings.TrimSpace(scanner.Text())
+		if testCaseImport.MatchString(line) {
+			imported = true
+		}
+		if decorator != "" {
+			line = decorator + " " + line
+			decorator = ""
+		} else if testCaseStart.MatchString(line) {
+			decorators++
+		}
+		if testCaseStart.MatchString(line) && parenDepth(line) > 0 {
+			decorator = line
+			continue
+		}
+		if m := testCaseDecorator.FindStringSubmatch(line); m != nil {
+			pending = &discoveredTest{}
+			if deps := dependsOnArg.FindStringSubmatch(m[1]); deps != nil {
+				for _, q := range quotedString.FindAllStringSubmatch(deps[1], -1) {
+					pending.DependsOn = append(pending.DependsOn, q[1]+q[2])
+				}
+			}
+			continue
+		}
+		if pending == nil {
+			continue
+		}
+		if m := testFunctionDef.FindStringSubmatch(line); m != nil {
+			pending.Name = m[1]
+			tests = append(tests, *pending)
+			pending = nil
+		}
+	}
+	if err := scanner.Err(); err != nil {
+		return nil, err
+	}
+
+	// a decorator we couldn't read would leave its test out of the split (or the whole file unsplit)
+	if decorators != len(tests) {
+		fmt.Printf("warning: %s has %d @test_case decorator(s) but only %d could be read, keep them to plain string literals\n",
+			filepath.Base(file), decorators, len(tests))
+	} else if imported && len(tests) == 0 {
+		fmt.Printf("warning: %s imports test_case but no @test_case test was found, running it as a whole\n", filepath.Base(file))
+	}
+	return tests, nil
+}
+
+// open parentheses left at the end of the line, the ones in string literals don't count
+func parenDepth(line string) int {
+	depth := 0
+	var quote rune
+	for _, r := range line {
+		switch {
+		case quote != 0:
+			if r == quote {
+				quote = 0
+			}
+		case r == '"' || r == '\'':
+			quote = r
+		case r == '#':
+			return depth
+		case r == '(':
+			depth++
+		case r == ')':
+			depth--
+		}
+	}
+	return depth
+}
+
+// connected components over depends_on, each in declaration order
+func groupTests(file string, tests []discoveredTest) [][]string {
+	parent := make(map[string]string)
+	var find func(string) string
+	find = func(name string) string {
+		if parent[name] != name {
+			parent[name] = find(parent[name])
+		}
+		return parent[name]
+	}
+	for _, t := range tests {
+		parent[t.Name] = t.Name
+	}
+	for _, t := range tests {
+		for _, dep := range t.DependsOn {
+			if _, ok := parent[dep]; !ok {
+				fmt.Printf("warning: %s depends on unknown test '%s' in %s, ignoring it\n", t.Name, dep, filepath.Base(file))
+				continue
+			}
+			parent[find(t.Name)] = find(dep)
+		}
+	}
+
+	var roots []string
+	groups := make(map[string][]string)
+	for _, t := range tests {
+		root := find(t.Name)
+		if _, ok := groups[root]; !ok {
+			roots = append(roots, root)
+		}
+		groups[root] = append(groups[root], t.Name)
+	}
+	out := make([][]string, 0, len(roots))
+	for _, root := range roots {
+		out = append(out, groups[root])
+	}
+	return out
+}
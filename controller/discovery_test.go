@@ -0,0 +1,95 @@
+package main
+
+import (
+	"os"
+	"path/filepath"
+	"reflect"
+	"testing"
+)
+
+func writeTestFile(t *testing.T, content string) string {
+	t.Helper()
+	path := filepath.Join(t.TempDir(), "test_x.py")
+	if err := os.WriteFile(path, []byte(content), 0o644); err != nil {
+		t.Fatal(err)
+	}
+	return path
+}
+
+func TestDiscoverTestsDecoratorForms(t *testing.T) {
+	file := writeTestFile(t, `from insider_py_wrapper import helpers
+from insider_py_wrapper.helpers import test_case, run_tests
+
+@test_case("Test: home page (opened)")
+def test_home():
+    pass
+
+@helpers.test_case("Test: cookies", depends_on=["test_home"])  # banner
+def test_cookies():
+    pass
+
+@test_case(
+    "Test: careers",
+    depends_on=[
+        "test_cookies",
+    ],
+)
+def test_careers():
+    pass
+
+@test_case("Test: footer")
+def test_footer():
+    pass
+
+run_tests()
+`)
+	tests, err := discoverTests(file)
+	if err != nil {
+		t.Fatal(err)
+	}
+	want := []discoveredTest{
+		{Name: "test_home"},
+		{Name: "test_cookies", DependsOn: []string{"test_home"}},
+		{Name: "test_careers", DependsOn: []string{"test_cookies"}},
+		{Name: "test_footer"},
+	}
+	if !reflect.DeepEqual(tests, want) {
+		t.Fatalf("discovered %+v, want %+v", tests, want)
+	}
+
+	groups := groupTests(file, tests)
+	wantGroups := [][]string{{"test_home", "test_cookies", "test_careers"}, {"test_footer"}}
+	if !reflect.DeepEqual(groups, wantGroups) {
+		t.Fatalf("groups %v, want %v", groups, wantGroups)
+	}
+}
+
+func TestDiscoverTestsWithoutDecorators(t *testing.T) {
+	file := writeTestFile(t, `from insider_py_wrapper.helpers import run_test
+
+run_test("Test: whole file", lambda: None)
+`)
+	specs, err := discoverTasks([]string{file})
+	if err != nil {
+		t.Fatal(err)
+	}
+	if len(specs) != 1 || specs[0].ID != "test_x.py" || len(specs[0].Tests) != 0 {
+		t.Fatalf("got %+v, want the whole file as one task", specs)
+	}
+}
+
+func TestParenDepth(t *testing.T) {
+	cases := map[string]int{
+		`@test_case("a (b")`:            0,
+		`@test_case(`:                   1,
+		`@test_case("x", depends_on=[`:  1,
+		`@test_case("x")  # (comment`:   0,
+		`@test_case('it''s (', "b)"`:    1,
+		`@helpers.test_case(("nested")`: 1,
+	}
+	for line, want := range cases {
+		if got := parenDepth(line); got != want {
+			t.Errorf("parenDepth(%q) = %d, want %d", line, got, want)
+		}
+	}
+}
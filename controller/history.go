@@ -0,0 +1,128 @@
+package main
+
+import (
+	"encoding/json"
+	"fmt"
+	"os"
+	"path/filepath"
+	"sort"
+	"time"
+)
+
+// local history of past runs (HISTORY_FILE, json), keyed by task id.
+// scheduler uses the durations for longest-first ordering and the pass rates for quarantining flaky tests
+const (
+	historyWindow     = 20 // how many recent runs are kept per task
+	quarantineMinRuns = 5  // recent runs needed before a test can be quarantined
+)
+
+type testHistory struct {
+	Runs       int       `json:"runs"`
+	Failures   int       `json:"failures"`
+	DurationMs []int64   `json:"recent_durations_ms"` // last historyWindow runs, oldest first
+	Outcomes   []bool    `json:"recent_outcomes"`     // same window, true = passed
+	LastRun    time.Time `json:"last_run"`
+
+	Last *lastResult `json:"last_result,omitempty"` // outcome and inputs of the last completed run, see incremental.go
+}
+
+type historyStore struct {
+	path  string
+	Tests map[string]*testHistory `json:"tests"`
+}
+
+// missing file is fine, that's just the first run
+func loadHistory(path string) (*historyStore, error) {
+	h := &historyStore{path: path, Tests: make(map[string]*testHistory)}
+	data, err := os.ReadFile(path)
+	if os.IsNotExist(err) {
+		return h, nil
+	}
+	if err != nil {
+		return nil, fmt.Errorf("failed to read history file: %v", err)
+	}
+	if err := json.Unmarshal(data, h); err != nil {
+		return nil, fmt.Errorf("failed to parse history file %s: %v", path, err)
+	}
+	if h.Tests == nil {
+		h.Tests = make(map[string]*testHistory)
+	}
+	return h, nil
+}
+
+func (h *historyStore) record(taskID string, durationMs int64, passed bool, at time.Time) {
+	th, ok := h.Tests[taskID]
+	if !ok {
+		th = &testHistory{}
+		h.Tests[taskID] = th
+	}
+	th.Runs++
+	if !passed {
+		th.Failures++
+	}
+	th.DurationMs = appendWindow(th.DurationMs, durationMs)
+	th.Outcomes = appendWindow(th.Outcomes, passed)
+	th.LastRun = at
+}
+
+func appendWindow[T any](window []T, v T) []T {
+	window = append(window, v)
+	if len(window) > historyWindow {
+		window = window[len(window)-historyWindow:]
+	}
+	return window
+}
+
+// median of the recent durations, false if the task never ran
+func (h *historyStore) expectedDuration(taskID string) (int64, bool) {
+	th, ok := h.Tests[taskID]
+	if !ok || len(th.DurationMs) == 0 {
+		return 0, false
+	}
+	sorted := append([]int64(nil), th.DurationMs...)
+	sort.Slice(sorted, func(i, j int) bool { return sorted[i] < sorted[j] })
+	return sorted[len(sorted)/2], true
+}
+
+// share of failed runs in the recent window
+func (h *historyStore) failureRate(taskID string) float64 {
+	th, ok := h.Tests[taskID]
+	if !ok || len(th.Outcomes) == 0 {
+		return 0
+	}
+	failed := 0
+	for _, passed := range th.Outcomes {
+		if !passed {
+			failed++
+		}
+	}
+	return float64(failed) / float64(len(th.Outcomes))
+}
+
+// flaky enough to be quarantined: enough recent runs, pass rate under minPassRate but it did pass
+// at some point (a test that never passes is broken, not flaky, and should keep failing the run)
+func (h *historyStore) flaky(taskID string, minPassRate float64) bool {
+	th, ok := h.Tests[taskID]
+	if !ok || len(th.Outcomes) < quarantineMinRuns {
+		return false
+	}
+	passRate := 1 - h.failureRate(taskID)
+	return passRate > 0 && passRate < minPassRate
+}
+
+// encoded under the lock, written with writeHistory outside of it
+func (h *historyStore) encode() ([]byte, error) {
+	return json.MarshalIndent(h, "", "  ")
+}
+
+// temp file + rename so a crash never leaves half a history behind
+func writeHistory(path string, data []byte) error {
+	if err := os.MkdirAll(filepath.Dir(path), 0755); err != nil {
+		return fmt.Errorf("failed to create history dir: %v", err)
+	}
+	tmp := path + ".tmp"
+	if err := os.WriteFile(tmp, data, 0644); err != nil {
+		return fmt.Errorf("failed to write history file: %v", err)
+	}
+	return os.Rename(tmp, path)
+}
@@ -0,0 +1,75 @@
+package main
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"fmt"
+	"io"
+	"path/filepath"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// incremental runs (INCREMENTAL=1): a test whose inputs didn't change since it last passed isn't run again.
+// the inputs of a task are fingerprinted: its id (file and @test_case functions), the hash of its bundle
+// (test file + locators and the other support files) and the wrapper version the worker sent at handshake.
+// the last outcome per task and fingerprint is kept in the history file. a task is skipped when its last
+// run passed cleanly (no failed attempts) with the same fingerprint within INCREMENTAL_TTL, changed,
+// failed, flaky and stale tests run as usual. it's decided when a worker asks for a task, that's when the
+// wrapper version is known. outcomes are recorded on every run, so the first incremental run can already skip tests that passed before it was turned on
+const defaultIncrementalTTL = 24 * time.Hour
+
+type lastResult struct {
+	Fingerprint string    `json:"fingerprint"`
+	Passed      bool      `json:"passed"` // without a failed attempt, flaky passes don't count
+	At          time.Time `json:"at"`
+	Cases       []string  `json:"cases,omitempty"` // run_test names, for the report when it's skipped
+}
+
+func taskFingerprint(t *task, bundleHash, wrapperVersion string) string {
+	h := sha256.New()
+	for _, part := range []string{t.ID, bundleHash, wrapperVersion} {
+		h.Write([]byte(part))
+		h.Write([]byte{0})
+	}
+	return hex.EncodeToString(h.Sum(nil))[:16]
+}
+
+func (h *historyStore) recordResult(taskID string, result lastResult) {
+	th, ok := h.Tests[taskID]
+	if !ok {
+		th = &testHistory{}
+		h.Tests[taskID] = th
+	}
+	th.Last = &result
+}
+
+// the task's last pass still holds for this worker, s.mu must be held
+func (s *server) unchanged(t *task, worker WorkerInfo, now time.Time) (*lastResult, bool) {
+	if !s.incremental || worker.WrapperVersion == "" || t.quarantined || t.failures > 0 {
+		return nil, false
+	}
+	th, ok := s.history.Tests[t.ID]
+	if !ok || th.Last == nil {
+		return nil, false
+	}
+	last := th.Last
+	if !last.Passed || last.Fingerprint != t.fingerprint || now.Sub(last.At) > s.incrementalTTL {
+		return nil, false
+	}
+	return last, true
+}
+
+// done without running it, the report lists its tests as skipped. s.mu must be held
+func (s *server) skipUnchanged(t *task, last *lastResult, worker WorkerInfo, out io.Writer) {
+	reason := fmt.Sprintf("unchanged since it passed at %s, not run (incremental run)", last.At.Format(time.RFC3339))
+	res := &pb.TaskResult{TaskId: t.ID, Filename: filepath.Base(t.File), Passed: true}
+	for _, name := range last.Cases {
+		res.Cases = append(res.Cases, &pb.TestCaseResult{Name: name, Status: "skipped", FailureMessage: reason})
+	}
+	s.queue.completeUnchanged(t)
+	t.result = res
+	s.metrics.taskUnchanged()
+	fmt.Fprintf(out, "skipping '%s' for worker-%s: %s\n", t.ID, worker.ID, reason)
+}
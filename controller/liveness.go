@@ -0,0 +1,99 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"slices"
+	"strings"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// worker liveness: workers send a heartbeat every workerTTL/3 from their own goroutine (so a long test
+// doesn't delay it), any other call counts too. a worker without one for workerTTL is considered dead
+// (crashed, OOM killed pod...), it's removed and the tests it held go back to pending right away
+// instead of waiting for LEASE_TIMEOUT. heartbeats also renew the leases of the worker's tests, so
+// LEASE_TIMEOUT is how long a test can go without its worker being heard from, not how long it can run
+// (that's capped at maxLeaseRenewal lease timeouts, so a test hung on a live worker is requeued too)
+
+func (s *server) heartbeatInterval() time.Duration {
+	return s.workerTTL / 3
+}
+
+// updates LastSeen of a registered worker, also tells if there are other workers (for retries)
+func (s *server) seen(workerID string, now time.Time) (worker WorkerInfo, otherWorkers, ok bool) {
+	s.workersMu.Lock()
+	defer s.workersMu.Unlock()
+	worker, ok = s.workers[workerID]
+	if !ok {
+		return worker, false, false
+	}
+	worker.LastSeen = now
+	s.workers[workerID] = worker
+	return worker, len(s.workers) > 1, true
+}
+
+// same without updating LastSeen, an open task stream doesn't keep a worker alive, only its heartbeats do
+func (s *server) lookupWorker(workerID string) (worker WorkerInfo, otherWorkers, ok bool) {
+	s.workersMu.Lock()
+	defer s.workersMu.Unlock()
+	worker, ok = s.workers[workerID]
+	return worker, ok && len(s.workers) > 1, ok
+}
+
+// registry first, then the leases under the queue lock (never both locks at once)
+func (s *server) Heartbeat(ctx context.Context, req *pb.HeartbeatRequest) (*pb.HeartbeatResponse, error) {
+	now := time.Now()
+	if _, _, ok := s.seen(req.GetWorkerId(), now); !ok {
+		return &pb.HeartbeatResponse{UnknownWorker: true}, nil
+	}
+	s.mu.Lock()
+	s.queue.renew(req.GetWorkerId(), now)
+	s.mu.Unlock()
+	return &pb.HeartbeatResponse{}, nil
+}
+
+// removes workers that missed their heartbeats, then requeues their tests. one lock at a time,
+// a worker that comes back in between still gets its tests requeued, they were lost anyway
+func (s *server) removeDeadWorkers(now time.Time) {
+	var dead []WorkerInfo
+	s.workersMu.Lock()
+	for _, id := range slices.Clone(s.workerList) {
+		worker := s.workers[id]
+		if now.Sub(worker.LastSeen) <= s.workerTTL {
+			continue
+		}
+		delete(s.workers, id)
+		s.workerList = slices.DeleteFunc(s.workerList, func(w string) bool { return w == id })
+		dead = append(dead, worker)
+	}
+	left := len(s.workerList)
+	s.workersMu.Unlock()
+	if len(dead) == 0 {
+		return
+	}
+
+	var out strings.Builder
+	s.mu.Lock()
+	s.notify() // their task streams end
+	for _, worker := range dead {
+		requeued := s.queue.releaseWorker(worker.ID)
+		s.metrics.workerLost()
+		fmt.Fprintf(&out, "worker-%s missed its heartbeats for %s, removed (%d workers left), %d tasks back to pending\n",
+			worker.ID, now.Sub(worker.LastSeen).Round(time.Second), left, len(requeued))
+		for _, t := range requeued {
+			fmt.Fprintf(&out, " - '%s' (lease %d)\n", t.ID, t.leaseID)
+		}
+	}
+	s.mu.Unlock()
+	fmt.Print(out.String())
+}
+
+func (s *server) reapWorkers(interval time.Duration) {
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for now := range ticker.C {
+		s.removeDeadWorkers(now)
+	}
+}
@@ -0,0 +1,113 @@
+package main
+
+import (
+	"bufio"
+	"fmt"
+	"io"
+	"os"
+	"path/filepath"
+	"regexp"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// test output streamed by the workers (StreamLogs), written to LOG_DIR with one file per task
+// (<task id>.log) and one per worker for the lines between tasks (worker-<id>.log).
+// nothing here touches s.mu, every stream has its own open files and appends to them
+
+var unsafeFileChars = regexp.MustCompile(`[^A-Za-z0-9._-]+`)
+
+// task ids look like test_x.py::test_a,test_b
+func logFileName(taskID string) string {
+	return unsafeFileChars.ReplaceAllString(taskID, "_") + ".log"
+}
+
+func (s *server) StreamLogs(stream pb.TestExecutor_StreamLogsServer) error {
+	files := &logFiles{dir: s.logDir, open: make(map[string]*logFile)}
+	defer files.close()
+
+	var received int64
+	for {
+		batch, err := stream.Recv()
+		if err == io.EOF {
+			return stream.SendAndClose(&pb.LogAck{Received: received})
+		}
+		if err != nil {
+			return err
+		}
+		if dropped := batch.GetDropped(); dropped > 0 {
+			fmt.Printf("worker-%s dropped %d log lines, its buffer was full\n", batch.GetWorkerId(), dropped)
+		}
+		for _, r := range batch.GetRecords() {
+			if err := files.write(batch.GetWorkerId(), r); err != nil {
+				return fmt.Errorf("failed to write logs: %v", err)
+			}
+		}
+		received += int64(len(batch.GetRecords()))
+		// flushed per batch, so lines from workers writing the same file (retried task) only interleave in batches
+		if err := files.flush(); err != nil {
+			return fmt.Errorf("failed to write logs: %v", err)
+		}
+	}
+}
+
+type logFile struct {
+	f *os.File
+	w *bufio.Writer
+}
+
+type logFiles struct {
+	dir  string
+	open map[string]*logFile
+}
+
+func (l *logFiles) write(workerID string, r *pb.LogRecord) error {
+	name := "worker-" + workerID + ".log"
+	if r.GetTaskId() != "" {
+		name = logFileName(r.GetTaskId())
+	}
+	lf, ok := l.open[name]
+	if !ok {
+		if err := os.MkdirAll(l.dir, 0755); err != nil {
+			return err
+		}
+		f, err := os.OpenFile(filepath.Join(l.dir, name), os.O_CREATE|os.O_WRONLY|os.O_APPEND, 0644)
+		if err != nil {
+			return err
+		}
+		lf = &logFile{f: f, w: bufio.NewWriter(f)}
+		l.open[name] = lf
+	}
+
+	ts := time.UnixMilli(r.GetTimestampMs()).UTC().Format("2006-01-02T15:04:05.000Z")
+	test := ""
+	if r.GetTest() != "" {
+		test = " [" + r.GetTest() + "]"
+	}
+	_, err := fmt.Fprintf(lf.w, "%s worker-%s [%s]%s %s\n", ts, workerID, r.GetStream(), test, r.GetLine())
+	return err
+}
+
+const maxOpenLogFiles = 16 // per stream, a worker runs one task per slot at a time so this is plenty
+
+func (l *logFiles) flush() error {
+	for _, lf := range l.open {
+		if err := lf.w.Flush(); err != nil {
+			return err
+		}
+	}
+	// long lived streams go through a lot of tasks, don't keep all of their files open
+	if len(l.open) > maxOpenLogFiles {
+		l.close()
+		l.open = make(map[string]*logFile)
+	}
+	return nil
+}
+
+func (l *logFiles) close() {
+	for _, lf := range l.open {
+		lf.w.Flush()
+		lf.f.Close()
+	}
+}
@@ -0,0 +1,279 @@
+package main
+
+import (
+	"fmt"
+	"io"
+	"log"
+	"net/http"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+)
+
+// prometheus metrics on METRICS_ADDR/metrics, for sizing the worker job's parallelism and seeing when the
+// controller itself is the bottleneck. written in the text exposition format by hand, no client library
+// in go.mod and a few counters/histograms don't need one.
+// queue/worker gauges are read from the server when scraped, everything else is recorded as it happens
+
+var (
+	// seconds, task durations go from a few seconds to several minutes
+	durationBuckets = []float64{1, 5, 10, 30, 60, 120, 300, 600, 1200}
+	// seconds, rpc handling and lock times are in the microsecond to millisecond range
+	latencyBuckets = []float64{0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1}
+)
+
+type histogram struct {
+	mu      sync.Mutex
+	buckets []float64
+	counts  []uint64 // per bucket, not cumulative, +Inf is the last one
+	sum     float64
+	count   uint64
+}
+
+func newHistogram(buckets []float64) *histogram {
+	return &histogram{buckets: buckets, counts: make([]uint64, len(buckets)+1)}
+}
+
+func (h *histogram) observe(v float64) {
+	i := sort.SearchFloat64s(h.buckets, v) // first bucket with le >= v
+	h.mu.Lock()
+	h.counts[i]++
+	h.sum += v
+	h.count++
+	h.mu.Unlock()
+}
+
+// writes the _bucket/_sum/_count lines, labels is either empty or like `task="x"`
+func (h *histogram) write(w io.Writer, name, labels string) {
+	h.mu.Lock()
+	counts, sum, count := append([]uint64(nil), h.counts...), h.sum, h.count
+	h.mu.Unlock()
+
+	sep := ""
+	if labels != "" {
+		sep = ","
+	}
+	var cumulative uint64
+	for i, le := range h.buckets {
+		cumulative += counts[i]
+		fmt.Fprintf(w, "%s_bucket{%s%sle=\"%g\"} %d\n", name, labels, sep, le, cumulative)
+	}
+	cumulative += counts[len(h.buckets)]
+	fmt.Fprintf(w, "%s_bucket{%s%sle=\"+Inf\"} %d\n", name, labels, sep, cumulative)
+	if labels != "" {
+		labels = "{" + labels + "}"
+	}
+	fmt.Fprintf(w, "%s_sum%s %g\n", name, labels, sum)
+	fmt.Fprintf(w, "%s_count%s %d\n", name, labels, count)
+}
+
+// recording methods are nil-safe, a server without metrics just doesn't record anything
+type metrics struct {
+	mu            sync.Mutex // counters and the per test map, histograms have their own
+	dispatched    uint64
+	completed     map[bool]uint64 // by passed
+	retried       uint64
+	unchanged     uint64
+	leasesExpired uint64
+	workersLost   uint64
+	testDuration  map[string]*histogram // by task id
+
+	receiveTask *histogram // ReceiveTask handling time
+	streamTask  *histogram // SubscribeTasks: task leased until stream.Send returned
+	lockWait    *histogram // time spent waiting for server.mu
+	lockHold    *histogram // time server.mu was held
+}
+
+func newMetrics() *metrics {
+	return &metrics{
+		completed:    make(map[bool]uint64),
+		testDuration: make(map[string]*histogram),
+		receiveTask:  newHistogram(latencyBuckets),
+		streamTask:   newHistogram(latencyBuckets),
+		lockWait:     newHistogram(latencyBuckets),
+		lockHold:     newHistogram(latencyBuckets),
+	}
+}
+
+func (m *metrics) taskDispatched() {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.dispatched++
+	m.mu.Unlock()
+}
+
+func (m *metrics) taskCompleted(taskID string, passed bool, duration time.Duration) {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.completed[passed]++
+	m.mu.Unlock()
+	m.observeDuration(taskID, duration)
+}
+
+func (m *metrics) taskRetried(taskID string, duration time.Duration) {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.retried++
+	m.mu.Unlock()
+	m.observeDuration(taskID, duration)
+}
+
+func (m *metrics) taskUnchanged() {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.unchanged++
+	m.mu.Unlock()
+}
+
+func (m *metrics) observeDuration(taskID string, duration time.Duration) {
+	m.mu.Lock()
+	h, ok := m.testDuration[taskID]
+	if !ok {
+		h = newHistogram(durationBuckets)
+		m.testDuration[taskID] = h
+	}
+	m.mu.Unlock()
+	h.observe(duration.Seconds())
+}
+
+func (m *metrics) leaseExpired() {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.leasesExpired++
+	m.mu.Unlock()
+}
+
+func (m *metrics) workerLost() {
+	if m == nil {
+		return
+	}
+	m.mu.Lock()
+	m.workersLost++
+	m.mu.Unlock()
+}
+
+// sync.Mutex that records how long it's waited for and held, server.mu is one of these.
+// lockedAt is only touched by the holder
+type timedMutex struct {
+	mu       sync.Mutex
+	lockedAt time.Time
+	metrics  *metrics // nil records nothing
+}
+
+func (l *timedMutex) Lock() {
+	start := time.Now()
+	l.mu.Lock()
+	l.lockedAt = time.Now()
+	if l.metrics != nil {
+		l.metrics.lockWait.observe(l.lockedAt.Sub(start).Seconds())
+	}
+}
+
+func (l *timedMutex) Unlock() {
+	held := time.Since(l.lockedAt)
+	l.mu.Unlock()
+	if l.metrics != nil {
+		l.metrics.lockHold.observe(held.Seconds())
+	}
+}
+
+// queue and worker numbers at scrape time
+type queueGauges struct {
+	pending, inFlight, done int
+	workers, slots          int
+}
+
+func (s *server) queueGauges() queueGauges {
+	var g queueGauges
+	s.workersMu.Lock()
+	g.workers = len(s.workers)
+	for _, w := range s.workers {
+		g.slots += w.Slots
+	}
+	s.workersMu.Unlock()
+
+	s.mu.Lock()
+	g.pending, g.inFlight, g.done = s.queue.counts()
+	s.mu.Unlock()
+	return g
+}
+
+var labelEscaper = strings.NewReplacer(`\`, `\\`, `"`, `\"`, "\n", `\n`)
+
+func (s *server) serveMetrics(w http.ResponseWriter, r *http.Request) {
+	g := s.queueGauges() // numbers are taken under the lock, written out after
+	m := s.metrics
+
+	w.Header().Set("Content-Type", "text/plain; version=0.0.4")
+	gauge := func(name, help string, v float64) {
+		fmt.Fprintf(w, "# HELP %s %s\n# TYPE %s gauge\n%s %g\n", name, help, name, name, v)
+	}
+	gauge("controller_queue_pending_tasks", "Tasks waiting for a worker.", float64(g.pending))
+	gauge("controller_queue_in_flight_tasks", "Tasks leased to a worker.", float64(g.inFlight))
+	gauge("controller_queue_done_tasks", "Tasks that are done.", float64(g.done))
+	gauge("controller_workers", "Workers that did the handshake and are alive.", float64(g.workers))
+	gauge("controller_worker_slots", "Slots (tests at the same time) of the alive workers.", float64(g.slots))
+	gauge("controller_uptime_seconds", "Time since the controller loaded the tests.", time.Since(s.startedAt).Seconds())
+
+	// counters are copied, nothing is written to the connection under a lock
+	m.mu.Lock()
+	dispatched, passed, failed, retried, unchanged := m.dispatched, m.completed[true], m.completed[false], m.retried, m.unchanged
+	leasesExpired, workersLost := m.leasesExpired, m.workersLost
+	taskIDs := make([]string, 0, len(m.testDuration))
+	for id := range m.testDuration {
+		taskIDs = append(taskIDs, id)
+	}
+	sort.Strings(taskIDs)
+	durations := make([]*histogram, len(taskIDs))
+	for i, id := range taskIDs {
+		durations[i] = m.testDuration[id]
+	}
+	m.mu.Unlock()
+
+	counter := func(name, help string, v uint64) {
+		fmt.Fprintf(w, "# HELP %s %s\n# TYPE %s counter\n%s %d\n", name, help, name, name, v)
+	}
+	counter("controller_tasks_dispatched_total", "Tasks handed out to workers, rate() of it is the dispatch rate.", dispatched)
+	fmt.Fprintf(w, "# HELP controller_tasks_completed_total Tasks that are done, by outcome.\n# TYPE controller_tasks_completed_total counter\n")
+	fmt.Fprintf(w, "controller_tasks_completed_total{result=\"passed\"} %d\n", passed)
+	fmt.Fprintf(w, "controller_tasks_completed_total{result=\"failed\"} %d\n", failed)
+	counter("controller_tasks_retried_total", "Failed attempts that were put back to pending.", retried)
+	counter("controller_tasks_unchanged_total", "Tasks an incremental run didn't run, they passed before with the same inputs.", unchanged)
+	counter("controller_leases_expired_total", "Leases that ran out before the worker reported back.", leasesExpired)
+	counter("controller_workers_lost_total", "Workers removed after missing their heartbeats.", workersLost)
+
+	fmt.Fprintf(w, "# HELP controller_test_duration_seconds Duration of every attempt of a task as reported by the worker.\n# TYPE controller_test_duration_seconds histogram\n")
+	for i, id := range taskIDs {
+		durations[i].write(w, "controller_test_duration_seconds", fmt.Sprintf("task=\"%s\"", labelEscaper.Replace(id)))
+	}
+	histogramFamily := func(name, help string, h *histogram) {
+		fmt.Fprintf(w, "# HELP %s %s\n# TYPE %s histogram\n", name, help, name)
+		h.write(w, name, "")
+	}
+	fmt.Fprintf(w, "# HELP controller_receive_task_duration_seconds Time spent handing out a task, a ReceiveTask call (path=poll) or from leasing it to SubscribeTasks having sent it (path=stream).\n# TYPE controller_receive_task_duration_seconds histogram\n")
+	m.receiveTask.write(w, "controller_receive_task_duration_seconds", `path="poll"`)
+	m.streamTask.write(w, "controller_receive_task_duration_seconds", `path="stream"`)
+	histogramFamily("controller_lock_wait_seconds", "Time spent waiting for the server lock.", m.lockWait)
+	histogramFamily("controller_lock_hold_seconds", "Time the server lock was held.", m.lockHold)
+}
+
+// serves /metrics, the grpc server keeps going if this fails
+func (s *server) listenMetrics(addr string) {
+	mux := http.NewServeMux()
+	mux.HandleFunc("/metrics", s.serveMetrics)
+	fmt.Printf("metrics on http://%s/metrics\n", addr)
+	if err := http.ListenAndServe(addr, mux); err != nil {
+		log.Printf("metrics endpoint stopped: %v", err)
+	}
+}
@@ -0,0 +1,339 @@
+package main
+
+import (
+	"slices"
+	"sort"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// states a task goes through, pending -> in flight -> done
+// (in flight goes back to pending if the lease runs out)
+type taskState int
+
+const (
+	taskPending taskState = iota
+	taskInFlight
+	taskDone
+)
+
+// one test case in the queue
+type task struct {
+	taskSpec // id, file and the tests to run from it
+	state    taskState
+	leaseID  int64          // lease of the current holder, results with an older lease are duplicates
+	workerID string         // worker holding the lease (last holder once it expired)
+	deadline time.Time      // lease expires at this point and the task goes back to pending
+	leasedAt time.Time      // when the current lease was handed out, renewals stop maxLeaseRenewal later
+	attempts int            // how many times the task was handed out
+	expected int64          // expected duration in ms from the history, for ordering
+	passed   bool           // outcome once it's done
+	result   *pb.TaskResult // what the worker reported, goes into the run report
+
+	quarantined bool            // flaky per the history: runs once, failures don't fail the run
+	failedOn    map[string]bool // workers an attempt failed on, retries go to another one if possible
+	retriedAt   time.Time       // when the last failed attempt was put back to pending
+	failures    int             // failed attempts that were retried
+
+	leaseEnded chan struct{} // closed when the current lease ends, made when a task stream waits for it
+	holding    bool          // done by an expired lease's result, the current lease still takes up its worker's slot
+
+	fingerprint string // inputs of the last attempt handed out (see incremental.go)
+	unchanged   bool   // incremental run skipped it, its last pass still holds
+}
+
+// a failed task is retried on another worker if one asks for a task within this time,
+// after that (or with a single worker) the same worker can take it again
+const preferOtherWorkerFor = 30 * time.Second
+
+// heartbeats renew a lease up to this many lease timeouts after it was handed out, so a test that hangs
+// on a live worker still goes back to pending at some point
+const maxLeaseRenewal = 4
+
+// pending/in-flight/done queue with leases. every test is handed out to one worker at a time
+// and it's only done when a worker reports it back (or it failed maxAttempts times),
+// not guarded by itself, server.mu protects it
+type taskQueue struct {
+	leaseTimeout time.Duration
+	maxAttempts  int // failed tasks are retried until they've been handed out this many times
+	tasks        map[string]*task
+	order        []string // task ids in load order, for printing summaries
+	pending      []*task  // longest expected first, expired leases are put back at the front
+	nextLease    int64
+	done         int
+	inFlightBy   map[string]int // worker id -> tasks it holds a lease on, to schedule against free slots
+	nextDeadline time.Time      // no lease runs out before this, expire doesn't scan the tasks until then
+}
+
+func newTaskQueue(specs []taskSpec, leaseTimeout time.Duration, maxAttempts int) *taskQueue {
+	q := &taskQueue{
+		leaseTimeout: leaseTimeout,
+		maxAttempts:  maxAttempts,
+		tasks:        make(map[string]*task),
+		inFlightBy:   make(map[string]int),
+	}
+	for _, spec := range specs {
+		t := &task{taskSpec: spec, failedOn: make(map[string]bool)}
+		q.tasks[t.ID] = t
+		q.order = append(q.order, t.ID)
+		q.pending = append(q.pending, t)
+	}
+	return q
+}
+
+// longest-processing-time first: the long tests start right away and the short ones fill
+// the gaps at the end, instead of a long test starting last and keeping the run open.
+// tasks that never ran count as long as the longest known one so a new slow test doesn't end up last,
+// stable so without any history it's the load order
+func (q *taskQueue) prioritize(history *historyStore) {
+	var longest int64
+	for _, t := range q.pending {
+		if d, ok := history.expectedDuration(t.ID); ok {
+			t.expected = d
+			if d > longest {
+				longest = d
+			}
+		}
+	}
+	for _, t := range q.pending {
+		if _, ok := history.expectedDuration(t.ID); !ok {
+			t.expected = longest
+		}
+	}
+	sort.SliceStable(q.pending, func(i, j int) bool { return q.pending[i].expected > q.pending[j].expected })
+}
+
+// flaky tests (per the history) are quarantined: they still run so they can get out of it, but aren't
+// retried and their failures don't fail the run
+func (q *taskQueue) quarantine(history *historyStore, minPassRate float64) []*task {
+	var quarantined []*task
+	for _, id := range q.order {
+		t := q.tasks[id]
+		if history.flaky(t.ID, minPassRate) {
+			t.quarantined = true
+			quarantined = append(quarantined, t)
+		}
+	}
+	return quarantined
+}
+
+// hands out the next pending task to the worker with a fresh lease,
+// returns nil if nothing is pending right now (check drained() for the difference).
+// retries of tasks that failed on this worker are left for the others for a while if there are others
+func (q *taskQueue) acquire(workerID string, now time.Time, otherWorkers bool) *task {
+	i := slices.IndexFunc(q.pending, func(t *task) bool {
+		return !otherWorkers || !t.failedOn[workerID] || now.Sub(t.retriedAt) > preferOtherWorkerFor
+	})
+	if i < 0 {
+		return nil
+	}
+	t := q.pending[i]
+	if i == 0 {
+		q.pending = q.pending[1:] // the usual case, no copying
+	} else {
+		q.pending = slices.Delete(q.pending, i, i+1)
+	}
+
+	q.nextLease++
+	t.state = taskInFlight
+	t.leaseID = q.nextLease
+	t.workerID = workerID
+	t.leasedAt = now
+	t.deadline = now.Add(q.leaseTimeout)
+	if q.nextDeadline.IsZero() || t.deadline.Before(q.nextDeadline) {
+		q.nextDeadline = t.deadline
+	}
+	t.attempts++
+	q.inFlightBy[workerID]++
+	return t
+}
+
+// marks the task as done. first result wins, even if it comes with an expired lease
+// (no need to run it again then), anything after that is a duplicate and ignored.
+// when the expired lease reports while another worker holds the task, that worker is still running it:
+// its slot stays taken until it reports too (or its lease ends), leaseID stays the current holder's then
+func (q *taskQueue) complete(taskID string, leaseID int64, passed bool) (*task, bool) {
+	t, ok := q.tasks[taskID]
+	if !ok {
+		return t, false
+	}
+	if t.state == taskDone {
+		if t.holding && leaseID == t.leaseID {
+			q.endHolding(t)
+		}
+		return t, false
+	}
+	switch {
+	case t.state == taskPending:
+		q.removePending(t)
+		t.leaseID = leaseID
+	case leaseID == t.leaseID:
+		q.release(t)
+	default:
+		t.holding = true
+	}
+	t.state = taskDone
+	t.passed = passed
+	q.done++
+	return t, true
+}
+
+// incremental run: the task was just handed out but its last pass still holds, it's done without running
+func (q *taskQueue) completeUnchanged(t *task) {
+	t.attempts--
+	q.complete(t.ID, t.leaseID, true)
+	t.unchanged = true
+}
+
+// failed attempt: the task goes back to the front of pending if it has attempts left, false means
+// it's out of attempts (or quarantined) and should be completed as failed.
+// if the lease already expired the task is pending or running somewhere else, nothing to requeue then
+func (q *taskQueue) retry(taskID string, leaseID int64, workerID string, now time.Time) (*task, bool) {
+	t, ok := q.tasks[taskID]
+	if !ok || t.state == taskDone || t.quarantined {
+		return t, false
+	}
+	// another attempt is running already (lease expired and the task was handed out again), let it finish
+	runningElsewhere := t.state == taskInFlight && t.leaseID != leaseID
+	if !runningElsewhere && t.attempts >= q.maxAttempts {
+		return t, false
+	}
+	t.failedOn[workerID] = true
+	t.failures++
+	if t.state == taskInFlight && !runningElsewhere {
+		t.retriedAt = now
+		q.requeue([]*task{t})
+	}
+	return t, true
+}
+
+// pushes back the deadline of every lease the worker holds, called on its heartbeats:
+// a test longer than the lease timeout isn't handed out again while its worker is alive and running it,
+// unless it's been running for maxLeaseRenewal lease timeouts
+func (q *taskQueue) renew(workerID string, now time.Time) {
+	if q.inFlightBy[workerID] == 0 {
+		return
+	}
+	for _, id := range q.order {
+		t := q.tasks[id]
+		if (t.state == taskInFlight || t.holding) && t.workerID == workerID {
+			t.deadline = now.Add(q.leaseTimeout)
+			if last := t.leasedAt.Add(maxLeaseRenewal * q.leaseTimeout); t.deadline.After(last) {
+				t.deadline = last
+			}
+		}
+	}
+}
+
+// puts in-flight tasks whose lease ran out back to the front of pending
+// called on every ReceiveTask, only scans the tasks once the earliest lease is due
+func (q *taskQueue) expire(now time.Time) []*task {
+	if q.nextDeadline.IsZero() || !now.After(q.nextDeadline) {
+		return nil
+	}
+	var expired []*task
+	q.nextDeadline = time.Time{}
+	for _, id := range q.order {
+		t := q.tasks[id]
+		if t.state != taskInFlight && !t.holding {
+			continue
+		}
+		switch {
+		case !now.After(t.deadline):
+			if q.nextDeadline.IsZero() || t.deadline.Before(q.nextDeadline) {
+				q.nextDeadline = t.deadline
+			}
+		case t.holding:
+			q.endHolding(t) // done already, only the slot is given back
+		default:
+			expired = append(expired, t)
+		}
+	}
+	q.requeue(expired)
+	return expired
+}
+
+// puts the in-flight tasks of a worker that's gone back to the front of pending, without waiting for the leases
+func (q *taskQueue) releaseWorker(workerID string) []*task {
+	var held []*task
+	for _, id := range q.order {
+		t := q.tasks[id]
+		if t.workerID != workerID {
+			continue
+		}
+		if t.state == taskInFlight {
+			held = append(held, t)
+		} else if t.holding {
+			q.endHolding(t)
+		}
+	}
+	q.requeue(held)
+	return held
+}
+
+func (q *taskQueue) requeue(tasks []*task) {
+	for _, t := range tasks {
+		q.release(t)
+		t.state = taskPending
+	}
+	if len(tasks) > 0 {
+		q.pending = append(tasks, q.pending...)
+	}
+}
+
+// frees the slot of the worker holding the task, workerID is kept for the log lines
+func (q *taskQueue) release(t *task) {
+	if q.inFlightBy[t.workerID]--; q.inFlightBy[t.workerID] <= 0 {
+		delete(q.inFlightBy, t.workerID)
+	}
+	if t.leaseEnded != nil {
+		close(t.leaseEnded)
+		t.leaseEnded = nil
+	}
+}
+
+// the lease of a task that's already done ended (reported, expired or its worker is gone), frees its slot
+func (q *taskQueue) endHolding(t *task) {
+	q.release(t)
+	t.holding = false
+}
+
+// tasks the worker holds a lease on right now
+func (q *taskQueue) inFlightOn(workerID string) int {
+	return q.inFlightBy[workerID]
+}
+
+// false if the lease isn't running anymore (reported, expired or released), otherwise a channel that's
+// closed when it ends. a task stream waits on it before giving its slot the next task
+func (q *taskQueue) leaseEnded(taskID string, leaseID int64) (<-chan struct{}, bool) {
+	t, ok := q.tasks[taskID]
+	if !ok || (t.state != taskInFlight && !t.holding) || t.leaseID != leaseID {
+		return nil, false
+	}
+	if t.leaseEnded == nil {
+		t.leaseEnded = make(chan struct{})
+	}
+	return t.leaseEnded, true
+}
+
+func (q *taskQueue) removePending(t *task) {
+	for i, p := range q.pending {
+		if p == t {
+			q.pending = append(q.pending[:i], q.pending[i+1:]...)
+			return
+		}
+	}
+}
+
+// every task is done, run is over
+func (q *taskQueue) drained() bool {
+	return q.done == len(q.tasks)
+}
+
+func (q *taskQueue) counts() (pending, inFlight, done int) {
+	pending = len(q.pending)
+	done = q.done
+	inFlight = len(q.tasks) - pending - done
+	return pending, inFlight, done
+}
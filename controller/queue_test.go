@@ -0,0 +1,129 @@
+package main
+
+import (
+	"testing"
+	"time"
+)
+
+func newTestQueue(ids ...string) *taskQueue {
+	var specs []taskSpec
+	for _, id := range ids {
+		specs = append(specs, taskSpec{ID: id, File: id})
+	}
+	return newTaskQueue(specs, time.Minute, 2)
+}
+
+func TestLeaseExpiresBackToPending(t *testing.T) {
+	q := newTestQueue("a")
+	now := time.Now()
+	first := q.acquire("w1", now, false)
+	if first == nil || first.state != taskInFlight || q.inFlightOn("w1") != 1 {
+		t.Fatalf("acquire didn't lease the task: %+v", first)
+	}
+	if expired := q.expire(now.Add(30 * time.Second)); len(expired) != 0 {
+		t.Fatalf("lease expired early: %v", expired)
+	}
+	expired := q.expire(now.Add(2 * time.Minute))
+	if len(expired) != 1 || first.state != taskPending || q.inFlightOn("w1") != 0 {
+		t.Fatalf("lease didn't expire: %v, state %d, w1 holds %d", expired, first.state, q.inFlightOn("w1"))
+	}
+}
+
+func TestRenewKeepsLongTestLeased(t *testing.T) {
+	q := newTestQueue("a", "b")
+	now := time.Now()
+	a := q.acquire("w1", now, false)
+	b := q.acquire("w2", now, false)
+
+	// w1 keeps sending heartbeats, w2 doesn't
+	for i := 1; i <= 4; i++ {
+		q.renew("w1", now.Add(time.Duration(i)*30*time.Second))
+	}
+	expired := q.expire(now.Add(2*time.Minute + time.Second))
+	if len(expired) != 1 || expired[0] != b {
+		t.Fatalf("expired %v, want only b", expired)
+	}
+	if a.state != taskInFlight || q.inFlightOn("w1") != 1 {
+		t.Fatalf("renewed lease of a expired, state %d", a.state)
+	}
+}
+
+func TestRenewStopsForHungTest(t *testing.T) {
+	q := newTestQueue("a")
+	now := time.Now()
+	a := q.acquire("w1", now, false)
+
+	// w1 is alive and keeps sending heartbeats, but the test never reports
+	var expired []*task
+	for i := 1; len(expired) == 0 && i <= 20; i++ {
+		at := now.Add(time.Duration(i) * 30 * time.Second)
+		q.renew("w1", at)
+		expired = q.expire(at)
+	}
+	if len(expired) != 1 || a.state != taskPending || q.inFlightOn("w1") != 0 {
+		t.Fatalf("hung test wasn't requeued: state %d, w1 holds %d", a.state, q.inFlightOn("w1"))
+	}
+	if last := now.Add(maxLeaseRenewal * time.Minute); a.deadline.After(last) {
+		t.Fatalf("lease renewed until %s, past %s", a.deadline.Sub(now), last.Sub(now))
+	}
+}
+
+func TestExpiredLeaseReportsFirst(t *testing.T) {
+	q := newTestQueue("a")
+	now := time.Now()
+	first := q.acquire("w1", now, false)
+	oldLease := first.leaseID
+	q.expire(now.Add(2 * time.Minute))
+	second := q.acquire("w2", now.Add(2*time.Minute), false)
+	newLease := second.leaseID
+
+	// w1 was slow but reports, the result is kept and w2 is still running the test
+	if _, ok := q.complete("a", oldLease, true); !ok {
+		t.Fatal("first result wasn't accepted")
+	}
+	if !q.drained() {
+		t.Fatal("queue not drained after the first result")
+	}
+	if q.inFlightOn("w2") != 1 {
+		t.Fatalf("w2's slot was freed while it's still running the test")
+	}
+	if _, busy := q.leaseEnded("a", newLease); !busy {
+		t.Fatal("w2's lease ended before it reported")
+	}
+
+	// w2 reports too, a duplicate, but its slot is free again
+	if _, ok := q.complete("a", newLease, false); ok {
+		t.Fatal("duplicate result was accepted")
+	}
+	if q.inFlightOn("w2") != 0 || !second.passed {
+		t.Fatalf("w2 holds %d, passed %v", q.inFlightOn("w2"), second.passed)
+	}
+	if _, busy := q.leaseEnded("a", newLease); busy {
+		t.Fatal("w2's lease still running after it reported")
+	}
+}
+
+func TestHeldSlotFreedOnExpiryAndWorkerLoss(t *testing.T) {
+	q := newTestQueue("a", "b")
+	now := time.Now()
+	for _, worker := range []string{"w1", "w2"} {
+		q.acquire(worker, now, false)
+	}
+	later := now.Add(2 * time.Minute)
+	q.expire(later)
+	a := q.acquire("w3", later, false)
+	b := q.acquire("w4", later, false)
+	q.complete(a.ID, 1, true)
+	q.complete(b.ID, 2, true)
+
+	if n := len(q.expire(later.Add(2 * time.Minute))); n != 0 || q.inFlightOn("w3") != 0 {
+		t.Fatalf("expiry of a done task's lease requeued %d tasks, w3 holds %d", n, q.inFlightOn("w3"))
+	}
+	if a.state != taskDone {
+		t.Fatalf("done task went back to state %d", a.state)
+	}
+
+	if n := len(q.releaseWorker("w4")); n != 0 || q.inFlightOn("w4") != 0 {
+		t.Fatalf("removing w4 requeued %d tasks, w4 holds %d", n, q.inFlightOn("w4"))
+	}
+}
@@ -0,0 +1,239 @@
+package main
+
+import (
+	"encoding/json"
+	"encoding/xml"
+	"fmt"
+	"os"
+	"path/filepath"
+	"strings"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// run report, written to REPORT_DIR as report.json and junit.xml once every test is done
+// (so we don't have to grep pod logs to see if a run passed)
+
+type stepReport struct {
+	Name       string `json:"name"`
+	DurationMs int64  `json:"duration_ms"`
+}
+
+type caseReport struct {
+	Name           string       `json:"name"`
+	Status         string       `json:"status"`
+	DurationMs     int64        `json:"duration_ms"`
+	FailureMessage string       `json:"failure_message,omitempty"`
+	WaitMs         int64        `json:"wait_ms"`   // waiting on the site
+	ActionMs       int64        `json:"action_ms"` // webdriver commands
+	Steps          []stepReport `json:"steps,omitempty"`
+}
+
+type taskReport struct {
+	TaskID      string       `json:"task_id"`
+	File        string       `json:"file"`
+	WorkerID    string       `json:"worker_id"`
+	Attempts    int          `json:"attempts"`
+	Passed      bool         `json:"passed"`
+	Flaky       bool         `json:"flaky,omitempty"`       // passed after failed attempts
+	Quarantined bool         `json:"quarantined,omitempty"` // failures don't fail the run
+	Unchanged   bool         `json:"unchanged,omitempty"`   // incremental run, passed before with the same inputs and wasn't run
+	ExitCode    int32        `json:"exit_code"`
+	DurationMs  int64        `json:"duration_ms"`
+	Error       string       `json:"error,omitempty"`
+	Cases       []caseReport `json:"cases"`
+}
+
+type runReport struct {
+	StartedAt   time.Time    `json:"started_at"`
+	FinishedAt  time.Time    `json:"finished_at"`
+	DurationMs  int64        `json:"duration_ms"`
+	Passed      bool         `json:"passed"`
+	Tests       int          `json:"tests"`       // run_test cases, plus scripts that crashed before reporting any
+	Failures    int          `json:"failures"`    // assertion failures
+	Errors      int          `json:"errors"`      // any other exception / crashed scripts
+	Skipped     int          `json:"skipped"`     // dependency didn't pass, or unchanged in an incremental run
+	Quarantined int          `json:"quarantined"` // failed/errored tests of quarantined tasks, not in failures/errors
+	Flaky       int          `json:"flaky"`       // tasks that passed on a retry
+	Tasks       []taskReport `json:"tasks"`
+}
+
+// builds the report from the queue, s.mu must be held
+func (s *server) buildReport(now time.Time) *runReport {
+	r := &runReport{StartedAt: s.startedAt, FinishedAt: now, DurationMs: now.Sub(s.startedAt).Milliseconds(), Passed: true}
+	for _, id := range s.queue.order {
+		t := s.queue.tasks[id]
+		tr := taskReport{TaskID: t.ID, File: filepath.Base(t.File), Attempts: t.attempts, Passed: t.passed,
+			Flaky: t.passed && t.failures > 0, Quarantined: t.quarantined, Unchanged: t.unchanged}
+		if tr.Flaky {
+			r.Flaky++
+		}
+		if res := t.result; res != nil {
+			tr.WorkerID = res.GetWorkerId()
+			tr.ExitCode = res.GetExitCode()
+			tr.DurationMs = res.GetDurationMs()
+			tr.Error = res.GetError()
+			for _, c := range res.GetCases() {
+				tr.Cases = append(tr.Cases, newCaseReport(c))
+			}
+		}
+		// script died before any run_test finished, count it as one errored test so it's not invisible
+		if len(tr.Cases) == 0 && !tr.Passed {
+			tr.Cases = append(tr.Cases, caseReport{Name: tr.File, Status: "error", DurationMs: tr.DurationMs, FailureMessage: tr.Error})
+		}
+		for _, c := range tr.Cases {
+			r.Tests++
+			switch {
+			case c.Status == "passed":
+			case c.Status == "skipped":
+				r.Skipped++
+			case tr.Quarantined:
+				r.Quarantined++
+			case c.Status == "failed":
+				r.Failures++
+			default:
+				r.Errors++
+			}
+		}
+		if !tr.Passed && !tr.Quarantined {
+			r.Passed = false
+		}
+		r.Tasks = append(r.Tasks, tr)
+	}
+	return r
+}
+
+func newCaseReport(c *pb.TestCaseResult) caseReport {
+	cr := caseReport{Name: c.GetName(), Status: c.GetStatus(), DurationMs: c.GetDurationMs(), FailureMessage: c.GetFailureMessage(),
+		WaitMs: c.GetWaitMs(), ActionMs: c.GetActionMs()}
+	for _, st := range c.GetSteps() {
+		cr.Steps = append(cr.Steps, stepReport{Name: st.GetName(), DurationMs: st.GetDurationMs()})
+	}
+	return cr
+}
+
+// writes report.json and junit.xml, no lock needed (report is a copy)
+func writeReport(dir string, r *runReport) error {
+	if err := os.MkdirAll(dir, 0755); err != nil {
+		return fmt.Errorf("failed to create report dir: %v", err)
+	}
+
+	data, err := json.MarshalIndent(r, "", "  ")
+	if err != nil {
+		return fmt.Errorf("failed to encode json report: %v", err)
+	}
+	if err := os.WriteFile(filepath.Join(dir, "report.json"), data, 0644); err != nil {
+		return fmt.Errorf("failed to write json report: %v", err)
+	}
+
+	data, err = xml.MarshalIndent(newJUnitReport(r), "", "  ")
+	if err != nil {
+		return fmt.Errorf("failed to encode junit report: %v", err)
+	}
+	data = append([]byte(xml.Header), data...)
+	if err := os.WriteFile(filepath.Join(dir, "junit.xml"), data, 0644); err != nil {
+		return fmt.Errorf("failed to write junit report: %v", err)
+	}
+	return nil
+}
+
+// junit xml, one testsuite per task (test file or a group of its tests) and one testcase per run_test call
+type junitTestSuites struct {
+	XMLName  xml.Name         `xml:"testsuites"`
+	Name     string           `xml:"name,attr"`
+	Tests    int              `xml:"tests,attr"`
+	Failures int              `xml:"failures,attr"`
+	Errors   int              `xml:"errors,attr"`
+	Skipped  int              `xml:"skipped,attr"`
+	Time     string           `xml:"time,attr"`
+	Suites   []junitTestSuite `xml:"testsuite"`
+}
+
+type junitTestSuite struct {
+	Name     string          `xml:"name,attr"`
+	Tests    int             `xml:"tests,attr"`
+	Failures int             `xml:"failures,attr"`
+	Errors   int             `xml:"errors,attr"`
+	Skipped  int             `xml:"skipped,attr"`
+	Time     string          `xml:"time,attr"`
+	Hostname string          `xml:"hostname,attr,omitempty"`
+	Cases    []junitTestCase `xml:"testcase"`
+}
+
+type junitTestCase struct {
+	ClassName string        `xml:"classname,attr"`
+	Name      string        `xml:"name,attr"`
+	Time      string        `xml:"time,attr"`
+	Failure   *junitFailure `xml:"failure,omitempty"`
+	Error     *junitFailure `xml:"error,omitempty"`
+	Skipped   *junitFailure `xml:"skipped,omitempty"`
+	SystemOut string        `xml:"system-out,omitempty"`
+}
+
+type junitFailure struct {
+	Message string `xml:"message,attr"`
+	Text    string `xml:",chardata"`
+}
+
+func junitSeconds(ms int64) string {
+	return fmt.Sprintf("%.3f", float64(ms)/1000)
+}
+
+func newJUnitReport(r *runReport) *junitTestSuites {
+	out := &junitTestSuites{
+		Name:     "test-executor",
+		Tests:    r.Tests,
+		Failures: r.Failures,
+		Errors:   r.Errors,
+		Skipped:  r.Skipped + r.Quarantined,
+		Time:     junitSeconds(r.DurationMs),
+	}
+	for _, t := range r.Tasks {
+		suite := junitTestSuite{Name: t.TaskID, Time: junitSeconds(t.DurationMs), Hostname: t.WorkerID}
+		className := strings.TrimSuffix(t.File, ".py")
+		for _, c := range t.Cases {
+			tc := junitTestCase{ClassName: className, Name: c.Name, Time: junitSeconds(c.DurationMs)}
+			switch {
+			case c.Status == "passed":
+			case c.Status == "skipped":
+				tc.Skipped = &junitFailure{Message: c.FailureMessage}
+				suite.Skipped++
+			case t.Quarantined:
+				// CI shouldn't go red because of a known flaky test, it shows up as skipped with the reason
+				tc.Skipped = &junitFailure{Message: "quarantined (flaky): " + c.FailureMessage}
+				suite.Skipped++
+			case c.Status == "failed":
+				tc.Failure = &junitFailure{Message: c.FailureMessage, Text: c.FailureMessage}
+				suite.Failures++
+			default:
+				tc.Error = &junitFailure{Message: c.FailureMessage, Text: c.FailureMessage}
+				suite.Errors++
+			}
+			// junit has no place for step timings, system-out is what CI shows next to the case
+			steps := []string{fmt.Sprintf("waiting on the site: %dms, webdriver actions: %dms", c.WaitMs, c.ActionMs)}
+			for _, st := range c.Steps {
+				steps = append(steps, fmt.Sprintf("step '%s': %dms", st.Name, st.DurationMs))
+			}
+			tc.SystemOut = strings.Join(steps, "\n")
+			suite.Tests++
+			suite.Cases = append(suite.Cases, tc)
+		}
+		out.Suites = append(out.Suites, suite)
+	}
+	return out
+}
+
+// chrome trace of a task attempt (GenericPage calls, waits, webdriver actions), REPORT_DIR/traces/<task>.lease-<n>.trace.json
+// so retries of a flaky test can be compared. open it in chrome://tracing or ui.perfetto.dev
+func writeTrace(dir string, res *pb.TaskResult) (string, error) {
+	dir = filepath.Join(dir, "traces")
+	if err := os.MkdirAll(dir, 0755); err != nil {
+		return "", fmt.Errorf("failed to create trace dir: %v", err)
+	}
+	path := filepath.Join(dir, fmt.Sprintf("%s.lease-%d.trace.json", unsafeFileChars.ReplaceAllString(res.GetTaskId(), "_"), res.GetLeaseId()))
+	if err := os.WriteFile(path, res.GetTrace(), 0644); err != nil {
+		return "", fmt.Errorf("failed to write trace: %v", err)
+	}
+	return path, nil
+}
@@ -0,0 +1,305 @@
+package main
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"os"
+	"path/filepath"
+	"sync"
+	"testing"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+
+	"google.golang.org/grpc/metadata"
+)
+
+// controller with n empty test files, no grpc in between: the tests call the handlers directly
+func newTestServer(tb testing.TB, n int, leaseTimeout time.Duration) *server {
+	tb.Helper()
+	dir := tb.TempDir()
+	testDir := filepath.Join(dir, "tests")
+	if err := os.MkdirAll(testDir, 0755); err != nil {
+		tb.Fatal(err)
+	}
+	var files []string
+	for i := 0; i < n; i++ {
+		path := filepath.Join(testDir, fmt.Sprintf("test_%05d.py", i))
+		if err := os.WriteFile(path, []byte("# never run\n"), 0644); err != nil {
+			tb.Fatal(err)
+		}
+		files = append(files, path)
+	}
+	specs, err := discoverTasks(files)
+	if err != nil {
+		tb.Fatal(err)
+	}
+	bundles, err := newBundleCache(testDir)
+	if err != nil {
+		tb.Fatal(err)
+	}
+	history, err := loadHistory(filepath.Join(dir, "history.json"))
+	if err != nil {
+		tb.Fatal(err)
+	}
+	s := &server{
+		workers:    make(map[string]WorkerInfo),
+		workerList: []string{},
+		queue:      newTaskQueue(specs, leaseTimeout, 2),
+		startedAt:  time.Now(),
+		bundles:    bundles,
+		reportDir:  filepath.Join(dir, "reports"),
+		logDir:     filepath.Join(dir, "logs"),
+		history:    history,
+		workerTTL:  defaultWorkerTTL,
+		metrics:    newMetrics(),
+	}
+	s.mu.metrics = s.metrics
+	return s
+}
+
+func handshake(tb testing.TB, s *server, workerID string, slots int) {
+	tb.Helper()
+	if _, err := s.StartHandshake(context.Background(), &pb.HandshakeRequest{Message: workerID, Slots: int32(slots)}); err != nil {
+		tb.Fatal(err)
+	}
+}
+
+// dispatch log lines aren't what these tests look at
+func quietStdout(tb testing.TB) {
+	devNull, err := os.Open(os.DevNull)
+	if err != nil {
+		tb.Fatal(err)
+	}
+	stdout := os.Stdout
+	os.Stdout = devNull
+	tb.Cleanup(func() {
+		os.Stdout = stdout
+		devNull.Close()
+	})
+}
+
+// SubscribeTasks stream without a connection, what's sent goes to a channel
+type fakeTaskStream struct {
+	ctx     context.Context
+	sent    chan *pb.TaskResponse
+	sendErr error
+}
+
+func newFakeTaskStream(ctx context.Context) *fakeTaskStream {
+	return &fakeTaskStream{ctx: ctx, sent: make(chan *pb.TaskResponse, 16)}
+}
+
+func (f *fakeTaskStream) Send(resp *pb.TaskResponse) error {
+	if f.sendErr != nil {
+		return f.sendErr
+	}
+	f.sent <- resp
+	return nil
+}
+func (f *fakeTaskStream) Context() context.Context     { return f.ctx }
+func (f *fakeTaskStream) SetHeader(metadata.MD) error  { return nil }
+func (f *fakeTaskStream) SendHeader(metadata.MD) error { return nil }
+func (f *fakeTaskStream) SetTrailer(metadata.MD)       {}
+func (f *fakeTaskStream) SendMsg(m any) error          { return nil }
+func (f *fakeTaskStream) RecvMsg(m any) error          { return nil }
+
+func TestRetryPrefersAnotherWorker(t *testing.T) {
+	q := newTestQueue("a")
+	now := time.Now()
+	first := q.acquire("w1", now, true)
+	if _, retried := q.retry("a", first.leaseID, "w1", now); !retried {
+		t.Fatal("failed attempt wasn't retried")
+	}
+	if got := q.acquire("w1", now.Add(time.Second), true); got != nil {
+		t.Fatalf("retry went back to w1 right away")
+	}
+	second := q.acquire("w1", now.Add(preferOtherWorkerFor+time.Second), true)
+	if second == nil {
+		t.Fatalf("w1 can't take the retry after %s", preferOtherWorkerFor)
+	}
+
+	// second failed attempt of two, nothing left to retry
+	if _, retried := q.retry("a", second.leaseID, "w1", now); retried {
+		t.Fatal("retried past maxAttempts")
+	}
+	if _, ok := q.complete("a", second.leaseID, false); !ok || !q.drained() {
+		t.Fatal("task out of attempts isn't done")
+	}
+}
+
+func TestRetryOfExpiredLeaseLeavesRerunAlone(t *testing.T) {
+	q := newTestQueue("a")
+	now := time.Now()
+	first := q.acquire("w1", now, true)
+	oldLease := first.leaseID
+	q.expire(now.Add(2 * time.Minute))
+	q.acquire("w2", now.Add(2*time.Minute), true)
+
+	if _, retried := q.retry("a", oldLease, "w1", now.Add(2*time.Minute)); !retried {
+		t.Fatal("failure of the expired lease should wait for the rerun")
+	}
+	if first.state != taskInFlight || first.workerID != "w2" || q.inFlightOn("w2") != 1 {
+		t.Fatalf("rerun on w2 was disturbed: state %d, holder %s", first.state, first.workerID)
+	}
+}
+
+func TestSubscribeTasksRunsUntilDrained(t *testing.T) {
+	quietStdout(t)
+	s := newTestServer(t, 5, time.Minute)
+	handshake(t, s, "w1", 1)
+	handshake(t, s, "w2", 1)
+
+	var wg sync.WaitGroup
+	var mu sync.Mutex
+	ran := make(map[string]string)
+	for _, workerID := range []string{"w1", "w2"} {
+		wg.Add(1)
+		go func(workerID string) {
+			defer wg.Done()
+			stream := newFakeTaskStream(context.Background())
+			done := make(chan error, 1)
+			go func() { done <- s.SubscribeTasks(&pb.TaskRequest{WorkerId: workerID}, stream) }()
+			for resp := range stream.sent {
+				if resp.GetDrained() {
+					break
+				}
+				mu.Lock()
+				if other, ok := ran[resp.GetTaskId()]; ok {
+					t.Errorf("'%s' sent to %s and %s", resp.GetTaskId(), other, workerID)
+				}
+				ran[resp.GetTaskId()] = workerID
+				mu.Unlock()
+				s.ReportResult(context.Background(), &pb.TaskResult{WorkerId: workerID, TaskId: resp.GetTaskId(),
+					LeaseId: resp.GetLeaseId(), Filename: resp.GetFilename(), Passed: true})
+			}
+			if err := <-done; err != nil {
+				t.Errorf("stream of %s ended with %v", workerID, err)
+			}
+		}(workerID)
+	}
+	wg.Wait()
+	if len(ran) != 5 || !s.queue.drained() {
+		t.Fatalf("%d tasks ran, drained %v", len(ran), s.queue.drained())
+	}
+	if n := s.metrics.streamTask.count; n != 5 {
+		t.Fatalf("stream dispatch latency observed %d times, want 5", n)
+	}
+}
+
+func TestSubscribeTasksRequeuesUnsent(t *testing.T) {
+	quietStdout(t)
+	s := newTestServer(t, 1, time.Minute)
+	handshake(t, s, "w1", 1)
+
+	stream := newFakeTaskStream(context.Background())
+	stream.sendErr = errors.New("connection reset")
+	if err := s.SubscribeTasks(&pb.TaskRequest{WorkerId: "w1"}, stream); err == nil {
+		t.Fatal("stream didn't end with the send error")
+	}
+	if pending, inFlight, _ := s.queue.counts(); pending != 1 || inFlight != 0 || s.queue.inFlightOn("w1") != 0 {
+		t.Fatalf("unsent task not back to pending: %d pending, %d in flight", pending, inFlight)
+	}
+}
+
+func TestSubscribeTasksEndsForRemovedWorker(t *testing.T) {
+	quietStdout(t)
+	s := newTestServer(t, 2, time.Minute)
+	handshake(t, s, "w1", 1)
+
+	stream := newFakeTaskStream(context.Background())
+	done := make(chan error, 1)
+	go func() { done <- s.SubscribeTasks(&pb.TaskRequest{WorkerId: "w1"}, stream) }()
+	<-stream.sent // busy with its first task, waiting on the lease
+
+	s.removeDeadWorkers(time.Now().Add(2 * defaultWorkerTTL))
+	select {
+	case err := <-done:
+		if err == nil {
+			t.Fatal("stream of a removed worker ended without an error")
+		}
+	case <-time.After(5 * time.Second):
+		t.Fatal("stream of a removed worker is still open")
+	}
+	if pending, _, _ := s.queue.counts(); pending != 2 {
+		t.Fatalf("removed worker's task not back to pending, %d pending", pending)
+	}
+}
+
+// dispatch throughput of the controller with a simulated fleet, handlers called in-process (no grpc, no
+// network) so it measures the locking and queue work of the dispatch path, log lines go to /dev/null.
+// one op is one task handed out and reported back
+//
+//	go test ./controller -run '^$' -bench Dispatch -benchtime 20000x
+func BenchmarkDispatchPoll(b *testing.B) {
+	benchmarkDispatch(b, 1000, func(s *server, workerID string) {
+		for {
+			resp, err := s.ReceiveTask(context.Background(), &pb.TaskRequest{WorkerId: workerID})
+			if err != nil {
+				b.Error(err)
+				return
+			}
+			if resp.GetDrained() {
+				return
+			}
+			if resp.GetTaskId() == "" {
+				time.Sleep(time.Millisecond) // real workers wait RetryAfterMs, shortened to keep the run short
+				continue
+			}
+			report(b, s, workerID, resp)
+		}
+	})
+}
+
+func BenchmarkDispatchStream(b *testing.B) {
+	benchmarkDispatch(b, 1000, func(s *server, workerID string) {
+		stream := newFakeTaskStream(context.Background())
+		done := make(chan error, 1)
+		go func() { done <- s.SubscribeTasks(&pb.TaskRequest{WorkerId: workerID}, stream) }()
+		for resp := range stream.sent {
+			if resp.GetDrained() {
+				break
+			}
+			report(b, s, workerID, resp)
+		}
+		if err := <-done; err != nil {
+			b.Error(err)
+		}
+	})
+}
+
+func benchmarkDispatch(b *testing.B, workers int, run func(s *server, workerID string)) {
+	quietStdout(b)
+	s := newTestServer(b, b.N, time.Hour)
+	for i := 0; i < workers; i++ {
+		handshake(b, s, fmt.Sprintf("sim-%05d", i), 1)
+	}
+
+	b.ResetTimer()
+	var wg sync.WaitGroup
+	for i := 0; i < workers; i++ {
+		wg.Add(1)
+		go func(workerID string) {
+			defer wg.Done()
+			run(s, workerID)
+		}(fmt.Sprintf("sim-%05d", i))
+	}
+	wg.Wait()
+	b.StopTimer()
+
+	if !s.queue.drained() {
+		b.Fatal("queue not drained")
+	}
+	b.ReportMetric(float64(b.N)/b.Elapsed().Seconds(), "tasks/s")
+	// share of the run server.mu was held, close to 100% would mean the single queue lock is the limit
+	b.ReportMetric(s.metrics.lockHold.sum/b.Elapsed().Seconds()*100, "%lock-held")
+}
+
+func report(b *testing.B, s *server, workerID string, resp *pb.TaskResponse) {
+	_, err := s.ReportResult(context.Background(), &pb.TaskResult{WorkerId: workerID, TaskId: resp.GetTaskId(),
+		LeaseId: resp.GetLeaseId(), Filename: resp.GetFilename(), Passed: true})
+	if err != nil {
+		b.Error(err)
+	}
+}
@@ -0,0 +1,115 @@
+package main
+
+import (
+	"fmt"
+	"strings"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+
+	"google.golang.org/grpc/codes"
+	"google.golang.org/grpc/status"
+)
+
+// task streams: instead of polling ReceiveTask, every worker slot keeps a SubscribeTasks stream open and the
+// controller sends it a task as soon as the slot is free and there's one to hand out. in between the stream
+// just waits: on its task's lease while the slot is busy, on s.changed while there's nothing for it.
+// the recheck is for what nothing signals, like the retry of a test that failed on this worker becoming
+// available to it after preferOtherWorkerFor
+const streamRecheck = retryAfter
+
+// channel closed on the next change the idle streams care about, s.mu must be held
+func (s *server) changes() <-chan struct{} {
+	if s.changed == nil {
+		s.changed = make(chan struct{})
+	}
+	return s.changed
+}
+
+// wakes up the idle task streams: tasks went back to pending, a worker was removed or the queue drained.
+// s.mu must be held
+func (s *server) notify() {
+	if s.changed != nil {
+		close(s.changed)
+		s.changed = nil
+	}
+}
+
+// one stream per worker slot, it ends with a drained response (or NotFound once the worker was removed)
+func (s *server) SubscribeTasks(req *pb.TaskRequest, stream pb.TestExecutor_SubscribeTasksServer) error {
+	workerID := req.GetWorkerId()
+	if _, _, ok := s.seen(workerID, time.Now()); !ok {
+		return status.Errorf(codes.NotFound, "unknown worker-%s, handshake first", workerID)
+	}
+
+	// last task sent on this stream, the slot is busy until its lease ends
+	var taskID string
+	var leaseID int64
+	for {
+		worker, otherWorkers, ok := s.lookupWorker(workerID)
+		if !ok {
+			return status.Errorf(codes.NotFound, "worker-%s was removed, handshake again", workerID)
+		}
+
+		var out strings.Builder
+		var resp *pb.TaskResponse
+		var err error
+		s.mu.Lock()
+		leasedAt := time.Now()
+		wait, busy := s.queue.leaseEnded(taskID, leaseID)
+		if !busy {
+			resp, err = s.assign(worker, otherWorkers, leasedAt, &out)
+			wait = s.changes()
+		}
+		s.mu.Unlock()
+		fmt.Print(out.String())
+
+		if err != nil {
+			fmt.Printf("failed to hand out a task to worker-%s: %v\n", workerID, err)
+			continue // that task is done now, on to the next one
+		}
+		if resp != nil && (resp.GetDrained() || resp.GetTaskId() != "") {
+			if err := stream.Send(resp); err != nil {
+				s.unsent(resp)
+				return err
+			}
+			if resp.GetDrained() {
+				return nil
+			}
+			if s.metrics != nil {
+				s.metrics.streamTask.observe(time.Since(leasedAt).Seconds()) // ReceiveTask's counterpart, log lines included
+			}
+			taskID, leaseID = resp.GetTaskId(), resp.GetLeaseId()
+			continue
+		}
+
+		// slot is busy or there's nothing for it right now
+		timer := time.NewTimer(streamRecheck)
+		select {
+		case <-wait:
+		case <-timer.C:
+		case <-stream.Context().Done():
+			timer.Stop()
+			return stream.Context().Err()
+		}
+		timer.Stop()
+	}
+}
+
+// the worker never got the task, it goes back to pending right away instead of waiting for the lease
+func (s *server) unsent(resp *pb.TaskResponse) {
+	if resp.GetTaskId() == "" {
+		return
+	}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if _, leased := s.queue.leaseEnded(resp.GetTaskId(), resp.GetLeaseId()); !leased {
+		return
+	}
+	if t := s.queue.tasks[resp.GetTaskId()]; t.holding {
+		s.queue.endHolding(t) // an earlier lease reported it in the meantime
+	} else {
+		s.queue.requeue([]*task{t})
+		s.notify()
+	}
+}
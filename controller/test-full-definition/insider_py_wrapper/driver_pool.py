@@ -0,0 +1,197 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+import atexit
+import os
+import queue
+import threading
+import time
+
+from insider_py_wrapper import load_profile, web_archive
+
+
+## Pool of warm Chrome sessions. Starting headless chrome costs seconds of CPU on the worker pods,
+## so tests take a driver from here and give it back instead of quitting it.
+## Sessions are reset between tests (cookies, storage, extra windows), the http cache is kept on purpose.
+
+# the options every test was building by hand
+def default_chrome_options():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    chrome_options.add_argument("--window-size=1200,943")
+    return chrome_options
+
+
+class DriverPool:
+    def __init__(self, size=1, options_factory=default_chrome_options):
+        self.size = size
+        self.options_factory = options_factory
+        self._idle = queue.LifoQueue()  # last released session is the warmest one
+        self._lock = threading.Lock()
+        self._launched = 0  # places taken in the pool, counts sessions that are still launching
+        self._sessions = set()  # every live session, idle or in use, so shutdown can quit all of them
+        self._in_use = set()  # sessions handed out and not given back yet
+        self._closed = False
+
+    # launch the missing sessions in parallel so the first tests don't wait for chrome
+    def warm(self):
+        threads = []
+        while self._reserve():
+            thread = threading.Thread(target=self._launch_idle, daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    # get a session, launches one if the pool isn't full yet, otherwise waits for a release
+    # (re-checks every second, a failed background launch frees its place in the pool)
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._checkout(self._idle.get_nowait())
+            except queue.Empty:
+                pass
+            if self._reserve():
+                return self._checkout(self._launch())
+            wait = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            if wait <= 0:
+                raise TimeoutError(f"No driver available in the pool within {timeout} seconds")
+            try:
+                return self._checkout(self._idle.get(timeout=wait))
+            except queue.Empty:
+                continue
+
+    # give a session back, it's reset for the next test. broken sessions are thrown away
+    def release(self, driver):
+        with self._lock:
+            self._in_use.discard(driver)
+        if not self._closed and self._reset(driver):
+            self._idle.put(driver)
+            return
+        self._discard(driver)
+
+    # gives back the sessions a test forgot to release (e.g. it crashed before release_driver)
+    def reclaim(self):
+        with self._lock:
+            leaked = list(self._in_use)
+        for driver in leaked:
+            self.release(driver)
+        return len(leaked)
+
+    # quits every session, also the ones a test didn't give back
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            sessions = list(self._sessions)
+        for driver in sessions:
+            self._discard(driver)
+
+    def _checkout(self, driver):
+        with self._lock:
+            self._in_use.add(driver)
+        return driver
+
+    def _reserve(self):
+        with self._lock:
+            if self._closed or self._launched >= self.size:
+                return False
+            self._launched += 1
+            return True
+
+    def _launch(self):
+        try:
+            driver = _new_driver(self.options_factory)
+        except Exception:
+            with self._lock:
+                self._launched -= 1
+            raise
+        with self._lock:
+            self._sessions.add(driver)
+        return driver
+
+    def _launch_idle(self):
+        try:
+            self._idle.put(self._launch())
+        except Exception as e:
+            print(f"Error: Can't launch chrome for the driver pool: {str(e)}")
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver not in self._sessions:
+                return  # not ours or already quit
+            self._sessions.discard(driver)
+            self._in_use.discard(driver)
+            self._launched -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # leave the session like a fresh chrome: one blank window, no cookies, no storage
+    def _reset(self, driver):
+        try:
+            handles = driver.window_handles
+            for handle in handles:
+                driver.switch_to.window(handle)
+                origin = driver.execute_script("return window.location.origin")
+                if origin and origin != "null":
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": origin,
+                        "storageTypes": "local_storage,session_storage,indexeddb,websql,service_workers,cache_storage",
+                    })
+                if handle != handles[0]:
+                    driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Error: Can't reset driver session, dropping it: {str(e)}")
+            return False
+
+
+# chrome with the INSIDER_LOAD_PROFILE applied (see load_profile.py) and going through the INSIDER_WEB_ARCHIVE
+# proxy if there's one (web_archive.py), or a fake session driving the site file in INSIDER_FAKE_SITE
+# (offline runs and bench/, see fake_driver.py)
+def _new_driver(options_factory):
+    site = os.environ.get("INSIDER_FAKE_SITE")
+    if site:
+        from insider_py_wrapper.fake_driver import FakeDriver, load_site
+        return FakeDriver(load_site(site))
+    profile = load_profile.current()
+    options = web_archive.configure_options(load_profile.configure_options(options_factory(), profile))
+    driver = webdriver.Chrome(options=options)
+    try:
+        load_profile.apply(driver, profile)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+
+# one pool per process, DRIVER_POOL_SIZE sessions, warmed in the background as soon as it's created
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # a bad INSIDER_LOAD_PROFILE raises here, before there's a pool nobody warms or shuts down
+            profile = load_profile.describe()
+            _pool = DriverPool(int(os.environ.get("DRIVER_POOL_SIZE", "1")))
+            print(f"Success: Driver pool of {_pool.size} session(s), load profile {profile}")
+            atexit.register(_pool.shutdown)
+            threading.Thread(target=_pool.warm, daemon=True).start()
+        return _pool
+
+# shortcuts for the test files: driver = get_driver() ... release_driver(driver)
+def get_driver(timeout=None):
+    return get_pool().acquire(timeout)
+
+def release_driver(driver):
+    get_pool().release(driver)
@@ -0,0 +1,310 @@
+import itertools
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import yaml
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException, StaleElementReferenceException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+
+## Stand-in for webdriver.Chrome that drives a site described in a yaml file instead of a browser,
+## so the tests and GenericPage run offline (bench/, no network and no chrome needed).
+## driver_pool hands these out instead of chrome sessions when INSIDER_FAKE_SITE points to a site file.
+##
+## site file, see bench/site/insider.yaml:
+##   latency:
+##     command_ms: 3        every webdriver command, the chromedriver round trip
+##     load_ms: 400         driver.get (and clicks that navigate) until the load event
+##   pages:
+##     "https://useinsider.com":
+##       title: "Insider"
+##       load_ms: 1500      this page loads slower than latency.load_ms
+##       elements:          keyed by the locator value, the same string as in locators/*.yaml
+##         '//*[@id="wt-cli-reject-btn"]':
+##           appears_after_ms: 300     rendered by js, not there right after the load
+##           displayed: true           (default true)
+##           enabled: true             (default true)
+##           count: 1                  matches of the locator (default 1)
+##           text: "Reject All"
+##           fields: {"span.position-department": "Quality Assurance"}   what extract_fields reads (text or href)
+##           navigates: "https://..."  clicking it loads this page
+##           opens: "https://..."      clicking it opens this page in a new window
+##           select2_after_ms: 500     a <select> behind select2, wait_for_select2_ready sees it after this
+## unknown urls load an empty page and unknown locators match nothing, like a page that changed
+
+class FakeSiteError(ValueError):
+    pass
+
+
+class FakeSite:
+    def __init__(self, path, data):
+        self.path = path
+        latency = data.get("latency") or {}
+        self.command_delay = latency.get("command_ms", 0) / 1000
+        self.load_delay = latency.get("load_ms", 0) / 1000
+        self.pages = {}
+        for url, page in (data.get("pages") or {}).items():
+            if not isinstance(page, dict) or not isinstance(page.get("elements", {}), dict):
+                raise FakeSiteError(f"{path}: page '{url}' has to be a mapping with an 'elements' mapping")
+            self.pages[url.rstrip("/")] = page
+
+    def page(self, url):
+        return self.pages.get((url or "").rstrip("/"), {})
+
+    def load_time(self, url):
+        if url == "about:blank":
+            return 0
+        load_ms = self.page(url).get("load_ms")
+        return self.load_delay if load_ms is None else load_ms / 1000
+
+
+_sites = {}
+_sites_lock = threading.Lock()
+
+# site files are read once per process, every fake session shares it
+def load_site(path):
+    path = os.path.abspath(path)
+    with _sites_lock:
+        if path not in _sites:
+            with open(path) as f:
+                data = yaml.safe_load(f) or {}
+            if not isinstance(data, dict):
+                raise FakeSiteError(f"{path}: top level has to be a mapping with 'latency' and 'pages'")
+            _sites[path] = FakeSite(path, data)
+        return _sites[path]
+
+
+class FakeElement(WebElement):
+    def __init__(self, driver, id_, spec, window, generation):
+        super().__init__(driver, id_)
+        self._spec = spec
+        self._window = window
+        self._generation = generation
+
+    # like a real element, it's gone once its page navigated
+    def _check(self):
+        self._parent._command()
+        window = self._parent._windows.get(self._window)
+        if window is None or window["generation"] != self._generation:
+            raise StaleElementReferenceException("element is not attached to the page document")
+
+    def is_displayed(self):
+        self._check()
+        return self._spec.get("displayed", True)
+
+    def is_enabled(self):
+        self._check()
+        return self._spec.get("enabled", True)
+
+    def click(self):
+        self._check()
+        self._parent._click(self)
+
+    @property
+    def text(self):
+        self._check()
+        return self._spec.get("text", "")
+
+    @property
+    def tag_name(self):
+        self._check()
+        return self._spec.get("tag", "div")
+
+    def get_attribute(self, name):
+        self._check()
+        return self._spec.get("attributes", {}).get(name)
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver._command()
+        if handle not in self._driver._windows:
+            raise NoSuchWindowException(f"no window '{handle}'")
+        self._driver._current = handle
+
+
+class FakeDriver:
+    _ids = itertools.count(1)
+    total_commands = 0  # every session's commands, bench/overhead.py counts them per test
+
+    def __init__(self, site):
+        self.site = site
+        self.commands = 0  # webdriver commands sent, the chromedriver round trips a real session would make
+        self._windows = {}  # handle -> {"url", "loaded_at", "generation"}
+        self._elements = {}  # element id -> FakeElement, for the w3c actions that refer to them by id
+        self._current = self._open_window("about:blank")
+        self.switch_to = _SwitchTo(self)
+
+    def _command(self):
+        self.commands += 1
+        FakeDriver.total_commands += 1
+        if self.site.command_delay:
+            time.sleep(self.site.command_delay)
+
+    def _open_window(self, url):
+        handle = f"fake-window-{next(self._ids)}"
+        self._windows[handle] = {"url": url, "loaded_at": time.monotonic(), "generation": next(self._ids)}
+        return handle
+
+    def _window(self):
+        window = self._windows.get(self._current)
+        if window is None:
+            raise NoSuchWindowException("current window was closed")
+        # window.open tabs load in the background, about:blank until then
+        navigating = window.get("navigating")
+        if navigating and time.monotonic() >= navigating[1]:
+            window.update(url=navigating[0], loaded_at=navigating[1], generation=next(self._ids), navigating=None)
+        return window
+
+    def _load(self, url):
+        if self.site.load_time(url):
+            time.sleep(self.site.load_time(url))
+        window = self._window()
+        window.update(url=url, loaded_at=time.monotonic(), generation=next(self._ids))
+        # elements of the old page are stale, nothing refers to them by id anymore
+        self._elements = {id_: e for id_, e in self._elements.items() if e._window != self._current}
+
+    # elements of the current page that are rendered by now
+    def _specs(self, locator_value):
+        window = self._window()
+        spec = self.site.page(window["url"]).get("elements", {}).get(locator_value)
+        if spec is None:
+            return None, window
+        if time.monotonic() - window["loaded_at"] < spec.get("appears_after_ms", 0) / 1000:
+            return None, window
+        return spec, window
+
+    def _click(self, element):
+        spec = element._spec
+        if spec.get("opens"):
+            handle = self._open_window("about:blank")
+            current, self._current = self._current, handle
+            self._load(spec["opens"])
+            self._current = current
+        elif spec.get("navigates"):
+            self._load(spec["navigates"])
+
+    # selenium api used by the tests, GenericPage and the driver pool
+
+    def get(self, url):
+        self._command()
+        self._load(url)
+
+    @property
+    def current_url(self):
+        self._command()
+        return self._window()["url"]
+
+    @property
+    def title(self):
+        self._command()
+        return self.site.page(self._window()["url"]).get("title", "")
+
+    @property
+    def window_handles(self):
+        self._command()
+        return list(self._windows)
+
+    @property
+    def current_window_handle(self):
+        self._command()
+        return self._current
+
+    def get_window_size(self, windowHandle="current"):
+        self._command()
+        return {"width": 1200, "height": 943}
+
+    def set_window_size(self, width, height, windowHandle="current"):
+        self._command()
+
+    def find_elements(self, by=None, value=None):
+        self._command()
+        return self._find(value)
+
+    def _find(self, value):
+        spec, window = self._specs(value)
+        if spec is None:
+            return []
+        elements = []
+        for _ in range(spec.get("count", 1)):
+            element = FakeElement(self, f"fake-element-{next(self._ids)}", spec, self._current, window["generation"])
+            self._elements[element.id] = element
+            elements.append(element)
+        return elements
+
+    def find_element(self, by=None, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"no element matching {by}={value}")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        from insider_py_wrapper import generic_page
+
+        self._command()
+        if script == generic_page._EXTRACT_FIELDS_JS:
+            rows = []
+            for element in self._find(args[0][1]):
+                row = {"element": element}
+                for name, (selector, _) in args[1].items():
+                    row[name] = element._spec.get("fields", {}).get(selector) if selector else element._spec.get("text")
+                rows.append(row)
+            return rows
+        if script == generic_page._CHECK_VISIBLE_JS:
+            states = {}
+            for name, (_, value) in args[0].items():
+                spec, _ = self._specs(value)
+                count = spec.get("count", 1) if spec else 0
+                states[name] = {"count": count, "displayed": bool(count) and spec.get("displayed", True),
+                                "enabled": bool(count) and spec.get("enabled", True)}
+            return states
+        if "document.readyState" in script:  # wait_for_page_settled, loaded and nothing changes afterwards
+            return {"ready": True, "ajax": 0, "resources": 0, "nodes": len(self.site.page(self._window()["url"]).get("elements", {}))}
+        if script == generic_page._SELECT2_READY_JS:
+            spec, window = self._specs(args[0])
+            return bool(spec) and time.monotonic() - window["loaded_at"] >= spec.get("select2_after_ms", 0) / 1000
+        if "window.open" in script:  # GenericPage._open_tab, doesn't wait for the page like get() does
+            handle = self._open_window("about:blank")
+            self._windows[handle]["navigating"] = (args[0], time.monotonic() + self.site.load_time(args[0]))
+            return None
+        if "window.location.origin" in script:  # driver pool's session reset
+            url = urlsplit(self._window()["url"])
+            return f"{url.scheme}://{url.netloc}" if url.netloc else "null"
+        return None  # scrollIntoView and the like, nothing to do without a page
+
+    # only the w3c actions ActionChains sends: a pointer move to an element and a click on it
+    def execute(self, driver_command, params=None):
+        self._command()
+        if driver_command == Command.W3C_ACTIONS:
+            for source in params["actions"]:
+                target = None
+                for action in source.get("actions", []):
+                    origin = action.get("origin")
+                    if action["type"] == "pointerMove" and isinstance(origin, dict):
+                        target = self._elements.get(next(iter(origin.values())))
+                        if target is not None:
+                            target._check()
+                    elif action["type"] == "pointerUp" and target is not None:
+                        self._click(target)
+        return {"value": None}
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        self._command()
+        return {}
+
+    def delete_all_cookies(self):
+        self._command()
+
+    def close(self):
+        self._command()
+        self._windows.pop(self._current, None)
+
+    def quit(self):
+        self._windows.clear()
+        self._elements.clear()
@@ -1,20 +1,137 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException, StaleElementReferenceException
 from selenium.webdriver.common.action_chains import ActionChains
 from enum import Enum
+import functools
+import inspect
+import time
+
+from insider_py_wrapper import tracing
+from insider_py_wrapper.locators import record_lookup
 
 
 ## Actions.CLICK or Actions.HOVER to do actions, passed as ref to this class methods. 
 Actions = Enum('Actions', ['CLICK', 'HOVER'])
 
+## js side of the batched lookups below, finds elements for a (kind, value) pair from _js_locator
+## visible() is close to selenium's is_displayed (styles + size), not the exact same atom
+_BATCH_JS_HELPERS = """
+    function find(root, kind, value) {
+        if (kind === 'xpath') {
+            var res = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var out = [];
+            for (var i = 0; i < res.snapshotLength; i++) out.push(res.snapshotItem(i));
+            return out;
+        }
+        return Array.prototype.slice.call(root.querySelectorAll(value));
+    }
+    function visible(el) {
+        if (!el.isConnected) return false;
+        var style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+        var rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+"""
+
+_EXTRACT_FIELDS_JS = _BATCH_JS_HELPERS + """
+    var locator = arguments[0], fields = arguments[1];
+    return find(document, locator[0], locator[1]).map(function (el) {
+        var row = {element: el};
+        Object.keys(fields).forEach(function (name) {
+            var selector = fields[name][0], prop = fields[name][1];
+            var node = selector ? el.querySelector(selector) : el;
+            if (!node) { row[name] = null; return; }
+            var value = node[prop];
+            row[name] = value === undefined ? node.getAttribute(prop) : value;
+        });
+        return row;
+    });
+"""
+
+_CHECK_VISIBLE_JS = _BATCH_JS_HELPERS + """
+    var locators = arguments[0], out = {};
+    Object.keys(locators).forEach(function (name) {
+        var found = find(document, locators[name][0], locators[name][1]);
+        var first = found[0];
+        out[name] = {
+            count: found.length,
+            displayed: !!first && visible(first),
+            enabled: !!first && !first.disabled
+        };
+    });
+    return out;
+"""
+
+_SELECT2_READY_JS = """
+    var select = document.querySelector(arguments[0]);
+    if (!select || !select.classList.contains('select2-hidden-accessible')) return false;
+    if (window.jQuery && (window.jQuery.active > 0 || !window.jQuery(select).data('select2'))) return false;
+    return select.options.length > 1;
+"""
+
+# turns a selenium (By, value) locator into something the js above can look up
+def _js_locator(by_method, locator_value):
+    if by_method == By.XPATH:
+        return ["xpath", locator_value]
+    if by_method == By.CSS_SELECTOR:
+        return ["css", locator_value]
+    if by_method == By.ID:
+        return ["css", f'[id="{locator_value}"]']
+    if by_method == By.NAME:
+        return ["css", f'[name="{locator_value}"]']
+    if by_method == By.CLASS_NAME:
+        return ["css", f'[class~="{locator_value}"]']
+    if by_method == By.TAG_NAME:
+        return ["css", locator_value]
+    raise ValueError(f"locator type '{by_method}' isn't supported in batched lookups, use xpath or css")
+
+# times a GenericPage (or AsyncGenericPage) method as a "call" span (see tracing.py), tagged with its
+# element_name or the locator when it has no name
+def _traced(method):
+    signature = inspect.signature(method)
+
+    def element_name(self, args, kwargs):
+        arguments = signature.bind_partial(self, *args, **kwargs).arguments
+        return (arguments.get("element_name") or arguments.get("locator_value")
+                or arguments.get("select_css") or arguments.get("cookie_reject_all_xpath"))
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            with tracing.span(method.__name__, "call", element_name(self, args, kwargs)):
+                return await method(self, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with tracing.span(method.__name__, "call", element_name(self, args, kwargs)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+# WebDriverWait(...).until as a wait span
+def _wait_until(driver, timeout, condition, name):
+    with tracing.span(name, "wait"):
+        return WebDriverWait(driver, timeout).until(condition)
+
 # class init (think url is a good idea here)
 class GenericPage: 
     def __init__(self, driver, url):
         self.driver = driver
         self.url = url
-        self.driver.get(url)
+        # (By, value) -> element found on the current page load, so the same element isn't looked up again
+        # references go stale when the page navigates/re-renders, is_element_visible looks it up again then
+        self._element_cache = {}
+        # blocks until the load event, DOMContentLoaded or not at all, per the load profile (load_profile.py),
+        # with the earlier ones the tests' is_page_loaded check waits for what they need
+        with tracing.span("get", "wait", url):
+            self.driver.get(url)
+
+    # drop the cached elements, after anything that changes the page without making them stale
+    def clear_element_cache(self):
+        self._element_cache.clear()
 
 
 ##### Below I define wrapper functions for selenium expected_conditions function 
@@ -24,11 +141,10 @@ class GenericPage:
 #### Functions below take By methods and locator value (xpath, css class, css selector)
 
     # page load checker / presence of an important element should be a good indicator
+    @_traced
     def is_page_loaded(self, timeout, by_method, locator_value):
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                expected_conditions.presence_of_element_located((by_method, locator_value))
-            )
+            element = _wait_until(self.driver, timeout, expected_conditions.presence_of_element_located((by_method, locator_value)), "presence_of_element_located")
             return element is not None
         except TimeoutException:
             print(f"Error: Timeout. Page did not load within {timeout} seconds")
@@ -38,13 +154,13 @@ class GenericPage:
             return False   
     
     # generic decline cookie function... because banner blocked some elements
+    @_traced
     def decline_cookies(self, cookie_reject_all_xpath, timeout):
         try:
-            cookie_reject_btn = WebDriverWait(self.driver, timeout).until(
-                expected_conditions.element_to_be_clickable((By.XPATH, cookie_reject_all_xpath))
-            )
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", cookie_reject_btn)
-            cookie_reject_btn.click()
+            cookie_reject_btn = _wait_until(self.driver, timeout, expected_conditions.element_to_be_clickable((By.XPATH, cookie_reject_all_xpath)), "element_to_be_clickable")
+            with tracing.span("click", "action"):
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", cookie_reject_btn)
+                cookie_reject_btn.click()
             print(f"Success: Cookie banner closed now")
             return True
         except TimeoutException:
@@ -55,6 +171,7 @@ class GenericPage:
             return False    
 
     # Combine visibility check and action in one method with variable names for logging
+    @_traced
     def perform_action_on_visible_element(self, timeout, by_method, locator_value, action: Actions, element_name: str):
         element, visible = self.is_element_visible(timeout, by_method, locator_value, element_name)
         if visible:
@@ -65,17 +182,29 @@ class GenericPage:
 
     # Check visibility of an element and if it is actionable (clickable/hoverable)
     # uses _find_element and used by other functions 
+    @_traced
     def is_element_visible(self, timeout, by_method, locator_value, element_name: str):
         try:
             element = self._find_element(timeout, by_method, locator_value)
-            if element and element.is_displayed() and element.is_enabled():
+            try:
+                with tracing.span("is_displayed", "action"):
+                    displayed = element is not None and element.is_displayed()
+            except (StaleElementReferenceException, NoSuchElementException):
+                # cached from an older page load, look it up again
+                self._element_cache.pop((by_method, locator_value), None)
+                element = self._find_element(timeout, by_method, locator_value)
+                with tracing.span("is_displayed", "action"):
+                    displayed = element is not None and element.is_displayed()
+            with tracing.span("is_enabled", "action"):
+                enabled = displayed and element.is_enabled()
+            if element and displayed and enabled:
                 print(f"Success: Element '{element_name}' is visible and enabled", flush=True)
                 return element, True
             else:
                 print(f"Error: Element '{element_name}' is not reachable or interactable", flush=True)
-                if element and not element.is_displayed():
+                if element and not displayed:
                     print(f"Element '{element_name}' is not displayed")
-                if element and not element.is_enabled():
+                if element and displayed and not enabled:
                     print(f"Element '{element_name}' is displayed but not enabled")
                 return None, False
         except Exception as e:
@@ -84,13 +213,16 @@ class GenericPage:
 
     # Perform an action (click/hover) on an element with variable name for logging. 
     # NOTE: This doesn't check if it's clickable, QA is responsible for making sure with other (is_visible etc.)
+    @_traced
     def perform_action(self, element, action: Actions, element_name: str):
         try:
             if action == Actions.CLICK:
-                ActionChains(self.driver).move_to_element_with_offset(element, 10, 10).click().perform()
+                with tracing.span("click", "action"):
+                    ActionChains(self.driver).move_to_element_with_offset(element, 10, 10).click().perform()
                 print(f"Success: Clicked element '{element_name}'")
             elif action == Actions.HOVER:
-                ActionChains(self.driver).move_to_element_with_offset(element, 20, 20).perform() 
+                with tracing.span("hover", "action"):
+                    ActionChains(self.driver).move_to_element_with_offset(element, 20, 20).perform() 
                 # Offset was needed to click/hover on some different screen res. 
                 print(f"Success: Hovered over element '{element_name}'")
             return True
@@ -102,13 +234,19 @@ class GenericPage:
     # is_visible uses this, it's good to separate it because gives better error explanation
     # than selenium's own locate element method. 
     # Other functions only references the element once it fetches, so no performance suffering
+    # found elements are cached per page load, only real lookups are timed for the locator stats
     def _find_element(self, timeout, by_method, locator_value): 
+        cached = self._element_cache.get((by_method, locator_value))
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                expected_conditions.presence_of_element_located((by_method, locator_value))
-            )
+            element = _wait_until(self.driver, timeout, expected_conditions.presence_of_element_located((by_method, locator_value)), "presence_of_element_located")
+            record_lookup(by_method, locator_value, time.perf_counter() - start)
+            self._element_cache[(by_method, locator_value)] = element
             return element
         except TimeoutException:
+            record_lookup(by_method, locator_value, time.perf_counter() - start)
             print(f"Error: Timeout. Element '{locator_value}' not found using locator '{by_method}' within {timeout} seconds", flush=True)
             return None
         except NoSuchElementException:
@@ -117,9 +255,13 @@ class GenericPage:
         
     # I added this later on because CSS selector will give multiple matches so the QA engineers can 
     # decide how/which they'll use the elements on the case. 
+    @_traced
     def get_all_elements(self, by_method, locator_value, element_name: str):
         try:
-            elements = self.driver.find_elements(by_method, locator_value)
+            start = time.perf_counter()
+            with tracing.span("find_elements", "action"):
+                elements = self.driver.find_elements(by_method, locator_value)
+            record_lookup(by_method, locator_value, time.perf_counter() - start)
             if len(elements) > 0:
                 print(f"Success: Found {len(elements)} elements matching '{element_name}'")
             else:
@@ -127,4 +269,219 @@ class GenericPage:
             return elements
         except Exception as e:
             print(f"Error: Unable to find elements matching '{element_name}': {str(e)}")
-            return []    
\ No newline at end of file
+            return []
+
+
+##### Condition based waits, instead of time.sleep(x) in the tests.
+##### all of them poll quickly at first and back off (50ms doubling up to 500ms),
+##### so they return as soon as the page is ready but don't hammer chrome on slow pages
+
+    # polls condition() until it returns something truthy, returns that or None on timeout
+    def _poll(self, condition, timeout, interval=0.05, max_interval=0.5):
+        with tracing.span(getattr(condition, "__name__", "poll"), "wait"):
+            return self._poll_until(condition, timeout, interval, max_interval)
+
+    def _poll_until(self, condition, timeout, interval, max_interval):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = condition()
+                if value:
+                    return value
+            except Exception:
+                pass  # page is navigating / element went stale, just poll again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+    # document loaded, no jquery ajax running and no new requests/dom nodes for quiet_period seconds
+    # (network idle is approximated with the resource timing entries, selenium can't see the network itself)
+    @_traced
+    def wait_for_page_settled(self, timeout, quiet_period=0.5):
+        script = """
+            return {
+                ready: document.readyState === 'complete',
+                ajax: window.jQuery ? window.jQuery.active : 0,
+                resources: performance.getEntriesByType('resource').length,
+                nodes: document.getElementsByTagName('*').length
+            };
+        """
+        last = {"snapshot": None, "since": time.monotonic()}
+
+        def settled():
+            state = self.driver.execute_script(script)
+            if not state["ready"] or state["ajax"] > 0:
+                last["snapshot"] = None
+                return False
+            snapshot = (state["resources"], state["nodes"])
+            now = time.monotonic()
+            if snapshot != last["snapshot"]:
+                last["snapshot"], last["since"] = snapshot, now
+                return False
+            return now - last["since"] >= quiet_period
+
+        start = time.monotonic()
+        if self._poll(settled, timeout):
+            print(f"Success: Page settled after {time.monotonic() - start:.2f} seconds", flush=True)
+            return True
+        print(f"Error: Timeout. Page kept changing for {timeout} seconds", flush=True)
+        return False
+
+    # waits until the locator matches at least one element and the count doesn't change for stable_for seconds
+    # (lists that are filled in with js/ajax), returns the elements or [] on timeout
+    @_traced
+    def wait_for_element_count_stable(self, timeout, by_method, locator_value, element_name: str, stable_for=0.5):
+        last = {"count": -1, "since": time.monotonic(), "elements": []}
+
+        def stable():
+            elements = self.driver.find_elements(by_method, locator_value)
+            now = time.monotonic()
+            if len(elements) != last["count"]:
+                last["count"], last["since"] = len(elements), now
+                return False
+            last["elements"] = elements
+            return len(elements) > 0 and now - last["since"] >= stable_for
+
+        if self._poll(stable, timeout):
+            print(f"Success: '{element_name}' count settled at {last['count']}", flush=True)
+            return last["elements"]
+        print(f"Error: Timeout. '{element_name}' count didn't settle within {timeout} seconds (last count {last['count']})", flush=True)
+        return []
+
+    # select2 ignores clicks until it's initialized on the <select> and the options are loaded,
+    # select_css is the original <select> (e.g. "#filter-by-location"), not the select2 container
+    @_traced
+    def wait_for_select2_ready(self, timeout, select_css, element_name: str):
+        def select2_ready():
+            return self.driver.execute_script(_SELECT2_READY_JS, select_css)
+
+        if self._poll(select2_ready, timeout):
+            print(f"Success: select2 dropdown '{element_name}' is ready", flush=True)
+            return True
+        print(f"Error: Timeout. select2 dropdown '{element_name}' wasn't ready within {timeout} seconds", flush=True)
+        return False
+
+
+##### Batched lookups, one execute_script round trip instead of find_element/get_attribute/is_displayed
+##### calls per element (each of those is an http request to chromedriver)
+
+    # reads fields from every element matching the locator in one call, returns a list of plain dicts
+    # fields: {"name": (css selector inside the element or None for the element itself, "innerText"/"href"/any property or attribute)}
+    # every dict also has the WebElement under "element" for clicking/hovering it later
+    @_traced
+    def extract_fields(self, by_method, locator_value, fields: dict, element_name: str):
+        try:
+            with tracing.span("execute_script", "action"):
+                rows = self.driver.execute_script(_EXTRACT_FIELDS_JS, _js_locator(by_method, locator_value), {name: list(field) for name, field in fields.items()})
+            if rows:
+                print(f"Success: Read {len(fields)} field(s) from {len(rows)} elements matching '{element_name}'")
+            else:
+                print(f"Error: No elements found matching '{element_name}'")
+            return rows or []
+        except Exception as e:
+            print(f"Error: Unable to read fields of '{element_name}': {str(e)}")
+            return []
+
+    # visibility of many locators in one call: {"name": (By, value)} -> {"name": {"count", "displayed", "enabled"}}
+    # (displayed/enabled are for the first match), polls until every locator is displayed or timeout runs out
+    @_traced
+    def check_elements_visible(self, timeout, locators: dict):
+        js_locators = {name: _js_locator(*locator) for name, locator in locators.items()}
+        last = {"states": {name: {"count": 0, "displayed": False, "enabled": False} for name in locators}}
+
+        def all_visible():
+            last["states"] = self.driver.execute_script(_CHECK_VISIBLE_JS, js_locators)
+            return all(state["displayed"] for state in last["states"].values())
+
+        self._poll(all_visible, timeout)
+        for name, state in last["states"].items():
+            if state["displayed"] and state["enabled"]:
+                print(f"Success: Element '{name}' is visible and enabled", flush=True)
+            elif state["count"] == 0:
+                print(f"Error: Element '{name}' not found within {timeout} seconds", flush=True)
+            else:
+                print(f"Error: Element '{name}' is not reachable or interactable (displayed: {state['displayed']}, enabled: {state['enabled']})", flush=True)
+        return last["states"]
+
+
+##### Links checked in parallel tabs, instead of click -> wait in a new window -> switch back for every link.
+##### window.open doesn't wait for the page, so the browser loads up to max_tabs pages at the same time
+##### and they're polled in turns, the slow redirects overlap instead of adding up
+
+    # opens every url in a new tab (max_tabs at a time) and checks that it ends up on a url containing
+    # expected_url_part (e.g. "View Role" links redirecting to lever.co) within timeout seconds.
+    # returns one {"url", "final_url", "passed", "seconds"} per url in the same order, tabs are closed
+    # and the original window is active again afterwards
+    @_traced
+    def verify_urls_in_tabs(self, urls, expected_url_part, timeout, element_name: str, max_tabs=3):
+        original = self.driver.current_window_handle
+        pending = list(enumerate(urls))
+        open_tabs = {}  # handle -> (index, url, started)
+        outcomes = [None] * len(urls)
+
+        def finish(index, url, started, final_url):
+            outcomes[index] = {"url": url, "final_url": final_url, "passed": expected_url_part in final_url,
+                               "seconds": round(time.monotonic() - started, 2)}
+
+        try:
+            with tracing.span("verify_urls", "wait"):
+                interval = 0.05
+                while pending or open_tabs:
+                    if pending and len(open_tabs) < max_tabs:
+                        self.driver.switch_to.window(original)  # new tabs are opened from the page
+                    while pending and len(open_tabs) < max_tabs:
+                        index, url = pending[0]  # taken off after _open_tab, if that raises it's failed below with the rest
+                        handle = self._open_tab(url)
+                        pending.pop(0)
+                        if handle is None:
+                            finish(index, url, time.monotonic(), "")  # popup blocked or the tab didn't open
+                            continue
+                        open_tabs[handle] = (index, url, time.monotonic())
+
+                    finished = False
+                    for handle, (index, url, started) in list(open_tabs.items()):
+                        self.driver.switch_to.window(handle)
+                        current_url = self.driver.current_url
+                        if expected_url_part in current_url or time.monotonic() - started >= timeout:
+                            finish(index, url, started, current_url)
+                            del open_tabs[handle]  # outcome is in, a close that fails doesn't undo it
+                            finished = True
+                            self.driver.close()
+                    if open_tabs and not finished:
+                        time.sleep(interval)
+                        interval = min(interval * 2, 0.5)
+                    elif finished:
+                        interval = 0.05
+        except Exception as e:
+            print(f"Error: Checking '{element_name}' in tabs failed: {str(e)}", flush=True)
+            for handle, (index, url, started) in open_tabs.items():
+                finish(index, url, started, "")
+        finally:
+            for handle in open_tabs:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception:
+                    pass
+            self.driver.switch_to.window(original)
+        # urls left pending when something failed never got a tab
+        for index, url in enumerate(urls):
+            if outcomes[index] is None:
+                finish(index, url, time.monotonic(), "")
+
+        passed = sum(outcome["passed"] for outcome in outcomes)
+        if passed == len(outcomes):
+            print(f"Success: All {len(outcomes)} '{element_name}' ended up on '{expected_url_part}'", flush=True)
+        else:
+            print(f"Error: {len(outcomes) - passed} of {len(outcomes)} '{element_name}' didn't end up on '{expected_url_part}' within {timeout} seconds", flush=True)
+        return outcomes
+
+    # new tab that starts loading url without waiting for it, returns its handle or None
+    # (counted as waiting, it's part of the verify_urls span)
+    def _open_tab(self, url):
+        before = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        opened = [handle for handle in self.driver.window_handles if handle not in before]
+        return opened[0] if opened else None
@@ -0,0 +1,292 @@
+import argparse
+import atexit
+import hashlib
+import http.client
+import http.server
+import io
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+
+## Record/replay of the site. With INSIDER_WEB_ARCHIVE=<dir> the driver pool points chrome at a local proxy:
+##   INSIDER_WEB_ARCHIVE_MODE=record   responses are fetched from the site and written into the archive
+##   INSIDER_WEB_ARCHIVE_MODE=replay   (default) only the archive is served, nothing leaves the machine and
+##                                     requests that weren't recorded get a 404
+## so tests can be iterated on (and the executor benchmarked) offline, without the site's latency and on pods
+## that can't reach the internet.
+##
+## archive dir:
+##   index.jsonl     one line per recorded response {"key", "status", "headers", "body"}, appended as they come
+##                   in, a later line for the same request wins
+##   bodies/<sha256> the bodies as the site sent them (content-encoding kept)
+## requests are matched on method + url + a hash of the request body, GETs that weren't recorded then on the
+## url without its query string (cache busters). other methods only replay an exact match, a POST with another
+## body is another request. https goes through CONNECT and is terminated with a self-signed certificate made
+## with openssl, chrome is started with --ignore-certificate-errors for it.
+##
+## standalone, e.g. for controller/test-full-definition/main.py with its own chrome:
+##   python3 -m insider_py_wrapper.web_archive record ./archive --port 8899
+
+# not forwarded, they're about the connection to the proxy and not the request
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "proxy-authorization", "proxy-authenticate",
+              "te", "trailers", "transfer-encoding", "upgrade", "content-length"}
+# recording has to get full responses, a 304 replayed to a chrome without the cached copy is an empty page
+CONDITIONAL = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"}
+
+
+class WebArchive:
+    def __init__(self, path, mode="replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown web archive mode '{mode}', known: record, replay")
+        self.path = os.path.abspath(path)
+        self.mode = mode
+        self.served = self.missed = self.recorded = 0
+        self._entries = {}  # key -> entry
+        self._by_path = {}  # GET url without the query string -> last GET recorded for it
+        self._lock = threading.Lock()
+        index = os.path.join(self.path, "index.jsonl")
+        if mode == "replay":
+            if not os.path.exists(index):
+                raise FileNotFoundError(f"no web archive at {self.path}, record one first (INSIDER_WEB_ARCHIVE_MODE=record)")
+            with open(index) as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+        os.makedirs(os.path.join(self.path, "bodies"), exist_ok=True)
+
+    @staticmethod
+    def key(method, url, body=b""):
+        key = f"{method} {url}"
+        if body:
+            key += " " + hashlib.sha256(body).hexdigest()[:16]
+        return key
+
+    def _add(self, entry):
+        self._entries[entry["key"]] = entry
+        method, url = entry["key"].split(" ")[:2]
+        if method == "GET":
+            self._by_path[url.split("?")[0]] = entry
+
+    # (status, headers, body) recorded for the request, None if it wasn't
+    def lookup(self, method, url, body=b""):
+        with self._lock:
+            entry = self._entries.get(self.key(method, url, body))
+            if entry is None and method == "GET":
+                entry = self._by_path.get(url.split("?")[0])
+            if entry is None:
+                self.missed += 1
+                return None
+            self.served += 1
+        with open(os.path.join(self.path, "bodies", entry["body"]), "rb") as f:
+            return entry["status"], entry["headers"], f.read()
+
+    def record(self, method, url, body, status, headers, data):
+        digest = hashlib.sha256(data).hexdigest()
+        body_path = os.path.join(self.path, "bodies", digest)
+        entry = {"key": self.key(method, url, body), "status": status, "headers": headers, "body": digest}
+        with self._lock:
+            if not os.path.exists(body_path):
+                with open(body_path, "wb") as f:
+                    f.write(data)
+            with open(os.path.join(self.path, "index.jsonl"), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._add(entry)
+            self.recorded += 1
+
+    def summary(self):
+        if self.mode == "record":
+            return f"web archive {self.path}: {self.recorded} response(s) recorded"
+        return f"web archive {self.path}: {self.served} response(s) served, {self.missed} request(s) not in the archive"
+
+
+# writes to the (tls) socket of the connection, all or nothing like the handler's own writer
+class _SocketWriter(io.BufferedIOBase):
+    def __init__(self, sock):
+        self._sock = sock
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._sock.sendall(data)
+        return len(data)
+
+
+class _ProxyHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tunnel = None  # host:port of the CONNECT this connection is in, requests in it are https
+
+    def log_message(self, format, *args):
+        pass  # a line per request drowns the test output, the summary is printed on shutdown
+
+    # https: the tunnel is terminated here, the requests in it are handled like plain ones
+    def do_CONNECT(self):
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        try:
+            conn = self.server.tls.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            self.close_connection = True
+            return
+        self.tunnel = self.path
+        self.connection = conn
+        self.rfile = conn.makefile("rb", self.rbufsize)
+        self.wfile = _SocketWriter(conn)
+        self.close_connection = False
+
+    def _url(self):
+        if self.tunnel is None:
+            return self.path  # plain http, proxied requests have the absolute url
+        host = self.tunnel[:-len(":443")] if self.tunnel.endswith(":443") else self.tunnel
+        return f"https://{host}{self.path}"
+
+    def _proxy(self):
+        url = self._url()
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        archive = self.server.archive
+        if archive.mode == "replay":
+            response = archive.lookup(self.command, url, body)
+            if response is None:
+                self._send(404, [["Content-Type", "text/plain"]], f"not in the web archive: {self.command} {url}".encode())
+                return
+            self._send(*response)
+            return
+        try:
+            status, headers, data = self._fetch(url, body)
+        except (OSError, http.client.HTTPException) as e:
+            self._send(502, [["Content-Type", "text/plain"]], f"can't fetch {url}: {str(e)}".encode())
+            return
+        archive.record(self.command, url, body, status, headers, data)
+        self._send(status, headers, data)
+
+    def _fetch(self, url, body):
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            conn = http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=30,
+                                               context=self.server.upstream_tls)
+        else:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP | CONDITIONAL}
+        try:
+            conn.request(self.command, (parts.path or "/") + (f"?{parts.query}" if parts.query else ""), body or None, headers)
+            resp = conn.getresponse()
+            data = resp.read()  # un-chunked, still compressed if the site compressed it
+            return resp.status, [[k, v] for k, v in resp.getheaders() if k.lower() not in HOP_BY_HOP], data
+        finally:
+            conn.close()
+
+    def _send(self, status, headers, data):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status not in (204, 304) and not 100 <= status < 200:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+            return
+        self.end_headers()
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _proxy
+
+
+class ArchiveProxy(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, archive, port=0):
+        super().__init__(("127.0.0.1", port), _ProxyHandler)
+        self.archive = archive
+        self.upstream_tls = ssl.create_default_context()
+        self._cert_dir = tempfile.mkdtemp(prefix="insider-web-archive-")
+        self.tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.tls.set_alpn_protocols(["http/1.1"])
+        self.tls.load_cert_chain(*_self_signed_cert(self._cert_dir))
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+
+# one certificate for every host, chrome ignores the name mismatch with --ignore-certificate-errors
+def _self_signed_cert(folder):
+    cert, key = os.path.join(folder, "cert.pem"), os.path.join(folder, "key.pem")
+    result = subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "30",
+                             "-subj", "/CN=insider-web-archive", "-keyout", key, "-out", cert],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"openssl couldn't make the proxy certificate: {result.stderr.strip()}")
+    return cert, key
+
+
+def chrome_arguments(proxy):
+    return [f"--proxy-server=http://{proxy.address}", "--proxy-bypass-list=<-loopback>", "--ignore-certificate-errors"]
+
+
+_proxy = None
+_proxy_lock = threading.Lock()
+
+# the process' proxy for INSIDER_WEB_ARCHIVE, started on first use, None without it
+def get_proxy():
+    global _proxy
+    path = os.environ.get("INSIDER_WEB_ARCHIVE")
+    if not path:
+        return None
+    with _proxy_lock:
+        if _proxy is None:
+            archive = WebArchive(path, os.environ.get("INSIDER_WEB_ARCHIVE_MODE", "replay"))
+            _proxy = ArchiveProxy(archive).start()
+            atexit.register(_stop_proxy)
+            print(f"Success: Web archive proxy on {_proxy.address}, {archive.mode} {archive.path}")
+        return _proxy
+
+
+def _stop_proxy():
+    _proxy.stop()
+    print(f"Success: {_proxy.archive.summary()}")
+
+
+# chrome options of a new session, sends it through the archive proxy if there's one
+def configure_options(options):
+    proxy = get_proxy()
+    if proxy is not None:
+        for argument in chrome_arguments(proxy):
+            options.add_argument(argument)
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="record/replay proxy for the sites the tests visit")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("archive", help="archive folder, created when recording")
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+
+    proxy = ArchiveProxy(WebArchive(args.archive, args.mode), args.port)
+    print(f"Success: Web archive proxy on {proxy.address}, {args.mode} {proxy.archive.path}")
+    print(f"start chrome with {' '.join(chrome_arguments(proxy))}")
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+        print(f"Success: {proxy.archive.summary()}")
+
+
+if __name__ == "__main__":
+    main()
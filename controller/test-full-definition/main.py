@@ -1,29 +1,18 @@
-from selenium import webdriver
 from selenium.webdriver.support import expected_conditions
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-import time # had to use for simulating real-user clicks some js stuff (like selector2) doesn't work well with selenium functions
 
 from insider_py_wrapper.helpers import run_test
 from insider_py_wrapper.generic_page import GenericPage, Actions
+from insider_py_wrapper.driver_pool import get_driver, release_driver
 
 ###############################
 ####### Driver Options ########
 ###############################
 
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--disable-software-rasterizer")
-chrome_options.add_argument("--window-size=1200,943")
-
-driver = webdriver.Chrome(
-   options=chrome_options
-)
+# warm chrome session from the wrapper's pool (same options we used to build here), given back at the end
+driver = get_driver()
 
 window_size = driver.get_window_size()
 print(f"Window Width: {window_size['width']}")
@@ -89,11 +78,13 @@ def test_navigate_to_careers():
     success = homepage.perform_action_on_visible_element(3, By.XPATH, navbar_company_career_xpath, Actions.CLICK, "Careers Link")
     assert success, "Careers link not clickable"
 
-    location_section, visible = homepage.is_element_visible(5, By.XPATH, location_section_xpath, "Locations Section")
-    assert visible, "Locations section not visible"
-
-    elements = homepage.get_all_elements(By.CSS_SELECTOR, life_section_css_selector, "Life at Insider Elements")
-    assert len(elements) > 0, "No element found for life_section"
+    # both sections checked in one js call
+    sections = homepage.check_elements_visible(5, {
+        "Locations Section": (By.XPATH, location_section_xpath),
+        "Life at Insider Elements": (By.CSS_SELECTOR, life_section_css_selector),
+    })
+    assert sections["Locations Section"]["displayed"], "Locations section not visible"
+    assert sections["Life at Insider Elements"]["count"] > 0, "No element found for life_section"
 
 # Test Case: go to career page, do filtering (Step 3)
 def test_filter_qa_jobs():
@@ -108,44 +99,42 @@ def test_filter_qa_jobs():
     arrows = homepage.get_all_elements(By.CLASS_NAME, "select2-selection__arrow", "Filter dropdown arrow elements")
     assert len(arrows) > 0, "Can't pick selector2 arrows..."
 
-   # I had to add this because selector2 is weird and selenium functions like wait until loaded etc.
-   # doesn't quite work with it. It takes a while to load and function, spamming the arrow was the easiest solution. Can be improved 
-    istanbul_visible = False
-    for _ in range(10):  # spam until selector2 is loaded
-        success = homepage.perform_action(arrows[0], Actions.CLICK, "Location filter arrow")
-        assert success, "Can't open location dropdown"
-        
-        # Check if istanbul is visible 
-        element, istanbul_visible = homepage.is_element_visible(2, By.XPATH, "//li[contains(text(), 'Istanbul, Turkey')]", "Istanbul, Turkey selection")
-        if istanbul_visible:
-            print("Success: istanbul finally visible")
-            break
-        else:
-            print("Retry: istanbul not visible yet, trying again")
-    
-    assert istanbul_visible, "Error: istanbul didn't become visible at all"
+    # selector2 ignores the clicks until it's initialized and has the options from ajax,
+    # so wait for that instead of spamming the arrow
+    assert homepage.wait_for_select2_ready(20, "#filter-by-location", "Location filter"), "Location filter never got ready"
+
+    success = homepage.perform_action(arrows[0], Actions.CLICK, "Location filter arrow")
+    assert success, "Can't open location dropdown"
 
     # select Istanbul, Turkey (cannot do full xpath since it's dynamic, but it contains Istanbul, Turkey everytime)
-    success = homepage.perform_action_on_visible_element(20, By.XPATH, "//li[contains(text(), 'Istanbul, Turkey')]", Actions.CLICK, "Istanbul, Turkey selection")
+    success = homepage.perform_action_on_visible_element(10, By.XPATH, "//li[contains(text(), 'Istanbul, Turkey')]", Actions.CLICK, "Istanbul, Turkey selection")
     assert success, "Can't click on on Istanbul, Turkey. Perhaps dropdown is not opened?"
 
    # select QA on the 2nd selector2 dropdown
+    assert homepage.wait_for_select2_ready(10, "#filter-by-department", "Department filter"), "Department filter never got ready"
     success = homepage.perform_action(arrows[1], Actions.CLICK, "Department filter arrow")
     assert success, "Can't open department dropdown"
 
     success = homepage.perform_action_on_visible_element(7, By.XPATH, "//li[contains(text(), 'Quality Assurance')]", Actions.CLICK, "Quality Assurance selection")
     assert success, "Can't select qa from dropdown"
 
-    time.sleep(10)
+    # filtered list is loaded/animated in with js, wait until the page and the list stop changing
+    homepage.wait_for_page_settled(15)
 
     # get job listing blocks 
-    job_listings = homepage.get_all_elements(By.CSS_SELECTOR, "div.position-list-item", "Job Listings")
+    job_listings = homepage.wait_for_element_count_stable(15, By.CSS_SELECTOR, "div.position-list-item", "Job Listings", stable_for=1)
     assert len(job_listings) > 0, "No job listings found"
+
+    # department/location of every listing in one js call instead of 4 webdriver requests per listing
+    job_listings = homepage.extract_fields(By.CSS_SELECTOR, "div.position-list-item", {
+        "department": ("span.position-department", "innerText"),
+        "location": ("div.position-location", "innerText"),
+    }, "Job Listings")
     
     # loop through found job blocks
     for job in job_listings:
-        department = job.find_element(By.CSS_SELECTOR, "span.position-department").get_attribute("innerText")
-        location = job.find_element(By.CSS_SELECTOR, "div.position-location").get_attribute("innerText")
+        department = job["department"] or ""
+        location = job["location"] or ""
         
         print(department, "+", location)
         
@@ -153,10 +142,10 @@ def test_filter_qa_jobs():
         assert "Istanbul, Turkey" in location, f"Job Location does not contain 'Istanbul, Turkey': {location}"
        
         # hover on the selected job so "view role is visible"
-        homepage.perform_action(job, Actions.CLICK, "Hovering over the job listing")
+        homepage.perform_action(job["element"], Actions.CLICK, "Hovering over the job listing")
 
         # click on view role, css selector seems the easiest
-        view_role_button = job.find_element(By.CSS_SELECTOR, "a.btn")
+        view_role_button = job["element"].find_element(By.CSS_SELECTOR, "a.btn")
         homepage.perform_action(view_role_button, Actions.CLICK, "View Role Button")
 
         driver.switch_to.window(driver.window_handles[-1])
@@ -185,4 +174,4 @@ run_test("Test cookie banner decline all", test_decline_cookies)
 run_test("Test: navigate to careers", test_navigate_to_careers)
 run_test("Test: filter QA jobs", test_filter_qa_jobs)
 print("all jobs ran, results are printed out")
-driver.quit() 
\ No newline at end of file
+release_driver(driver) 
\ No newline at end of file
@@ -1,70 +1,32 @@
-from selenium import webdriver
-from selenium.webdriver.support import expected_conditions
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-import time # had to use for simulating real-user clicks some js stuff (like selector2) doesn't work well with selenium functions
-
-from insider_py_wrapper.helpers import run_test
+from insider_py_wrapper.helpers import test_case, run_tests, step
 from insider_py_wrapper.generic_page import GenericPage, Actions
+from insider_py_wrapper.driver_pool import get_driver, release_driver
+from insider_py_wrapper.locators import load_locators
 
 ###############################
 ####### Driver Options ########
 ###############################
 
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-software-rasterizer")
-chrome_options.add_argument("--window-size=1200,943")
-
-driver = webdriver.Chrome(
-   options=chrome_options
-)
+# warm chrome session from the wrapper's pool (same options we used to build here), given back at the end
+driver = get_driver()
 
 window_size = driver.get_window_size()
 print(f"Window Width: {window_size['width']}")
 print(f"Window Height: {window_size['height']}")
 
-## xpaths - will/can be moved to a YAML file later on for ease of maintainability
-cookie_banner_xpath = '//*[@id="cookie-law-info-bar"]'
-cookie_reject_all_xpath = '//*[@id="wt-cli-reject-btn"]'
-
-navbar_company_xpath = '//*[@id="navbarNavDropdown"]/ul[1]/li[6]'
-navbar_company_career_xpath = '//*[@id="navbarNavDropdown"]/ul[1]/li[6]/div/div[2]/a[2]'
-burger_icon_xpath = '//*[@id="navigation"]/div[2]/a[2]'
-burger_company_xpath = '//*[@id="navbarNavDropdown"]/ul[1]/li[6]'
-location_section_xpath = '//*[@id="career-our-location"]'
-see_all_teams_btn_xpath = '//*[@id="career-find-our-calling"]/div/div/a'
-
-quality_assurance_header_xpath = '//*[@id="career-find-our-calling"]/div/div/div[2]/div[12]/div[2]'
-see_all_qa_jobs_btn_xpath = '//*[@id="page-head"]/div/div/div[1]/div/div/a'
-
-team_section_xpath = '//*[@id="career-find-our-calling"]'
-
-filter_by_location_dropd_xpath = '//*[@id="select2-filter-by-location-container"]'
-istanbul_option_xpath = '//li[contains(text(), "Istanbul, Turkey")]'
-filter_by_department_dropd_xpath = '//*[@id="select2-filter-by-department-container"]'
-qa_option_xpath = '//li[contains(text(), "Quality Assurance")]'
-
-# life section doesn't have a section id, maybe intentional? so we can't do a relative xpath
-# and absolute xpath is not very dependable
-# but there's an aria-label="life-at-insider-X" on all the elements under that section (and no other)
-# (only 11 instances of life-at-insider-X, all of them under life section)
-life_section_css_selector = "[aria-label^='life-at-insider']"
+## locators are in locators/insider.yaml (shipped with the test), compiled once per runner process
+locators = load_locators("locators/insider.yaml", relative_to=__file__)
+qa_page = locators.page("qa_careers_page")
 
 
 # NOTE: Enforced test creations as functions, so we can mark a test as fail and continue
 # executing other uncoupled tests
-# All defined functions are ran via run_test from helpers.py
+# All defined functions are registered with @test_case and ran via run_tests (run_test) from helpers.py
 # assert makes it easy to show exactly which action failed. 
 
 # NOTE: 
 # GenericPage functions requires a small description as well, so QAs can exactly pinpoint the problembs via logs 
-# e.g. assert homepage.perform_action_on_visible_element(3, By.XPATH, navbar_company_xpath, Actions.CLICK, "Company Menu")
+# e.g. assert homepage.perform_action_on_visible_element(3, *home_page.navbar_company, Actions.CLICK, "Company Menu")
 # will write Clicked element: Company Menu, or Fail and logs: Error: Element Company Menu is not visible or interactable for action '{action}'
 
 # Test Case: go to career page, do filtering (Step 3)
@@ -75,93 +37,80 @@ life_section_css_selector = "[aria-label^='life-at-insider']"
     
 homepage = GenericPage(driver, "https://useinsider.com/careers/quality-assurance/")
 
+@test_case("Test: filter QA jobs")
 def test_filter_qa_jobs():
 
     
-    assert homepage.is_page_loaded(10, By.XPATH, "//h1[contains(text(), 'Quality Assurance')]"), "QA page failed to load"
+    assert homepage.is_page_loaded(10, *qa_page.header), "QA page failed to load"
+
+    with step("open all QA jobs"):
+        # Click see all QA jobs button
+        success = homepage.perform_action_on_visible_element(3, *qa_page.see_all_qa_jobs_btn, Actions.CLICK, "See all QA job Button")
+        assert success, "See all QA jobs button not clickable"
 
-    # Click see all QA jobs button
-    success = homepage.perform_action_on_visible_element(3, By.XPATH, see_all_qa_jobs_btn_xpath, Actions.CLICK, "See all QA job Button")
-    assert success, "See all QA jobs button not clickable"
+    with step("filter by Istanbul and Quality Assurance"):
+        # Get dropdown elements  (by clicking on selector2 arrow btn)
+        arrows = homepage.get_all_elements(*qa_page.filter_arrows, "Filter dropdown arrow elements")
+        assert len(arrows) > 0, "Can't pick selector2 arrows..."
 
-    # Get dropdown elements  (by clicking on selector2 arrow btn)
-    arrows = homepage.get_all_elements(By.CLASS_NAME, "select2-selection__arrow", "Filter dropdown arrow elements")
-    assert len(arrows) > 0, "Can't pick selector2 arrows..."
+        # selector2 ignores the clicks until it's initialized and has the options from ajax,
+        # so wait for that instead of spamming the arrow
+        assert homepage.wait_for_select2_ready(20, qa_page.location_filter_select.value, "Location filter"), "Location filter never got ready"
 
-   # I had to add this because selector2 is weird and selenium functions like wait until loaded etc.
-   # doesn't quite work with it. It takes a while to load and function, spamming the arrow was the easiest solution. Can be improved 
-    istanbul_visible = False
-    for _ in range(10):  # spam until selector2 is loaded
         success = homepage.perform_action(arrows[0], Actions.CLICK, "Location filter arrow")
         assert success, "Can't open location dropdown"
-        
-        # Check if istanbul is visible 
-        element, istanbul_visible = homepage.is_element_visible(2, By.XPATH, "//li[contains(text(), 'Istanbul, Turkey')]", "Istanbul, Turkey selection")
-        if istanbul_visible:
-            print("Success: istanbul finally visible")
-            break
-        else:
-            print("Retry: istanbul not visible yet, trying again")
-    
-    assert istanbul_visible, "Error: istanbul didn't become visible at all"
-
-    # select Istanbul, Turkey (cannot do full xpath since it's dynamic, but it contains Istanbul, Turkey everytime)
-    success = homepage.perform_action_on_visible_element(20, By.XPATH, "//li[contains(text(), 'Istanbul, Turkey')]", Actions.CLICK, "Istanbul, Turkey selection")
-    assert success, "Can't click on on Istanbul, Turkey. Perhaps dropdown is not opened?"
-
-   # select QA on the 2nd selector2 dropdown
-    success = homepage.perform_action(arrows[1], Actions.CLICK, "Department filter arrow")
-    assert success, "Can't open department dropdown"
-
-    success = homepage.perform_action_on_visible_element(7, By.XPATH, "//li[contains(text(), 'Quality Assurance')]", Actions.CLICK, "Quality Assurance selection")
-    assert success, "Can't select qa from dropdown"
-
-    time.sleep(10)
-
-    # get job listing blocks 
-    job_listings = homepage.get_all_elements(By.CSS_SELECTOR, "div.position-list-item", "Job Listings")
-    assert len(job_listings) > 0, "No job listings found"
-    
-    # loop through found job blocks
-    for job in job_listings:
-        department = job.find_element(By.CSS_SELECTOR, "span.position-department").get_attribute("innerText")
-        location = job.find_element(By.CSS_SELECTOR, "div.position-location").get_attribute("innerText")
-        
-        print(department, "+", location)
-        
-        assert "Quality Assurance" in department, f"job Department does not contain 'Quality Assurance', it contains: {department}"
-        assert "Istanbul, Turkey" in location, f"job Location does not contain 'Istanbul, Turkey': {location}"
-       
-        # hover on the selected job so "view role is visible"
-        homepage.perform_action(job, Actions.CLICK, "Hovering over the job listing")
-
-        # click on view role, css selector seems the easiest
-        view_role_button, visible = homepage.is_element_visible(10, By.CSS_SELECTOR, "a.btn", "View Role Button")
-        assert visible, "Error: View Role button is not visible"
-        homepage.perform_action(view_role_button, Actions.CLICK, "View Role Button")
-    
-        WebDriverWait(driver, 10).until(lambda d: len(d.window_handles) > 1)
-        driver.switch_to.window(driver.window_handles[-1])
-
-        # NOTE: create GenericPage function for checking if url contains blabla for the below code: (skipped, not needed)
-        try:
-                # assert url to has lever - this has problems in kubernetes, the container works perfectly on my host but on k8s node it didn't work initially
-                assert WebDriverWait(homepage.driver, 20).until(
-                    expected_conditions.url_contains("lever.co")
-                ), "job didn't show role in Lever.co"
-                
-                print(f"Success: redirected to lever.co for {department} role")
-
-        except TimeoutException:
-                print("Error: can't go to lever.co")
-
-        driver.switch_to.window(driver.window_handles[0])
-
-        # wait until we're back
-        assert homepage.is_page_loaded(10, By.XPATH, "//title[contains(text(), 'Insider')]"), "Can't go back to insider page"
-        print("back to qa page for testing other job listings (if exists)")
 
-# running Tests - run_test(<Description for logging>, <Defined test function()>)
-run_test("Test: filter QA jobs", test_filter_qa_jobs)
+        # select Istanbul, Turkey (cannot do full xpath since it's dynamic, but it contains Istanbul, Turkey everytime)
+        success = homepage.perform_action_on_visible_element(10, *qa_page.istanbul_option, Actions.CLICK, "Istanbul, Turkey selection")
+        assert success, "Can't click on on Istanbul, Turkey. Perhaps dropdown is not opened?"
+
+       # select QA on the 2nd selector2 dropdown
+        assert homepage.wait_for_select2_ready(10, qa_page.department_filter_select.value, "Department filter"), "Department filter never got ready"
+        success = homepage.perform_action(arrows[1], Actions.CLICK, "Department filter arrow")
+        assert success, "Can't open department dropdown"
+
+        success = homepage.perform_action_on_visible_element(7, *qa_page.qa_option, Actions.CLICK, "Quality Assurance selection")
+        assert success, "Can't select qa from dropdown"
+
+        # filtered list is loaded/animated in with js, wait until the page and the list stop changing
+        homepage.wait_for_page_settled(15)
+
+    with step("verify job listings"):
+        # get job listing blocks 
+        job_listings = homepage.wait_for_element_count_stable(15, *qa_page.job_listing, "Job Listings", stable_for=1)
+        assert len(job_listings) > 0, "No job listings found"
+
+        # department/location and the "View Role" link of every listing in one js call
+        job_listings = homepage.extract_fields(*qa_page.job_listing, {
+            "department": (qa_page.job_department.value, "innerText"),
+            "location": (qa_page.job_location.value, "innerText"),
+            "role_url": (qa_page.view_role_btn.value, "href"),
+        }, "Job Listings")
+
+        # loop through found job blocks
+        for job in job_listings:
+            department = job["department"] or ""
+            location = job["location"] or ""
+
+            print(department, "+", location)
+
+            assert "Quality Assurance" in department, f"job Department does not contain 'Quality Assurance', it contains: {department}"
+            assert "Istanbul, Turkey" in location, f"job Location does not contain 'Istanbul, Turkey': {location}"
+
+    with step("verify role pages"):
+        # every "View Role" page is opened in its own tab (a few at a time) instead of click -> wait -> switch back
+        # per listing, the lever.co redirects load at the same time
+        role_urls = [job["role_url"] for job in job_listings if job["role_url"]]
+        assert len(role_urls) == len(job_listings), "Some job listings don't have a View Role link"
+
+        # NOTE: lever.co had problems in kubernetes (works on my host), so a failed redirect is only logged like before
+        for outcome in homepage.verify_urls_in_tabs(role_urls, "lever.co", 20, "View Role pages"):
+            if outcome["passed"]:
+                print(f"Success: redirected to lever.co in {outcome['seconds']}s for {outcome['url']}")
+            else:
+                print(f"Error: can't go to lever.co from {outcome['url']} (ended up on '{outcome['final_url']}')")
+
+# running Tests - every @test_case(<Description for logging>) above, dependencies first
+run_tests()
 print("all jobs ran, results are printed out")
-driver.quit() 
\ No newline at end of file
+release_driver(driver) 
\ No newline at end of file
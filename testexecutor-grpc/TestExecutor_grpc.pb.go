@@ -21,6 +21,11 @@ const _ = grpc.SupportPackageIsVersion9
 const (
 	TestExecutor_StartHandshake_FullMethodName = "/testgrpc.TestExecutor/StartHandshake"
 	TestExecutor_ReceiveTask_FullMethodName    = "/testgrpc.TestExecutor/ReceiveTask"
+	TestExecutor_ReportResult_FullMethodName   = "/testgrpc.TestExecutor/ReportResult"
+	TestExecutor_StreamLogs_FullMethodName     = "/testgrpc.TestExecutor/StreamLogs"
+	TestExecutor_FetchBundle_FullMethodName    = "/testgrpc.TestExecutor/FetchBundle"
+	TestExecutor_Heartbeat_FullMethodName      = "/testgrpc.TestExecutor/Heartbeat"
+	TestExecutor_SubscribeTasks_FullMethodName = "/testgrpc.TestExecutor/SubscribeTasks"
 )
 
 // TestExecutorClient is the client API for TestExecutor service.
@@ -30,7 +35,12 @@ const (
 // Service definition for handling workers and tasks
 type TestExecutorClient interface {
 	StartHandshake(ctx context.Context, in *HandshakeRequest, opts ...grpc.CallOption) (*HandshakeResponse, error)
-	ReceiveTask(ctx context.Context, in *Empty, opts ...grpc.CallOption) (*TaskResponse, error)
+	ReceiveTask(ctx context.Context, in *TaskRequest, opts ...grpc.CallOption) (*TaskResponse, error)
+	ReportResult(ctx context.Context, in *TaskResult, opts ...grpc.CallOption) (*Empty, error)
+	StreamLogs(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[LogBatch, LogAck], error)
+	FetchBundle(ctx context.Context, in *BundleRequest, opts ...grpc.CallOption) (*Bundle, error)
+	Heartbeat(ctx context.Context, in *HeartbeatRequest, opts ...grpc.CallOption) (*HeartbeatResponse, error)
+	SubscribeTasks(ctx context.Context, in *TaskRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[TaskResponse], error)
 }
 
 type testExecutorClient struct {
@@ -51,7 +61,7 @@ func (c *testExecutorClient) StartHandshake(ctx context.Context, in *HandshakeRe
 	return out, nil
 }
 
-func (c *testExecutorClient) ReceiveTask(ctx context.Context, in *Empty, opts ...grpc.CallOption) (*TaskResponse, error) {
+func (c *testExecutorClient) ReceiveTask(ctx context.Context, in *TaskRequest, opts ...grpc.CallOption) (*TaskResponse, error) {
 	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
 	out := new(TaskResponse)
 	err := c.cc.Invoke(ctx, TestExecutor_ReceiveTask_FullMethodName, in, out, cOpts...)
@@ -61,6 +71,68 @@ func (c *testExecutorClient) ReceiveTask(ctx context.Context, in *Empty, opts ..
 	return out, nil
 }
 
+func (c *testExecutorClient) ReportResult(ctx context.Context, in *TaskResult, opts ...grpc.CallOption) (*Empty, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(Empty)
+	err := c.cc.Invoke(ctx, TestExecutor_ReportResult_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *testExecutorClient) StreamLogs(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[LogBatch, LogAck], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &TestExecutor_ServiceDesc.Streams[0], TestExecutor_StreamLogs_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[LogBatch, LogAck]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TestExecutor_StreamLogsClient = grpc.ClientStreamingClient[LogBatch, LogAck]
+
+func (c *testExecutorClient) FetchBundle(ctx context.Context, in *BundleRequest, opts ...grpc.CallOption) (*Bundle, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(Bundle)
+	err := c.cc.Invoke(ctx, TestExecutor_FetchBundle_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *testExecutorClient) Heartbeat(ctx context.Context, in *HeartbeatRequest, opts ...grpc.CallOption) (*HeartbeatResponse, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(HeartbeatResponse)
+	err := c.cc.Invoke(ctx, TestExecutor_Heartbeat_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *testExecutorClient) SubscribeTasks(ctx context.Context, in *TaskRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[TaskResponse], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &TestExecutor_ServiceDesc.Streams[1], TestExecutor_SubscribeTasks_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[TaskRequest, TaskResponse]{ClientStream: stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TestExecutor_SubscribeTasksClient = grpc.ServerStreamingClient[TaskResponse]
+
 // TestExecutorServer is the server API for TestExecutor service.
 // All implementations must embed UnimplementedTestExecutorServer
 // for forward compatibility.
@@ -68,7 +140,12 @@ func (c *testExecutorClient) ReceiveTask(ctx context.Context, in *Empty, opts ..
 // Service definition for handling workers and tasks
 type TestExecutorServer interface {
 	StartHandshake(context.Context, *HandshakeRequest) (*HandshakeResponse, error)
-	ReceiveTask(context.Context, *Empty) (*TaskResponse, error)
+	ReceiveTask(context.Context, *TaskRequest) (*TaskResponse, error)
+	ReportResult(context.Context, *TaskResult) (*Empty, error)
+	StreamLogs(grpc.ClientStreamingServer[LogBatch, LogAck]) error
+	FetchBundle(context.Context, *BundleRequest) (*Bundle, error)
+	Heartbeat(context.Context, *HeartbeatRequest) (*HeartbeatResponse, error)
+	SubscribeTasks(*TaskRequest, grpc.ServerStreamingServer[TaskResponse]) error
 	mustEmbedUnimplementedTestExecutorServer()
 }
 
@@ -82,9 +159,24 @@ type UnimplementedTestExecutorServer struct{}
 func (UnimplementedTestExecutorServer) StartHandshake(context.Context, *HandshakeRequest) (*HandshakeResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method StartHandshake not implemented")
 }
-func (UnimplementedTestExecutorServer) ReceiveTask(context.Context, *Empty) (*TaskResponse, error) {
+func (UnimplementedTestExecutorServer) ReceiveTask(context.Context, *TaskRequest) (*TaskResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method ReceiveTask not implemented")
 }
+func (UnimplementedTestExecutorServer) ReportResult(context.Context, *TaskResult) (*Empty, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method ReportResult not implemented")
+}
+func (UnimplementedTestExecutorServer) StreamLogs(grpc.ClientStreamingServer[LogBatch, LogAck]) error {
+	return status.Errorf(codes.Unimplemented, "method StreamLogs not implemented")
+}
+func (UnimplementedTestExecutorServer) FetchBundle(context.Context, *BundleRequest) (*Bundle, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method FetchBundle not implemented")
+}
+func (UnimplementedTestExecutorServer) Heartbeat(context.Context, *HeartbeatRequest) (*HeartbeatResponse, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method Heartbeat not implemented")
+}
+func (UnimplementedTestExecutorServer) SubscribeTasks(*TaskRequest, grpc.ServerStreamingServer[TaskResponse]) error {
+	return status.Errorf(codes.Unimplemented, "method SubscribeTasks not implemented")
+}
 func (UnimplementedTestExecutorServer) mustEmbedUnimplementedTestExecutorServer() {}
 func (UnimplementedTestExecutorServer) testEmbeddedByValue()                      {}
 
@@ -125,7 +217,7 @@ func _TestExecutor_StartHandshake_Handler(srv interface{}, ctx context.Context,
 }
 
 func _TestExecutor_ReceiveTask_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
-	in := new(Empty)
+	in := new(TaskRequest)
 	if err := dec(in); err != nil {
 		return nil, err
 	}
@@ -137,11 +229,83 @@ func _TestExecutor_ReceiveTask_Handler(srv interface{}, ctx context.Context, dec
 		FullMethod: TestExecutor_ReceiveTask_FullMethodName,
 	}
 	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
-		return srv.(TestExecutorServer).ReceiveTask(ctx, req.(*Empty))
+		return srv.(TestExecutorServer).ReceiveTask(ctx, req.(*TaskRequest))
 	}
 	return interceptor(ctx, in, info, handler)
 }
 
+func _TestExecutor_ReportResult_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(TaskResult)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(TestExecutorServer).ReportResult(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: TestExecutor_ReportResult_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(TestExecutorServer).ReportResult(ctx, req.(*TaskResult))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _TestExecutor_StreamLogs_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(TestExecutorServer).StreamLogs(&grpc.GenericServerStream[LogBatch, LogAck]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TestExecutor_StreamLogsServer = grpc.ClientStreamingServer[LogBatch, LogAck]
+
+func _TestExecutor_FetchBundle_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(BundleRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(TestExecutorServer).FetchBundle(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: TestExecutor_FetchBundle_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(TestExecutorServer).FetchBundle(ctx, req.(*BundleRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _TestExecutor_Heartbeat_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(HeartbeatRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(TestExecutorServer).Heartbeat(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: TestExecutor_Heartbeat_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(TestExecutorServer).Heartbeat(ctx, req.(*HeartbeatRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _TestExecutor_SubscribeTasks_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(TaskRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(TestExecutorServer).SubscribeTasks(m, &grpc.GenericServerStream[TaskRequest, TaskResponse]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type TestExecutor_SubscribeTasksServer = grpc.ServerStreamingServer[TaskResponse]
+
 // TestExecutor_ServiceDesc is the grpc.ServiceDesc for TestExecutor service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -157,7 +321,30 @@ var TestExecutor_ServiceDesc = grpc.ServiceDesc{
 			MethodName: "ReceiveTask",
 			Handler:    _TestExecutor_ReceiveTask_Handler,
 		},
+		{
+			MethodName: "ReportResult",
+			Handler:    _TestExecutor_ReportResult_Handler,
+		},
+		{
+			MethodName: "FetchBundle",
+			Handler:    _TestExecutor_FetchBundle_Handler,
+		},
+		{
+			MethodName: "Heartbeat",
+			Handler:    _TestExecutor_Heartbeat_Handler,
+		},
+	},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "StreamLogs",
+			Handler:       _TestExecutor_StreamLogs_Handler,
+			ClientStreams: true,
+		},
+		{
+			StreamName:    "SubscribeTasks",
+			Handler:       _TestExecutor_SubscribeTasks_Handler,
+			ServerStreams: true,
+		},
 	},
-	Streams:  []grpc.StreamDesc{},
 	Metadata: "TestExecutor.proto",
 }
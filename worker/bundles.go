@@ -0,0 +1,133 @@
+package main
+
+import (
+	"context"
+	"crypto/sha256"
+	"encoding/binary"
+	"encoding/hex"
+	"fmt"
+	"log"
+	"os"
+	"path/filepath"
+	"sort"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// local content-addressed cache of test bundles (test file + locators etc.), BUNDLE_CACHE_DIR/<hash>/...
+// tasks only carry the bundle hash, a bundle is downloaded with FetchBundle the first time it's seen
+// and reused for every task of the same test after that
+const (
+	defaultBundleCacheDir = "bundles"
+	bundleCacheSize       = 20 // bundles kept on disk, least recently used ones are removed
+)
+
+type bundleStore struct {
+	dir    string
+	client pb.TestExecutorClient
+}
+
+func newBundleStore(client pb.TestExecutorClient) *bundleStore {
+	dir := os.Getenv("BUNDLE_CACHE_DIR")
+	if dir == "" {
+		dir = defaultBundleCacheDir
+	}
+	return &bundleStore{dir: dir, client: client}
+}
+
+// folder of the bundle, downloaded first if it isn't cached yet
+func (b *bundleStore) get(hash string) (string, error) {
+	if decoded, err := hex.DecodeString(hash); err != nil || len(decoded) != sha256.Size {
+		return "", fmt.Errorf("invalid bundle hash '%s'", hash)
+	}
+	dir := filepath.Join(b.dir, hash)
+	if _, err := os.Stat(dir); err == nil {
+		now := time.Now()
+		os.Chtimes(dir, now, now) // for the lru cleanup
+		return dir, nil
+	}
+
+	ctx, cancel := context.WithTimeout(context.Background(), time.Minute)
+	defer cancel()
+	bundle, err := b.client.FetchBundle(ctx, &pb.BundleRequest{Hash: hash})
+	if err != nil {
+		return "", fmt.Errorf("failed to fetch bundle: %v", err)
+	}
+	if got := bundleHash(bundle.GetFiles()); got != hash {
+		return "", fmt.Errorf("bundle %s came with hash %s", hash, got)
+	}
+
+	// written to a temp folder and renamed, so a half written bundle is never in the cache
+	if err := os.MkdirAll(b.dir, 0755); err != nil {
+		return "", err
+	}
+	tmp, err := os.MkdirTemp(b.dir, ".tmp-")
+	if err != nil {
+		return "", err
+	}
+	defer os.RemoveAll(tmp)
+	for _, f := range bundle.GetFiles() {
+		path := filepath.FromSlash(f.GetPath())
+		if !filepath.IsLocal(path) {
+			return "", fmt.Errorf("refusing to write bundle file outside of the bundle: %s", f.GetPath())
+		}
+		if err := os.MkdirAll(filepath.Join(tmp, filepath.Dir(path)), 0755); err != nil {
+			return "", err
+		}
+		if err := os.WriteFile(filepath.Join(tmp, path), f.GetContent(), 0644); err != nil {
+			return "", err
+		}
+	}
+	if err := os.Rename(tmp, dir); err != nil {
+		if _, statErr := os.Stat(dir); statErr == nil {
+			return dir, nil // someone else downloaded it in the meantime
+		}
+		return "", err
+	}
+	fmt.Printf("downloaded bundle %s (%d files)\n", hash[:12], len(bundle.GetFiles()))
+	b.prune()
+	return dir, nil
+}
+
+// keeps the bundleCacheSize most recently used bundles
+func (b *bundleStore) prune() {
+	entries, err := os.ReadDir(b.dir)
+	if err != nil {
+		log.Printf("failed to clean up bundle cache: %v", err)
+		return
+	}
+	type cached struct {
+		path string
+		used time.Time
+	}
+	var bundles []cached
+	for _, e := range entries {
+		info, err := e.Info()
+		if err != nil || !e.IsDir() || e.Name()[0] == '.' {
+			continue
+		}
+		bundles = append(bundles, cached{filepath.Join(b.dir, e.Name()), info.ModTime()})
+	}
+	if len(bundles) <= bundleCacheSize {
+		return
+	}
+	sort.Slice(bundles, func(i, j int) bool { return bundles[i].used.After(bundles[j].used) })
+	for _, old := range bundles[bundleCacheSize:] {
+		os.RemoveAll(old.path)
+	}
+}
+
+// same as the controller's bundleHash: sha256 over path, size and content of every file
+func bundleHash(files []*pb.BundleFile) string {
+	h := sha256.New()
+	var size [8]byte
+	for _, f := range files {
+		h.Write([]byte(f.GetPath()))
+		h.Write([]byte{0})
+		binary.BigEndian.PutUint64(size[:], uint64(len(f.GetContent())))
+		h.Write(size[:])
+		h.Write(f.GetContent())
+	}
+	return hex.EncodeToString(h.Sum(nil))
+}
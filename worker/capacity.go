@@ -0,0 +1,85 @@
+package main
+
+import (
+	"bufio"
+	"fmt"
+	"os"
+	"runtime"
+	"strconv"
+	"strings"
+)
+
+// what the worker tells the controller at handshake. cpu/memory come from the cgroup limits when the
+// pod has them (that's what chrome will actually get), otherwise from the machine.
+// slots (tests at the same time, one chrome each) default to what both cpu and memory allow,
+// WORKER_SLOTS overrides it
+const (
+	cpuPerSlot    = 1000               // millicores per headless chrome + python runner
+	memoryPerSlot = 1024 * 1024 * 1024 // bytes per headless chrome + python runner
+)
+
+type capacity struct {
+	cpuMillis   int64
+	memoryBytes int64
+	slots       int
+}
+
+func detectCapacity() (capacity, error) {
+	c := capacity{cpuMillis: detectCPUMillis(), memoryBytes: detectMemoryBytes()}
+
+	if v := os.Getenv("WORKER_SLOTS"); v != "" {
+		slots, err := strconv.Atoi(v)
+		if err != nil || slots < 1 {
+			return c, fmt.Errorf("invalid WORKER_SLOTS '%s': must be a positive number", v)
+		}
+		c.slots = slots
+		return c, nil
+	}
+
+	c.slots = int(c.cpuMillis / cpuPerSlot)
+	if c.memoryBytes > 0 {
+		c.slots = min(c.slots, int(c.memoryBytes/memoryPerSlot))
+	}
+	c.slots = max(c.slots, 1)
+	return c, nil
+}
+
+// cgroup v2 cpu.max ("max 100000" or "<quota> <period>"), falls back to the core count
+func detectCPUMillis() int64 {
+	if data, err := os.ReadFile("/sys/fs/cgroup/cpu.max"); err == nil {
+		fields := strings.Fields(string(data))
+		if len(fields) == 2 && fields[0] != "max" {
+			quota, err1 := strconv.ParseInt(fields[0], 10, 64)
+			period, err2 := strconv.ParseInt(fields[1], 10, 64)
+			if err1 == nil && err2 == nil && period > 0 {
+				return quota * 1000 / period
+			}
+		}
+	}
+	return int64(runtime.NumCPU()) * 1000
+}
+
+// cgroup v2 memory.max, falls back to MemTotal, 0 if neither can be read
+func detectMemoryBytes() int64 {
+	if data, err := os.ReadFile("/sys/fs/cgroup/memory.max"); err == nil {
+		if limit, err := strconv.ParseInt(strings.TrimSpace(string(data)), 10, 64); err == nil {
+			return limit
+		}
+	}
+	f, err := os.Open("/proc/meminfo")
+	if err != nil {
+		return 0
+	}
+	defer f.Close()
+	scanner := bufio.NewScanner(f)
+	for scanner.Scan() {
+		fields := strings.Fields(scanner.Text())
+		if len(fields) >= 2 && fields[0] == "MemTotal:" {
+			kb, err := strconv.ParseInt(fields[1], 10, 64)
+			if err == nil {
+				return kb * 1024
+			}
+		}
+	}
+	return 0
+}
@@ -0,0 +1,87 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"log"
+	"sync"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// registration with the controller. the controller removes workers that stop sending heartbeats
+// (and requeues their tests), so they're sent from their own goroutine, independent of the slots.
+// a worker the controller doesn't know (anymore) just does the handshake again with the same id
+const defaultHeartbeatInterval = 10 * time.Second // controllers that don't send one in the handshake
+
+type session struct {
+	client   pb.TestExecutorClient
+	workerID string
+	capacity capacity
+	wrapper  string // wrapperVersion of insider_py_wrapper, empty if it couldn't be read
+
+	controllerWait time.Duration // how long calls are retried while the controller can't be reached
+
+	mu       sync.Mutex
+	interval time.Duration // from the handshake response
+}
+
+func (s *session) handshake() error {
+	// timeout for context, no problems so far
+	ctx, cancel := context.WithTimeout(context.Background(), time.Second*5)
+	defer cancel()
+
+	req := &pb.HandshakeRequest{
+		Message:        s.workerID,
+		CpuMillis:      s.capacity.cpuMillis,
+		MemoryBytes:    s.capacity.memoryBytes,
+		Slots:          int32(s.capacity.slots),
+		WrapperVersion: s.wrapper,
+	}
+	resp, err := s.client.StartHandshake(ctx, req)
+	if err != nil {
+		return err
+	}
+
+	interval := time.Duration(resp.GetHeartbeatIntervalMs()) * time.Millisecond
+	if interval <= 0 {
+		interval = defaultHeartbeatInterval
+	}
+	s.mu.Lock()
+	s.interval = interval
+	s.mu.Unlock()
+	fmt.Printf("handshake successful: %s (heartbeat every %s)\n", resp.GetResponse(), interval)
+	return nil
+}
+
+func (s *session) heartbeatInterval() time.Duration {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	return s.interval
+}
+
+// sends heartbeats until stop is closed
+func (s *session) heartbeat(stop <-chan struct{}) {
+	for {
+		select {
+		case <-stop:
+			return
+		case <-time.After(s.heartbeatInterval()):
+		}
+
+		ctx, cancel := context.WithTimeout(context.Background(), s.heartbeatInterval())
+		resp, err := s.client.Heartbeat(ctx, &pb.HeartbeatRequest{WorkerId: s.workerID})
+		cancel()
+		if err != nil {
+			log.Printf("failed to send heartbeat: %v", err)
+			continue
+		}
+		if resp.GetUnknownWorker() {
+			log.Printf("controller removed this worker, doing the handshake again")
+			if err := s.handshake(); err != nil {
+				log.Printf("failed to redo handshake: %v", err)
+			}
+		}
+	}
+}
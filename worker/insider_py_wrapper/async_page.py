@@ -0,0 +1,371 @@
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from urllib.parse import urlsplit
+import asyncio
+import json
+import time
+
+from insider_py_wrapper import tracing
+from insider_py_wrapper.generic_page import Actions, _traced, _js_locator, _SELECT2_READY_JS
+from insider_py_wrapper.locators import record_lookup
+
+
+## asyncio version of GenericPage. Every webdriver call of GenericPage blocks the interpreter until chromedriver
+## answers, so a test can't wait for two things at once and a process drives one page at a time.
+## AsyncGenericPage talks W3C webdriver to chromedriver itself over asyncio streams (AsyncWebDriver below), so
+## independent waits and actions overlap with asyncio.gather and one process can drive several sessions
+## without threads:
+##
+##   @test_case("Test: careers filters")
+##   async def test_filters():
+##       async with AsyncWebDriver.attach(driver) as session:
+##           page = await AsyncGenericPage.open(session, url)
+##           banner_closed, select2_ready = await asyncio.gather(
+##               page.decline_cookies(cookie_reject_xpath, 10),
+##               page.wait_for_select2_ready(10, "#filter-by-location", "location filter"))
+##
+## async def tests are run with asyncio.run by run_test. The sessions still come from the driver pool,
+## AsyncWebDriver.attach takes over a pool session (the selenium driver shouldn't be used meanwhile),
+## leaving the async with closes its connections to chromedriver (the chrome session stays in the pool).
+## Waits poll with the same backoff as GenericPage (50ms doubling up to 500ms), errors are the selenium ones
+
+# W3C web element reference
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class AsyncElement:
+    def __init__(self, driver, id_):
+        self._driver = driver
+        self.id = id_
+
+    async def is_displayed(self):
+        return await self._driver.command("GET", f"/element/{self.id}/displayed")
+
+    async def is_enabled(self):
+        return await self._driver.command("GET", f"/element/{self.id}/enabled")
+
+    async def get_attribute(self, name):
+        return await self._driver.command("GET", f"/element/{self.id}/attribute/{name}")
+
+    async def text(self):
+        return await self._driver.command("GET", f"/element/{self.id}/text")
+
+
+# W3C webdriver client on asyncio streams, keep-alive connections to chromedriver (max_connections of them,
+# commands of concurrent calls don't queue up behind each other)
+class AsyncWebDriver:
+    def __init__(self, executor_url, session_id, max_connections=8):
+        url = urlsplit(executor_url)
+        self._host = url.hostname
+        self._port = url.port or 80
+        self._prefix = url.path.rstrip("/")
+        self.session_id = session_id
+        self.max_connections = max_connections
+        self._loop = None  # connections belong to the event loop they were opened on
+        self._idle = []
+        self._slots = None
+
+    # the chromedriver session behind a selenium driver, e.g. one from driver_pool.get_driver()
+    @classmethod
+    def attach(cls, driver, max_connections=8):
+        executor_url = getattr(getattr(driver, "command_executor", None), "_url", None)
+        if not executor_url or not driver.session_id:
+            raise TypeError(f"AsyncWebDriver needs a chromedriver session, got {type(driver).__name__}")
+        return cls(executor_url, driver.session_id, max_connections)
+
+    async def get(self, url):
+        await self.command("POST", "/url", {"url": url})
+
+    async def current_url(self):
+        return await self.command("GET", "/url")
+
+    async def find_elements(self, by_method, locator_value):
+        kind, value = _js_locator(by_method, locator_value)
+        found = await self.command("POST", "/elements", {"using": "xpath" if kind == "xpath" else "css selector", "value": value})
+        return [AsyncElement(self, element[ELEMENT_KEY]) for element in found]
+
+    async def execute_script(self, script, *args):
+        return self._elements(await self.command("POST", "/execute/sync", {"script": script, "args": self._references(list(args))}))
+
+    async def perform_actions(self, actions):
+        await self.command("POST", "/actions", {"actions": self._references(actions)})
+
+    # a session command, returns its value or raises the selenium exception for the W3C error
+    async def command(self, method, path, body=None):
+        status, data = await self._request(method, f"{self._prefix}/session/{self.session_id}{path}", body)
+        if status >= 400:
+            ErrorHandler().check_response({"status": status, "value": data})
+        return json.loads(data).get("value") if data else None
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in idle), return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _references(self, value):
+        if isinstance(value, AsyncElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, list):
+            return [self._references(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._references(v) for k, v in value.items()}
+        return value
+
+    def _elements(self, value):
+        if isinstance(value, list):
+            return [self._elements(v) for v in value]
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncElement(self, value[ELEMENT_KEY])
+            return {k: self._elements(v) for k, v in value.items()}
+        return value
+
+    async def _request(self, method, path, body):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:  # asyncio.run per test, the old loop's connections are gone
+            self._loop, self._idle, self._slots = loop, [], asyncio.Semaphore(self.max_connections)
+        payload = json.dumps(body).encode() if body is not None else b""
+        request = (f"{method} {path} HTTP/1.1\r\nHost: {self._host}:{self._port}\r\n"
+                   f"Content-Type: application/json;charset=UTF-8\r\nContent-Length: {len(payload)}\r\n"
+                   f"Connection: keep-alive\r\n\r\n").encode() + payload
+        async with self._slots:
+            while True:
+                reader, writer, reused = await self._connect()
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status, keep_alive, data = await _read_response(reader)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # the keep-alive connection broke under the request, it may have reached chromedriver anyway.
+                    # only GETs are sent again, a click, keys or a script must not run twice
+                    if not reused or method != "GET":
+                        raise
+                except BaseException:
+                    writer.close()
+                    raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+        return status, data.decode("utf-8")
+
+    # an idle connection chromedriver hasn't closed yet (it closes them after a while), otherwise a new one
+    async def _connect(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+        return reader, writer, False
+
+
+async def _read_response(reader):
+    status = int((await reader.readuntil(b"\r\n")).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        data = await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        data = b""
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            data += chunk[:-2]
+    else:
+        return status, False, await reader.read()  # body ends with the connection
+    return status, headers.get("connection", "").lower() != "close", data
+
+
+# polls condition() (a coroutine function) until it returns something truthy, returns that or None on timeout
+async def _poll(condition, timeout, interval=0.05, max_interval=0.5):
+    with tracing.span(getattr(condition, "__name__", "poll"), "wait"):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = await condition()
+                if value:
+                    return value
+            except Exception:
+                pass  # page is navigating / element went stale, just poll again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+
+class AsyncGenericPage:
+    def __init__(self, driver, url):
+        self.driver = driver
+        self.url = url
+        self._element_cache = {}
+
+    # page = await AsyncGenericPage.open(driver, url), __init__ can't wait for the navigation
+    @classmethod
+    async def open(cls, driver, url):
+        page = cls(driver, url)
+        with tracing.span("get", "wait", url):
+            await driver.get(url)
+        return page
+
+    def clear_element_cache(self):
+        self._element_cache.clear()
+
+    @_traced
+    async def is_page_loaded(self, timeout, by_method, locator_value):
+        try:
+            async def presence_of_element_located():
+                return await self.driver.find_elements(by_method, locator_value)
+
+            if await _poll(presence_of_element_located, timeout):
+                return True
+            print(f"Error: Timeout. Page did not load within {timeout} seconds")
+            return False
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return False
+
+    @_traced
+    async def decline_cookies(self, cookie_reject_all_xpath, timeout):
+        async def element_to_be_clickable():
+            elements = await self.driver.find_elements(By.XPATH, cookie_reject_all_xpath)
+            if elements and await elements[0].is_displayed() and await elements[0].is_enabled():
+                return elements[0]
+
+        try:
+            cookie_reject_btn = await _poll(element_to_be_clickable, timeout)
+            if cookie_reject_btn is None:
+                print(f"Error: Timeout. Can't close cookie banner, it may block some elements")
+                return False
+            with tracing.span("click", "action"):
+                await self.driver.execute_script("arguments[0].scrollIntoView(true);", cookie_reject_btn)
+                await self.driver.command("POST", f"/element/{cookie_reject_btn.id}/click", {})
+            print(f"Success: Cookie banner closed now")
+            return True
+        except Exception as e:
+            print(f"Error: Can't close cookie banner: {str(e)}")
+            return False
+
+    @_traced
+    async def perform_action_on_visible_element(self, timeout, by_method, locator_value, action: Actions, element_name: str):
+        element, visible = await self.is_element_visible(timeout, by_method, locator_value, element_name)
+        if visible:
+            return await self.perform_action(element, action, element_name)
+        print(f"Error: Element '{element_name}' is not visible or interactable for action '{action}'")
+        return False
+
+    @_traced
+    async def is_element_visible(self, timeout, by_method, locator_value, element_name: str):
+        try:
+            element = await self._find_element(timeout, by_method, locator_value)
+            try:
+                with tracing.span("is_displayed", "action"):
+                    displayed = element is not None and await element.is_displayed()
+            except (StaleElementReferenceException, NoSuchElementException):
+                # cached from an older page load, look it up again
+                self._element_cache.pop((by_method, locator_value), None)
+                element = await self._find_element(timeout, by_method, locator_value)
+                with tracing.span("is_displayed", "action"):
+                    displayed = element is not None and await element.is_displayed()
+            with tracing.span("is_enabled", "action"):
+                enabled = displayed and await element.is_enabled()
+            if element and displayed and enabled:
+                print(f"Success: Element '{element_name}' is visible and enabled", flush=True)
+                return element, True
+            print(f"Error: Element '{element_name}' is not reachable or interactable", flush=True)
+            if element and not displayed:
+                print(f"Element '{element_name}' is not displayed")
+            if element and displayed and not enabled:
+                print(f"Element '{element_name}' is displayed but not enabled")
+            return None, False
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return None, False
+
+    # same offsets as GenericPage's ActionChains, from the element's center
+    @_traced
+    async def perform_action(self, element, action: Actions, element_name: str):
+        try:
+            if action == Actions.CLICK:
+                with tracing.span("click", "action"):
+                    await self.driver.perform_actions(_pointer(element, 10, 10, click=True))
+                print(f"Success: Clicked element '{element_name}'")
+            elif action == Actions.HOVER:
+                with tracing.span("hover", "action"):
+                    await self.driver.perform_actions(_pointer(element, 20, 20, click=False))
+                print(f"Success: Hovered over element '{element_name}'")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to perform '{action}' on element '{element_name}': {str(e)}", flush=True)
+            return False
+
+    # cached per page load like GenericPage._find_element, only real lookups are timed for the locator stats
+    async def _find_element(self, timeout, by_method, locator_value):
+        cached = self._element_cache.get((by_method, locator_value))
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+
+        async def presence_of_element_located():
+            return await self.driver.find_elements(by_method, locator_value)
+
+        elements = await _poll(presence_of_element_located, timeout)
+        record_lookup(by_method, locator_value, time.perf_counter() - start)
+        if not elements:
+            print(f"Error: Timeout. Element '{locator_value}' not found using locator '{by_method}' within {timeout} seconds", flush=True)
+            return None
+        self._element_cache[(by_method, locator_value)] = elements[0]
+        return elements[0]
+
+    @_traced
+    async def get_all_elements(self, by_method, locator_value, element_name: str):
+        try:
+            start = time.perf_counter()
+            with tracing.span("find_elements", "action"):
+                elements = await self.driver.find_elements(by_method, locator_value)
+            record_lookup(by_method, locator_value, time.perf_counter() - start)
+            if len(elements) > 0:
+                print(f"Success: Found {len(elements)} elements matching '{element_name}'")
+            else:
+                print(f"Error: No elements found matching '{element_name}'")
+            return elements
+        except Exception as e:
+            print(f"Error: Unable to find elements matching '{element_name}': {str(e)}")
+            return []
+
+    @_traced
+    async def wait_for_select2_ready(self, timeout, select_css, element_name: str):
+        async def select2_ready():
+            return await self.driver.execute_script(_SELECT2_READY_JS, select_css)
+
+        if await _poll(select2_ready, timeout):
+            print(f"Success: select2 dropdown '{element_name}' is ready", flush=True)
+            return True
+        print(f"Error: Timeout. select2 dropdown '{element_name}' wasn't ready within {timeout} seconds", flush=True)
+        return False
+
+
+# W3C pointer actions: move to the element (offset from its center), press and release for a click
+def _pointer(element, x, y, click):
+    actions = [{"type": "pointerMove", "duration": 250, "origin": element, "x": x, "y": y}]
+    if click:
+        actions += [{"type": "pointerDown", "button": 0}, {"type": "pointerUp", "button": 0}]
+    return [{"type": "pointer", "id": "mouse", "parameters": {"pointerType": "mouse"}, "actions": actions}]
@@ -1,15 +1,159 @@
 from colorama import init, Fore, Style
+from contextlib import contextmanager
+import asyncio
+import inspect
+import json
+import os
+import time
+
+from insider_py_wrapper import tracing
 
 init(autoreset=True)
 
+# results of the run_test calls in this process, in the order they ran
+results = []
+
+# steps of the test that is currently running, filled by step()
+_current_steps = None
+
+# where finished results go besides stdout, the resident runner sets this to stream them to the worker
+result_sink = None
+
+# called with the description when a test starts, the runner uses it to tag the test's output lines
+start_sink = None
+
+# tests registered with @test_case in the current test file, in declaration order
+registered_tests = []
+
+# test function names the controller wants from this file, None runs all of them.
+# the runner sets this before loading the file
+selected_tests = None
+
+# step timings inside a test, e.g. with step("apply filters"): ...
+# only recorded while run_test is running a test, otherwise it just runs the block
+@contextmanager
+def step(name):
+    start = time.perf_counter()
+    try:
+        with tracing.span(name, "step"):
+            yield
+    finally:
+        if _current_steps is not None:
+            _current_steps.append({"name": name, "duration_ms": int((time.perf_counter() - start) * 1000)})
+
 def run_test(description, test_function):
+    global _current_steps
+    result = {"name": description, "status": "passed", "duration_ms": 0, "failure_message": "", "steps": [],
+              "wait_ms": 0, "action_ms": 0}
+    _current_steps = result["steps"]
+    if start_sink is not None:
+        start_sink(description)
+    tracing.begin_test(description)
+    start = time.perf_counter()
     try:
         print(Fore.CYAN + f"--- Starting: {description} ---")
-        test_function()  # do the test
+        with tracing.span(description, "test"):
+            if inspect.iscoroutinefunction(test_function):
+                asyncio.run(test_function())  # async def tests driving AsyncGenericPage pages
+            else:
+                test_function()  # do the test
         print(Fore.GREEN + f"--- {description}: Passed ---")
     except AssertionError as e:
+        result["status"] = "failed"
+        result["failure_message"] = str(e)
         print(Fore.RED + f"--- {description}: Failed - {str(e)} ---")
     except Exception as e:
+        result["status"] = "error"
+        result["failure_message"] = f"{type(e).__name__}: {str(e)}"
         print(Fore.RED + f"--- {description}: Encountered an Error - {str(e)} ---")
     finally:
-        print(Fore.CYAN + f"--- Moving to the next test ---\n") # unless it's the last test, I can add that case later on 
\ No newline at end of file
+        result["duration_ms"] = int((time.perf_counter() - start) * 1000)
+        # time spent waiting on the site vs in webdriver commands, the rest is the test's own code
+        result["wait_ms"], result["action_ms"] = tracing.end_test()
+        _current_steps = None
+        results.append(result)
+        _write_result(result)
+        print(Fore.CYAN + f"--- Moving to the next test ---\n") # unless it's the last test, I can add that case later on
+    return result
+
+# registers a test so the controller can find it and schedule it on its own:
+#
+#   @test_case("Test: navigate to careers", depends_on=["test_decline_cookies"])
+#   def test_navigate_to_careers(): ...
+#
+# controller reads these decorators without running python (discovery.go), so keep their arguments
+# plain string literals. depends_on names tests from the same file that have to run first on the
+# same page; connected tests are always sent to the same worker together
+def test_case(description, depends_on=()):
+    def register(test_function):
+        registered_tests.append({"id": test_function.__name__, "description": description,
+                                 "function": test_function, "depends_on": list(depends_on)})
+        return test_function
+    return register
+
+# runs the registered tests of the file (only the selected ones when the controller split the file),
+# dependencies first. a test whose dependency didn't pass is skipped, it would fail anyway.
+# a selected test that isn't registered fails the file, the controller split it on a test that isn't there
+def run_tests():
+    tests = {t["id"]: t for t in registered_tests}
+    selected = set(tests) if selected_tests is None else set(selected_tests)
+    statuses = {}
+
+    missing = sorted(selected - set(tests))
+    if missing:
+        registered_tests.clear()
+        raise ValueError(f"selected test(s) {', '.join(missing)} not registered with @test_case in this file")
+
+    for test in _dependency_order(registered_tests):
+        if test["id"] not in selected:
+            continue
+        failed_deps = [d for d in test["depends_on"] if d in tests and statuses.get(d) != "passed"]
+        if failed_deps:
+            result = _skip_test(test["description"], f"dependency {', '.join(failed_deps)} didn't pass")
+        else:
+            result = run_test(test["description"], test["function"])
+        statuses[test["id"]] = result["status"]
+
+    registered_tests.clear()
+    return statuses
+
+# declaration order, but a test never runs before the tests it depends on
+def _dependency_order(tests):
+    by_id = {t["id"]: t for t in tests}
+    ordered, seen = [], set()
+
+    def visit(test, path):
+        if test["id"] in seen:
+            return
+        if test["id"] in path:
+            raise ValueError(f"circular test dependency: {' -> '.join(path + [test['id']])}")
+        for dep in test["depends_on"]:
+            if dep in by_id:
+                visit(by_id[dep], path + [test["id"]])
+        seen.add(test["id"])
+        ordered.append(test)
+
+    for test in tests:
+        visit(test, [])
+    return ordered
+
+def _skip_test(description, reason):
+    if start_sink is not None:
+        start_sink(description)
+    print(Fore.YELLOW + f"--- {description}: Skipped - {reason} ---\n")
+    result = {"name": description, "status": "skipped", "duration_ms": 0, "failure_message": reason, "steps": []}
+    results.append(result)
+    _write_result(result)
+    return result
+
+# results go to the runner's sink if there's one, otherwise to TEST_RESULTS_FILE (one json per line)
+# if that's set, e.g. when running a test file directly with python
+def _write_result(result):
+    if result_sink is not None:
+        result_sink(result)
+        return
+    path = os.environ.get("TEST_RESULTS_FILE")
+    if not path:
+        return
+    with open(path, "a") as f:
+        f.write(json.dumps(result) + "\n")
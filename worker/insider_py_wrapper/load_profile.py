@@ -0,0 +1,68 @@
+import os
+
+
+## Load profiles, what chrome loads for the tests. The assertions only look at the DOM, images, fonts, video
+## and third party tags are just latency, bandwidth and chrome memory on every navigation.
+## INSIDER_LOAD_PROFILE picks one for the process, the driver pool applies it to every session it launches:
+##   full   everything, driver.get waits for the load event (default, the old behaviour)
+##   light  images, media, fonts and analytics/ad/chat tags are blocked, driver.get returns at DOMContentLoaded (eager)
+##   fast   same blocking, driver.get returns right away (none). the tests' is_page_loaded/wait_for_* checks
+##          do the waiting, so a page has to start with one of them
+## INSIDER_BLOCKED_URLS adds comma separated url patterns (Network.setBlockedURLs, * is a wildcard) to any profile.
+## blocking is done with devtools on the session's first tab, tabs opened later (verify_urls_in_tabs) load everything
+
+MEDIA_EXTENSIONS = ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico",
+                    "mp4", "webm", "mov", "mp3", "woff", "woff2", "ttf", "otf", "eot"]
+
+# with and without a query string, the CDN urls carry one (?ver=, ?w=...). not "*.png*", that would also
+# block e.g. app.icons.js
+MEDIA_PATTERNS = [f"*.{ext}" for ext in MEDIA_EXTENSIONS] + [f"*.{ext}?*" for ext in MEDIA_EXTENSIONS]
+
+# analytics, ads, chat widgets and video embeds that useinsider.com pulls in, nothing the tests assert on
+THIRD_PARTY_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*connect.facebook*", "*linkedin.com/px*", "*snap.licdn.com*",
+    "*hotjar.com*", "*clarity.ms*", "*bing.com/bat*", "*hs-scripts.com*", "*hs-analytics.net*",
+    "*hubspot.com*", "*intercom.io*", "*drift.com*", "*youtube.com*", "*ytimg.com*", "*vimeo.com*",
+    "*twitter.com/i/adsct*", "*ads-twitter.com*", "*tiktok.com*",
+]
+
+PROFILES = {
+    "full": {"page_load_strategy": "normal", "blocked_urls": [], "images": True},
+    "light": {"page_load_strategy": "eager", "blocked_urls": MEDIA_PATTERNS + THIRD_PARTY_PATTERNS, "images": False},
+    "fast": {"page_load_strategy": "none", "blocked_urls": MEDIA_PATTERNS + THIRD_PARTY_PATTERNS, "images": False},
+}
+
+
+# the profile picked with the env vars, unknown names fail the session launch instead of silently loading everything
+def current():
+    name = os.environ.get("INSIDER_LOAD_PROFILE", "full").strip() or "full"
+    if name not in PROFILES:
+        raise ValueError(f"unknown INSIDER_LOAD_PROFILE '{name}', known: {', '.join(PROFILES)}")
+    profile = dict(PROFILES[name], name=name)
+    extra = [p.strip() for p in os.environ.get("INSIDER_BLOCKED_URLS", "").split(",") if p.strip()]
+    profile["blocked_urls"] = profile["blocked_urls"] + extra
+    return profile
+
+
+# chrome options of a new session, the page load strategy can't be changed once the session is running
+def configure_options(options, profile=None):
+    profile = profile or current()
+    options.page_load_strategy = profile["page_load_strategy"]
+    if not profile["images"]:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    return options
+
+
+# url blocking on a launched session, kept for its lifetime (the pool's reset doesn't touch it)
+def apply(driver, profile=None):
+    profile = profile or current()
+    if not profile["blocked_urls"]:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile["blocked_urls"]})
+
+
+def describe(profile=None):
+    profile = profile or current()
+    return f"{profile['name']} (page load strategy {profile['page_load_strategy']}, {len(profile['blocked_urls'])} url patterns blocked)"
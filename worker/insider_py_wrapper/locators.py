@@ -0,0 +1,158 @@
+import os
+
+import yaml
+from selenium.webdriver.common.by import By
+
+
+## Locator registry, locators live in yaml files next to the tests (tests/locators/*.yaml) instead of module globals.
+## a file is loaded, validated and compiled into (By, value) tuples once per process (runner keeps it
+## between test files) and only read again if it changed on disk.
+##
+## file format, one section per page, every locator is a single "kind: value" pair:
+##   careers_page:
+##     see_all_teams_btn:
+##       xpath: '//*[@id="career-find-our-calling"]/div/div/a'
+##     life_section:
+##       css: "[aria-label^='life-at-insider']"
+##
+## usage in tests:
+##   locators = load_locators("locators/insider.yaml", relative_to=__file__)
+##   careers = locators.page("careers_page")
+##   page.perform_action_on_visible_element(3, *careers.see_all_teams_btn, Actions.CLICK, "See all teams")
+
+LOCATOR_KINDS = {
+    "xpath": By.XPATH,
+    "css": By.CSS_SELECTOR,
+    "id": By.ID,
+    "name": By.NAME,
+    "class_name": By.CLASS_NAME,
+    "tag_name": By.TAG_NAME,
+    "link_text": By.LINK_TEXT,
+    "partial_link_text": By.PARTIAL_LINK_TEXT,
+}
+
+
+class LocatorError(ValueError):
+    pass
+
+
+# (By, value) tuple that also knows its "page.name", so it can be unpacked into any GenericPage call
+# (.value for the functions that only take the xpath/css string)
+class Locator(tuple):
+    def __new__(cls, by_method, locator_value, name):
+        locator = super().__new__(cls, (by_method, locator_value))
+        locator.name = name
+        return locator
+
+    @property
+    def by(self):
+        return self[0]
+
+    @property
+    def value(self):
+        return self[1]
+
+
+# locators of one page, attribute access: careers.see_all_teams_btn
+class PageLocators:
+    def __init__(self, name, locators):
+        self._name = name
+        self._locators = locators
+
+    def __getattr__(self, name):
+        try:
+            return self._locators[name]
+        except KeyError:
+            raise LocatorError(f"no locator '{name}' on page '{self._name}', known: {', '.join(sorted(self._locators))}") from None
+
+    def __iter__(self):
+        return iter(self._locators.items())
+
+
+class LocatorFile:
+    def __init__(self, path, pages):
+        self.path = path
+        self.pages = pages
+
+    def page(self, name):
+        try:
+            return self.pages[name]
+        except KeyError:
+            raise LocatorError(f"no page '{name}' in {self.path}, known: {', '.join(sorted(self.pages))}") from None
+
+
+# absolute path -> (mtime, LocatorFile), shared by every test the process runs
+_registry = {}
+
+
+# loads (or returns the already compiled) locator file, relative paths are resolved against
+# the folder of relative_to (pass __file__ of the test)
+def load_locators(path, relative_to=None):
+    if relative_to and not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(relative_to)), path)
+    path = os.path.abspath(path)
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError as e:
+        raise LocatorError(f"can't read locator file {path}: {e}") from None
+    cached = _registry.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path) as f:
+        try:
+            data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise LocatorError(f"invalid yaml in {path}: {e}") from None
+
+    locator_file = LocatorFile(path, _compile(path, data))
+    _registry[path] = (mtime, locator_file)
+    print(f"Success: Loaded {sum(len(p._locators) for p in locator_file.pages.values())} locators from {os.path.basename(path)}")
+    return locator_file
+
+
+# validates the whole file up front so a typo fails the test at import, not halfway through it
+def _compile(path, data):
+    if not isinstance(data, dict):
+        raise LocatorError(f"{path}: top level has to be a mapping of page names")
+    pages = {}
+    for page_name, entries in data.items():
+        if not isinstance(entries, dict):
+            raise LocatorError(f"{path}: page '{page_name}' has to be a mapping of locator names")
+        locators = {}
+        for name, spec in entries.items():
+            full_name = f"{page_name}.{name}"
+            if not isinstance(spec, dict) or len(spec) != 1:
+                raise LocatorError(f"{path}: locator '{full_name}' has to be a single 'kind: value' pair ({', '.join(LOCATOR_KINDS)})")
+            kind, value = next(iter(spec.items()))
+            if kind not in LOCATOR_KINDS:
+                raise LocatorError(f"{path}: locator '{full_name}' has unknown kind '{kind}' ({', '.join(LOCATOR_KINDS)})")
+            if not isinstance(value, str) or not value.strip():
+                raise LocatorError(f"{path}: locator '{full_name}' has an empty value")
+            locators[name] = Locator(LOCATOR_KINDS[kind], value, full_name)
+            _names[(LOCATOR_KINDS[kind], value)] = full_name
+        pages[page_name] = PageLocators(page_name, locators)
+    return pages
+
+
+##### lookup stats, GenericPage records how long every real element lookup took (cache hits aren't lookups)
+##### so slow locators show up in one place. runner prints and resets them after every test file
+
+lookup_stats = {}  # (By, value) -> {"name", "count", "total", "max"}
+_names = {}  # (By, value) -> "page.name" of every compiled locator, tests unpack them into plain values
+
+
+def record_lookup(by_method, locator_value, seconds):
+    key = (by_method, locator_value)
+    stats = lookup_stats.get(key)
+    if stats is None:
+        name = _names.get(key, f"{by_method}={locator_value}")
+        stats = lookup_stats[key] = {"name": name, "count": 0, "total": 0.0, "max": 0.0}
+    stats["count"] += 1
+    stats["total"] += seconds
+    stats["max"] = max(stats["max"], seconds)
+
+
+def slowest_lookups(limit=5):
+    return sorted(lookup_stats.values(), key=lambda s: s["total"], reverse=True)[:limit]
@@ -0,0 +1,130 @@
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+
+# heavy imports are done once here, test files get them from the module cache
+import selenium.webdriver  # noqa: F401
+from insider_py_wrapper import helpers
+from insider_py_wrapper import generic_page  # noqa: F401
+from insider_py_wrapper import locators
+from insider_py_wrapper import tracing
+from insider_py_wrapper.driver_pool import get_pool
+
+
+## Resident test runner, worker starts it once and sends test files to it instead of
+## starting a fresh interpreter (and re-importing selenium) for every task.
+##
+## requests come in on stdin, one json per line: {"task_id": "...", "filename": "test_x.py", "tests": [...]}
+## (tests are the @test_case function names to run, empty/missing runs the whole file)
+## results go out on the fd in RUNNER_RESULT_FD, one json per line:
+##   {"type": "ready"}                                  runner is up, chrome is warming
+##   {"type": "case", "task_id": ..., "result": {...}}  a run_test call finished (same dict as helpers.run_test)
+##   {"type": "done", "task_id": ..., "error": "...", "duration_ms": ..., "trace": {...}}  test file is finished,
+##                                                     trace is the chrome trace of its tests (tracing.py)
+## test output keeps going to stdout/stderr, worker logs those and streams them to the controller.
+## marker lines ("\x1finsider:task=<id>", "\x1finsider:test=<description>") go to both of them so the worker
+## can tag every line with the task/test it belongs to
+
+def main():
+    out = os.fdopen(int(os.environ.get("RUNNER_RESULT_FD", "3")), "w", buffering=1)
+
+    def send(message):
+        out.write(json.dumps(message) + "\n")
+        out.flush()
+
+    # starts warming chrome while we wait for the first task. a bad pool setup (e.g. an unknown
+    # INSIDER_LOAD_PROFILE) fails the runner right here instead of every test
+    try:
+        get_pool()
+    except ValueError as e:
+        print(f"Error: Can't start the test runner: {str(e)}", file=sys.stderr, flush=True)
+        sys.exit(1)
+    send({"type": "ready"})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        task_id = request["task_id"]
+        helpers.result_sink = lambda result: send({"type": "case", "task_id": task_id, "result": result})
+        helpers.start_sink = lambda description: mark("test", description)
+        mark("task", task_id)
+
+        helpers.selected_tests = request.get("tests") or None
+
+        start = time.perf_counter()
+        error = run_file(request["filename"])
+        helpers.result_sink = None
+        helpers.start_sink = None
+        helpers.selected_tests = None
+        helpers.registered_tests.clear()
+        helpers.results.clear()
+
+        print_lookup_stats(request["filename"])
+
+        leaked = get_pool().reclaim()
+        if leaked:
+            print(f"Error: {request['filename']} didn't release {leaked} driver(s), reclaimed them", flush=True)
+
+        trace = tracing.export()
+        tracing.reset()
+
+        mark("task", "")
+        send({"type": "done", "task_id": task_id, "error": error, "duration_ms": int((time.perf_counter() - start) * 1000),
+              "trace": trace})
+
+
+# output marker for the worker, see the top of the file
+def mark(kind, value):
+    value = value.replace("\n", " ")
+    for stream in (sys.stdout, sys.stderr):
+        stream.write(f"\x1finsider:{kind}={value}\n")
+        stream.flush()
+
+
+# slowest element lookups of the file, compiled locator files stay loaded for the next one
+def print_lookup_stats(filename):
+    slowest = locators.slowest_lookups()
+    if slowest:
+        print(f"Slowest element lookups in {filename}:")
+        for stats in slowest:
+            print(f" - {stats['name']}: {stats['count']}x, {stats['total']:.2f}s total, {stats['max']:.2f}s max")
+    locators.lookup_stats.clear()
+
+
+run_count = 0
+
+# runs a test file as a brand new module (own globals, never cached in sys.modules),
+# returns the error text if the file itself blew up outside of run_test
+def run_file(filename):
+    global run_count
+    run_count += 1
+    path = os.path.abspath(filename)
+    spec = importlib.util.spec_from_file_location(f"insider_test_{run_count}", path)
+    module = importlib.util.module_from_spec(spec)
+
+    # test file's folder first on the path, like `python3 test_x.py` would do
+    test_dir = os.path.dirname(path)
+    sys.path.insert(0, test_dir)
+    try:
+        spec.loader.exec_module(module)
+        return ""
+    except BaseException as e:
+        if isinstance(e, KeyboardInterrupt):
+            raise
+        if isinstance(e, SystemExit) and e.code in (None, 0):
+            return ""
+        traceback.print_exc()
+        return f"{type(e).__name__}: {str(e)}"
+    finally:
+        sys.path.remove(test_dir)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    main()
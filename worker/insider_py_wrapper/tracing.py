@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+import atexit
+import contextvars
+import json
+import os
+import time
+
+
+## Timing of GenericPage calls, collected per test and exported as a chrome trace-event json
+## (open it in chrome://tracing or https://ui.perfetto.dev).
+##
+## span categories:
+##   test       a run_test call, every test gets its own row (tid) in the trace
+##   step       with step("name"): ... blocks inside a test
+##   call       a GenericPage method, tagged with its element_name
+##   wait       time spent waiting on the site: WebDriverWait, condition polling, page loads
+##   action     webdriver commands that don't wait: clicks, hovers, scripts, find_elements...
+## wait and action time is summed per test (wait_ms/action_ms in the results), a call's own time
+## minus its waits and actions is our python overhead. spans of the same category that overlap
+## (asyncio.gather in AsyncGenericPage tests) count once, it's the time anything was waiting
+
+# trace is sent to the controller with the task result, this keeps it well under the grpc message limit
+MAX_EVENTS = 5000
+
+_origin = time.perf_counter()
+_events = []
+_dropped = 0
+_tid = 0
+_test = None
+_totals = {"wait": 0.0, "action": 0.0}
+_open = {"wait": [0, 0.0], "action": [0, 0.0]}  # category -> [open spans, since when one's been open]
+# element_name of the open spans, inner spans without one inherit it. per asyncio task, concurrent
+# AsyncGenericPage calls don't inherit each other's
+_elements = contextvars.ContextVar("tracing_elements", default=())
+
+
+def _us(t):
+    return int((t - _origin) * 1_000_000)
+
+
+def _add(event):
+    global _dropped
+    if len(_events) >= MAX_EVENTS:
+        _dropped += 1
+        return
+    _events.append(event)
+
+
+# times the block, element_name tags it (inherited from the enclosing span if not given)
+@contextmanager
+def span(name, category, element_name=None):
+    open_elements = _elements.get()
+    element_name = element_name or (open_elements[-1] if open_elements else None)
+    token = _elements.set(open_elements + (element_name,))
+    start = time.perf_counter()
+    if category in _open:
+        if _open[category][0] == 0:
+            _open[category][1] = start
+        _open[category][0] += 1
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _elements.reset(token)
+        if category in _open:
+            _open[category][0] -= 1
+            if _open[category][0] == 0:
+                _totals[category] += end - _open[category][1]
+        args = {}
+        if element_name:
+            args["element"] = str(element_name)
+        if _test:
+            args["test"] = _test
+        _add({"name": name, "cat": category, "ph": "X", "ts": _us(start), "dur": _us(end) - _us(start),
+              "pid": os.getpid(), "tid": _tid, "args": args})
+
+
+# called by run_test, a new row in the trace named after the test
+def begin_test(description):
+    global _tid, _test
+    _tid += 1
+    _test = description
+    _totals["wait"] = _totals["action"] = 0.0
+    _add({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": _tid, "args": {"name": description}})
+
+
+# wait and action time of the test that just finished, in ms
+def end_test():
+    global _test
+    _test = None
+    return int(_totals["wait"] * 1000), int(_totals["action"] * 1000)
+
+
+# the trace so far as a chrome trace-event object
+def export():
+    return {"traceEvents": list(_events), "displayTimeUnit": "ms", "otherData": {"dropped_events": _dropped}}
+
+
+# the runner resets it after every task, the trace goes out with the task's result
+def reset():
+    global _dropped, _tid, _test
+    _events.clear()
+    _dropped = _tid = 0
+    _test = None
+
+
+def write(path):
+    with open(path, "w") as f:
+        json.dump(export(), f)
+
+
+# running a test file directly: TRACE_FILE=trace.json python3 test_x.py
+if os.environ.get("TRACE_FILE"):
+    atexit.register(lambda: write(os.environ["TRACE_FILE"]))
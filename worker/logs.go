@@ -0,0 +1,123 @@
+package main
+
+import (
+	"context"
+	"log"
+	"sync/atomic"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// ships the runner's output to the controller over the StreamLogs rpc, so a run's logs are in one place
+// (controller writes them per task) instead of in N pod logs that are gone when the pod exits.
+// lines go into a bounded buffer, when it's full the pipe readers wait a bit (python blocks on its
+// stdout in the meantime) and then drop the line, dropped lines are counted and reported to the controller
+const (
+	logBufferSize    = 2000                   // lines buffered before readers have to wait
+	logBlockTimeout  = 100 * time.Millisecond // how long a reader waits for room before dropping the line
+	logBatchSize     = 200                    // lines per LogBatch
+	logFlushInterval = 500 * time.Millisecond // partial batches are sent after this
+)
+
+type logShipper struct {
+	client   pb.TestExecutorClient
+	workerID string
+	records  chan *pb.LogRecord
+	dropped  atomic.Int64 // since the last batch that made it to the controller
+	done     chan struct{}
+}
+
+func newLogShipper(client pb.TestExecutorClient, workerID string) *logShipper {
+	s := &logShipper{
+		client:   client,
+		workerID: workerID,
+		records:  make(chan *pb.LogRecord, logBufferSize),
+		done:     make(chan struct{}),
+	}
+	go s.run()
+	return s
+}
+
+// called by the pipe readers, nil shipper just means local logging only
+func (s *logShipper) add(taskID, test, stream, line string) {
+	if s == nil {
+		return
+	}
+	record := &pb.LogRecord{TimestampMs: time.Now().UnixMilli(), TaskId: taskID, Test: test, Stream: stream, Line: line}
+	select {
+	case s.records <- record:
+		return
+	default:
+	}
+	timer := time.NewTimer(logBlockTimeout)
+	defer timer.Stop()
+	select {
+	case s.records <- record:
+	case <-timer.C:
+		s.dropped.Add(1)
+	}
+}
+
+// sends what's left and closes the stream, pipe readers have to be done by now
+func (s *logShipper) close() {
+	close(s.records)
+	select {
+	case <-s.done:
+	case <-time.After(10 * time.Second):
+		log.Printf("timed out flushing logs to the controller")
+	}
+}
+
+func (s *logShipper) run() {
+	defer close(s.done)
+
+	var stream pb.TestExecutor_StreamLogsClient
+	batch := make([]*pb.LogRecord, 0, logBatchSize)
+	ticker := time.NewTicker(logFlushInterval)
+	defer ticker.Stop()
+
+	flush := func() {
+		dropped := s.dropped.Swap(0)
+		if len(batch) == 0 && dropped == 0 {
+			return
+		}
+		// stream is opened lazily and again after a failure, a batch that couldn't be sent is counted as dropped
+		var err error
+		if stream == nil {
+			stream, err = s.client.StreamLogs(context.Background())
+		}
+		if err == nil {
+			err = stream.Send(&pb.LogBatch{WorkerId: s.workerID, Records: batch, Dropped: dropped})
+		}
+		if err != nil {
+			log.Printf("failed to send %d log lines to the controller: %v", len(batch), err)
+			s.dropped.Add(dropped + int64(len(batch)))
+			stream = nil
+		}
+		batch = make([]*pb.LogRecord, 0, logBatchSize)
+	}
+
+	for {
+		select {
+		case record, ok := <-s.records:
+			if !ok {
+				flush()
+				if stream != nil {
+					if ack, err := stream.CloseAndRecv(); err != nil {
+						log.Printf("failed to close log stream: %v", err)
+					} else {
+						log.Printf("controller received %d log lines", ack.GetReceived())
+					}
+				}
+				return
+			}
+			batch = append(batch, record)
+			if len(batch) >= logBatchSize {
+				flush()
+			}
+		case <-ticker.C:
+			flush()
+		}
+	}
+}
@@ -0,0 +1,223 @@
+package main
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"io"
+	"log"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"sort"
+	"strings"
+	"sync"
+	"syscall"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+)
+
+// resident python runner (insider_py_wrapper/runner.py), started once per worker so selenium,
+// colorama and the wrapper are imported once and chrome stays warm between tasks.
+// tasks go in on its stdin, results come back on a separate pipe (fd 3) so they don't mix with the test output
+type pyRunner struct {
+	cmd         *exec.Cmd
+	stdin       io.WriteCloser
+	resultsPipe *os.File
+	results     *bufio.Scanner
+	logs        sync.WaitGroup // stdout/stderr readers
+}
+
+// a task that doesn't finish within TASK_TIMEOUT is killed with its runner and reported as failed, the controller
+// only stops renewing its lease after maxLeaseRenewal lease timeouts so this should stay under that
+const defaultTaskTimeout = 30 * time.Minute
+
+// message the runner writes to the results pipe
+type runnerMessage struct {
+	Type       string          `json:"type"` // ready, case or done
+	TaskID     string          `json:"task_id"`
+	Result     caseResult      `json:"result"`
+	Error      string          `json:"error"`
+	DurationMs int64           `json:"duration_ms"`
+	Trace      json.RawMessage `json:"trace"` // chrome trace of the task's tests, passed on as is
+}
+
+// json written by helpers.run_test
+type caseResult struct {
+	Name           string `json:"name"`
+	Status         string `json:"status"`
+	DurationMs     int64  `json:"duration_ms"`
+	FailureMessage string `json:"failure_message"`
+	WaitMs         int64  `json:"wait_ms"`
+	ActionMs       int64  `json:"action_ms"`
+	Steps          []struct {
+		Name       string `json:"name"`
+		DurationMs int64  `json:"duration_ms"`
+	} `json:"steps"`
+}
+
+func startRunner(logs *logShipper) (*pyRunner, error) {
+	resultsRead, resultsWrite, err := os.Pipe()
+	if err != nil {
+		return nil, fmt.Errorf("failed to create results pipe: %v", err)
+	}
+	defer resultsWrite.Close() // child has its own copy after Start
+
+	// env will come preloaded from the dockerfile, so we don't need to install anything
+	cmd := exec.Command("./insider_py_wrapper/env/bin/python3", "-m", "insider_py_wrapper.runner")
+	cmd.Env = append(os.Environ(), "RUNNER_RESULT_FD=3", "PYTHONUNBUFFERED=1")
+	cmd.ExtraFiles = []*os.File{resultsWrite} // becomes fd 3 in the child
+	// own process group, so a runner that timed out can be killed together with its chrome
+	cmd.SysProcAttr = &syscall.SysProcAttr{Setpgid: true}
+
+	// the read end is ours to close on every error before the runner owns it, the write end is closed by the defer
+	r := &pyRunner{cmd: cmd}
+	var stdoutPipe, stderrPipe io.ReadCloser
+	if r.stdin, err = cmd.StdinPipe(); err == nil {
+		// pipes for real time logging, otherwise it's buffering
+		if stdoutPipe, err = cmd.StdoutPipe(); err == nil {
+			stderrPipe, err = cmd.StderrPipe()
+		}
+	}
+	if err != nil {
+		resultsRead.Close()
+		closePipes(r.stdin, stdoutPipe, stderrPipe)
+		return nil, fmt.Errorf("failed to create python runner pipes: %v", err)
+	}
+
+	if err := cmd.Start(); err != nil {
+		resultsRead.Close() // Start closes the stdio pipes itself when it fails
+		return nil, fmt.Errorf("failed to start python runner: %v", err)
+	}
+
+	// goroutines for writing all the logs live, for the lifetime of the runner
+	r.logs.Add(2)
+	go func() { defer r.logs.Done(); readPipeOutput(stdoutPipe, "stdout", logs) }()
+	go func() { defer r.logs.Done(); readPipeOutput(stderrPipe, "stderr", logs) }()
+
+	r.resultsPipe = resultsRead
+	r.results = bufio.NewScanner(resultsRead)
+	r.results.Buffer(make([]byte, 64*1024), 4*1024*1024) // long failure messages, traces
+
+	msg, err := r.next()
+	if err != nil || msg.Type != "ready" {
+		r.stop()
+		return nil, fmt.Errorf("python runner didn't start: %v", err)
+	}
+	return r, nil
+}
+
+// stdio pipes made before the runner could start, nil ones weren't made
+func closePipes(pipes ...io.Closer) {
+	for _, p := range pipes {
+		if p != nil {
+			p.Close()
+		}
+	}
+}
+
+// runs one test file in the runner and collects the run_test results as they stream in
+// a hung test gets the runner killed after timeout, it has to be stopped and started again then
+func (r *pyRunner) run(taskID, filename string, tests []string, timeout time.Duration, result *pb.TaskResult) error {
+	req, _ := json.Marshal(map[string]any{"task_id": taskID, "filename": filename, "tests": tests})
+	if _, err := r.stdin.Write(append(req, '\n')); err != nil {
+		return fmt.Errorf("failed to send task to python runner: %v", err)
+	}
+
+	timer := time.AfterFunc(timeout, r.kill)
+	defer timer.Stop()
+	for {
+		msg, err := r.next()
+		if err != nil {
+			if !timer.Stop() {
+				return fmt.Errorf("task timed out after %s, python runner killed", timeout)
+			}
+			return err
+		}
+		if msg.TaskID != taskID {
+			continue
+		}
+		switch msg.Type {
+		case "case":
+			result.Cases = append(result.Cases, msg.Result.toProto())
+		case "done":
+			if !timer.Stop() {
+				return fmt.Errorf("task timed out after %s, python runner killed", timeout)
+			}
+			result.Trace = msg.Trace
+			if msg.Error != "" {
+				result.ExitCode = 1
+				result.Error = msg.Error
+			}
+			return nil
+		}
+	}
+}
+
+func (r *pyRunner) next() (*runnerMessage, error) {
+	if !r.results.Scan() {
+		if err := r.results.Err(); err != nil {
+			return nil, fmt.Errorf("failed to read from python runner: %v", err)
+		}
+		return nil, fmt.Errorf("python runner exited")
+	}
+	var msg runnerMessage
+	if err := json.Unmarshal(r.results.Bytes(), &msg); err != nil {
+		return nil, fmt.Errorf("malformed message from python runner: %v", err)
+	}
+	return &msg, nil
+}
+
+// kills the runner's whole process group, chrome and chromedriver included, the results pipe closes with it
+func (r *pyRunner) kill() {
+	if err := syscall.Kill(-r.cmd.Process.Pid, syscall.SIGKILL); err != nil {
+		log.Printf("failed to kill python runner: %v", err)
+	}
+}
+
+// closing stdin ends the runner's loop, it quits the chrome sessions on the way out
+func (r *pyRunner) stop() int {
+	r.stdin.Close()
+	r.logs.Wait() // pipes have to be drained before Wait
+	r.cmd.Wait()
+	r.resultsPipe.Close()
+	return r.cmd.ProcessState.ExitCode()
+}
+
+func (c caseResult) toProto() *pb.TestCaseResult {
+	tc := &pb.TestCaseResult{
+		Name:           c.Name,
+		Status:         c.Status,
+		DurationMs:     c.DurationMs,
+		FailureMessage: c.FailureMessage,
+		WaitMs:         c.WaitMs,
+		ActionMs:       c.ActionMs,
+	}
+	for _, st := range c.Steps {
+		tc.Steps = append(tc.Steps, &pb.StepTiming{Name: st.Name, DurationMs: st.DurationMs})
+	}
+	return tc
+}
+
+// hash of the wrapper the tests run on (its modules and the pinned requirements, not the venv), sent at the
+// handshake. incremental runs only skip a test that passed before on the same wrapper version
+func wrapperVersion(dir string) (string, error) {
+	entries, err := os.ReadDir(dir)
+	if err != nil {
+		return "", fmt.Errorf("failed to read %s: %v", dir, err)
+	}
+	var files []*pb.BundleFile
+	for _, e := range entries {
+		if e.IsDir() || !(strings.HasSuffix(e.Name(), ".py") || e.Name() == "requirements.txt") {
+			continue
+		}
+		content, err := os.ReadFile(filepath.Join(dir, e.Name()))
+		if err != nil {
+			return "", err
+		}
+		files = append(files, &pb.BundleFile{Path: e.Name(), Content: content})
+	}
+	sort.Slice(files, func(i, j int) bool { return files[i].Path < files[j].Path })
+	return bundleHash(files)[:16], nil
+}
@@ -0,0 +1,124 @@
+package main
+
+import (
+	"context"
+	"fmt"
+	"io"
+	"log"
+	"time"
+
+	pb "insider-test-executor/testexecutor-grpc"
+
+	"google.golang.org/grpc/codes"
+	"google.golang.org/grpc/status"
+)
+
+// where a slot gets its tasks from. every slot keeps a SubscribeTasks stream open and the controller sends
+// the next task as soon as the slot reported the previous one, an idle slot just blocks on the stream.
+// controllers without the stream are polled with ReceiveTask like before.
+// a controller that isn't up yet (or restarts) isn't fatal, calls are retried with backoff for CONTROLLER_WAIT
+const (
+	defaultControllerWait = 5 * time.Minute
+	maxRetryBackoff       = 15 * time.Second
+)
+
+type taskSource struct {
+	slot    int
+	sess    *session
+	stream  pb.TestExecutor_SubscribeTasksClient
+	cancel  context.CancelFunc // ends the stream
+	polling bool               // controller doesn't have SubscribeTasks
+}
+
+// blocks until there's a task for the slot or the queue is drained
+func (t *taskSource) next() (*pb.TaskResponse, error) {
+	var resp *pb.TaskResponse
+	err := t.sess.retry(fmt.Sprintf("slot %d: receiving a task", t.slot), func() error {
+		var err error
+		resp, err = t.receive()
+		// controller removed the worker (missed heartbeats) or restarted, register again and carry on
+		if status.Code(err) == codes.NotFound {
+			log.Printf("slot %d: controller doesn't know this worker, doing the handshake again", t.slot)
+			if err := t.sess.handshake(); err != nil {
+				return err
+			}
+			resp, err = t.receive()
+		}
+		return err
+	})
+	return resp, err
+}
+
+func (t *taskSource) receive() (*pb.TaskResponse, error) {
+	if t.polling {
+		return t.poll()
+	}
+	if t.stream == nil {
+		ctx, cancel := context.WithCancel(context.Background())
+		stream, err := t.sess.client.SubscribeTasks(ctx, &pb.TaskRequest{WorkerId: t.sess.workerID})
+		if err != nil {
+			cancel()
+			return nil, err
+		}
+		t.stream, t.cancel = stream, cancel
+	}
+
+	resp, err := t.stream.Recv()
+	if err == nil {
+		return resp, nil
+	}
+	t.close() // opened again on the next call
+	if status.Code(err) == codes.Unimplemented {
+		fmt.Printf("slot %d: controller has no task stream, polling for tasks instead\n", t.slot)
+		t.polling = true
+		return t.poll()
+	}
+	if err == io.EOF {
+		err = fmt.Errorf("task stream ended before the queue was drained")
+	}
+	return nil, err
+}
+
+// the old way, asking again after retry_after_ms while there's nothing to do
+func (t *taskSource) poll() (*pb.TaskResponse, error) {
+	for {
+		ctx, cancel := context.WithTimeout(context.Background(), time.Minute*5)
+		resp, err := t.sess.client.ReceiveTask(ctx, &pb.TaskRequest{WorkerId: t.sess.workerID})
+		cancel()
+		if err != nil || resp.GetDrained() || resp.GetTaskId() != "" {
+			return resp, err
+		}
+		// nothing to do yet, other workers still hold the remaining tests
+		fmt.Printf("slot %d: %s, asking again in %dms\n", t.slot, resp.GetMessage(), resp.GetRetryAfterMs())
+		time.Sleep(time.Duration(resp.GetRetryAfterMs()) * time.Millisecond)
+	}
+}
+
+func (t *taskSource) close() {
+	if t.cancel != nil {
+		t.cancel()
+	}
+	t.stream, t.cancel = nil, nil
+}
+
+// calls fn until it succeeds, backing off from 1s to maxRetryBackoff. gives up once it's been failing
+// for controllerWait, e.g. the controller never came up or is gone for good
+func (s *session) retry(what string, fn func() error) error {
+	backoff := time.Second
+	var failingSince time.Time
+	for {
+		err := fn()
+		if err == nil {
+			return nil
+		}
+		if failingSince.IsZero() {
+			failingSince = time.Now()
+		}
+		if time.Since(failingSince) > s.controllerWait {
+			return fmt.Errorf("giving up after %s: %v", s.controllerWait, err)
+		}
+		log.Printf("%s failed, retrying in %s: %v", what, backoff, err)
+		time.Sleep(backoff)
+		backoff = min(backoff*2, maxRetryBackoff)
+	}
+}
@@ -7,7 +7,9 @@ import (
 	"io"
 	"log"
 	"os"
-	"os/exec"
+	"path/filepath"
+	"strings"
+	"sync"
 	"time"
 
 	pb "insider-test-executor/testexecutor-grpc"
@@ -42,70 +44,209 @@ func main() {
 
 	client := pb.NewTestExecutorClient(conn)
 
-	// timeout for context, no problems so far
-	ctx, cancel := context.WithTimeout(context.Background(), time.Second*5)
-	defer cancel()
+	// cpu, memory and how many tests this worker runs at the same time, the controller schedules against the slots
+	capacity, err := detectCapacity()
+	if err != nil {
+		log.Fatalf("failed to detect worker capacity: %v", err)
+	}
+	fmt.Printf("worker capacity: %d slots, %dm cpu, %dMi memory\n", capacity.slots, capacity.cpuMillis, capacity.memoryBytes/(1024*1024))
+
+	// the controller may not be up yet (the worker job can start first), calls to it are retried this long
+	controllerWait := defaultControllerWait
+	if v := os.Getenv("CONTROLLER_WAIT"); v != "" {
+		controllerWait, err = time.ParseDuration(v)
+		if err == nil && controllerWait <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid CONTROLLER_WAIT '%s': %v", v, err)
+		}
+	}
 
-	req := &pb.HandshakeRequest{Message: worker_id}
-	// here the worker inits the handshake, so they can just do the test and exit. no state or for loop unless
-	// there's a controller
-	resp, err := client.StartHandshake(ctx, req)
+	// a test running longer than this is killed (with its runner and chrome) and reported as failed
+	taskTimeout := defaultTaskTimeout
+	if v := os.Getenv("TASK_TIMEOUT"); v != "" {
+		taskTimeout, err = time.ParseDuration(v)
+		if err == nil && taskTimeout <= 0 {
+			err = fmt.Errorf("must be positive")
+		}
+		if err != nil {
+			log.Fatalf("invalid TASK_TIMEOUT '%s': %v", v, err)
+		}
+	}
+
+	// tells the controller which wrapper the tests run on, without it the worker's tests are never skipped as unchanged
+	wrapper, err := wrapperVersion("insider_py_wrapper")
 	if err != nil {
+		log.Printf("can't hash the python wrapper, incremental runs won't skip tests on this worker: %v", err)
+	} else {
+		fmt.Printf("python wrapper version: %s\n", wrapper)
+	}
+
+	// here the worker inits the handshake, after that it pulls tasks until the controller runs out of them
+	sess := &session{client: client, workerID: worker_id, capacity: capacity, wrapper: wrapper, controllerWait: controllerWait}
+	if err := sess.retry("handshake", sess.handshake); err != nil {
 		log.Fatalf("failed to start handshake: %v", err)
 	}
-	fmt.Printf("handshake successful: %s\n", resp.GetResponse())
+
+	// heartbeats keep the worker registered while the slots are busy with long tests
+	stopHeartbeat := make(chan struct{})
+	defer close(stopHeartbeat)
+	go sess.heartbeat(stopHeartbeat)
+
+	// persistent mode (default) keeps asking for tasks until the controller says the queue is drained,
+	// oneshot mode is the old behaviour: one task (per slot) and exit
+	persistent := os.Getenv("WORKER_MODE") != "oneshot"
+
+	// bundles (test + support files) are cached by hash between tasks, shared by the slots
+	bundles := newBundleStore(client)
+
+	// runner output goes to the controller too, closed after the runners so their last lines make it
+	logs := newLogShipper(client, worker_id)
+	defer logs.close()
+
+	// every slot pulls and runs tasks on its own, with its own python runner (and chrome)
+	var slots sync.WaitGroup
+	for slot := 1; slot <= capacity.slots; slot++ {
+		slots.Add(1)
+		go func(slot int) {
+			defer slots.Done()
+			runSlot(slot, sess, persistent, taskTimeout, logs, bundles)
+		}(slot)
+	}
+	slots.Wait()
+}
+
+// one slot's task loop, ends when the queue is drained (or after one task in oneshot mode)
+func runSlot(slot int, sess *session, persistent bool, taskTimeout time.Duration, logs *logShipper, bundles *bundleStore) {
+	// python runner is started once and reused for every task, chrome warms up while we wait for the first one
+	runner, err := startRunner(logs)
+	if err != nil {
+		log.Printf("slot %d: failed to start test runner, will retry with the first task: %v", slot, err)
+	}
+	defer func() {
+		if runner != nil {
+			runner.stop()
+		}
+	}()
 
 	// when handshake is done, start waiting for the test task from controller
+	tasks := &taskSource{slot: slot, sess: sess}
+	defer tasks.close()
 	for {
-		fileCtx, fileCancel := context.WithTimeout(context.Background(), time.Minute*5) // can make this less but 1 was not enough
-		defer fileCancel()
-
-		// server sends the test py via ReceiveTask
-		taskResp, err := client.ReceiveTask(fileCtx, &pb.Empty{})
+		taskResp, err := tasks.next()
 		if err != nil {
-			log.Printf("failed to receive task: %v", err)
-			break // let controller know it failed to receive the file
+			log.Printf("slot %d: failed to receive task: %v", slot, err)
+			break
 		}
 
-		// take the file, write it into the same dir
-		err = os.WriteFile(taskResp.Filename, taskResp.Content, 0644)
-		if err != nil {
-			log.Fatalf("failed to write task file: %v", err)
+		if taskResp.GetDrained() {
+			fmt.Printf("slot %d: controller has no more tasks, shutting down\n", slot)
+			break
 		}
-		fmt.Printf("received and saved task file: %s\n", taskResp.Filename)
 
-		// env will come preloaded from the dockerfile, so we don't need to install anything (maybe tests are on local network and pods will be blocked from internet access)
-		// just activate the python env for dependencies
-		cmd := exec.Command("./insider_py_wrapper/env/bin/python3", taskResp.Filename)
-		cmd.Env = os.Environ() // i'm not %100 sure if this is required
+		result := runTask(&runner, taskTimeout, logs, bundles, taskResp)
+		result.WorkerId = sess.workerID
 
-		// pipes for real time logging, otherwise it's buffering
-		stdoutPipe, _ := cmd.StdoutPipe()
-		stderrPipe, _ := cmd.StderrPipe()
+		// let the controller know how the task went, it keeps track of the finished tests
+		reportCtx, reportCancel := context.WithTimeout(context.Background(), time.Second*10)
+		_, err = sess.client.ReportResult(reportCtx, result)
+		reportCancel()
+		if err != nil {
+			log.Printf("slot %d: failed to report result for %s: %v", slot, taskResp.Filename, err)
+		}
 
-		if err := cmd.Start(); err != nil {
-			log.Fatalf("failed to start test script: %v", err)
+		if !persistent {
+			break // job done/shut the container down
 		}
+	}
+}
 
-		// goroutines for writing all the logs live
-		go readPipeOutput(stdoutPipe, "stdout")
-		go readPipeOutput(stderrPipe, "stderr")
+// takes the task's bundle from the cache and runs the test in the resident python runner, a failing test
+// doesn't kill the worker, it's reported back to the controller instead.
+// runner is restarted if it died (or was killed after taskTimeout), so one broken task doesn't take the worker down
+func runTask(runner **pyRunner, taskTimeout time.Duration, logs *logShipper, bundles *bundleStore, taskResp *pb.TaskResponse) *pb.TaskResult {
+	result := &pb.TaskResult{
+		Filename: taskResp.Filename,
+		TaskId:   taskResp.TaskId,
+		LeaseId:  taskResp.LeaseId,
+	}
+	start := time.Now()
+	defer func() { result.DurationMs = time.Since(start).Milliseconds() }()
 
-		// wait for the command to complete
-		if err := cmd.Wait(); err != nil {
-			log.Fatalf("python test script execution failed: %v", err)
+	// test file and its support files come from the local bundle cache, downloaded only if the hash is new
+	bundleDir, err := bundles.get(taskResp.GetBundleHash())
+	if err != nil {
+		log.Printf("failed to get test bundle: %v", err)
+		result.ExitCode = -1
+		result.Error = err.Error()
+		return result
+	}
+	testFile := filepath.Join(bundleDir, taskResp.Filename)
+	fmt.Printf("running %s from bundle %s\n", taskResp.Filename, filepath.Base(bundleDir))
+
+	if *runner == nil {
+		if *runner, err = startRunner(logs); err != nil {
+			log.Printf("failed to start test runner: %v", err)
+			result.ExitCode = -1
+			result.Error = err.Error()
+			return result
 		}
+	}
 
-		break // job done/shut the container down,
-		// we can keep it alive too, but deciding this via kube seems better
+	if err := (*runner).run(taskResp.TaskId, testFile, taskResp.Tests, taskTimeout, result); err != nil {
+		log.Printf("python test runner failed: %v", err)
+		result.ExitCode = int32((*runner).stop())
+		result.Error = err.Error()
+		*runner = nil // start a fresh one for the next task
+		return result
+	}
+	if result.Error != "" {
+		log.Printf("python test script execution failed: %s", result.Error)
+		return result
 	}
+
+	// tests were asked for but none of them reported, e.g. the file doesn't call run_tests
+	if len(taskResp.Tests) > 0 && len(result.Cases) == 0 {
+		result.Error = fmt.Sprintf("none of the tests %s reported a result", strings.Join(taskResp.Tests, ", "))
+		log.Printf("python test script execution failed: %s", result.Error)
+		return result
+	}
+
+	// run_test catches the failures, so a clean run doesn't mean the tests passed
+	result.Passed = true
+	for _, c := range result.Cases {
+		if c.Status != "passed" {
+			result.Passed = false
+		}
+	}
+	return result
 }
 
+// runner.py writes these marker lines to stdout and stderr when a task/test starts (and an empty task when
+// it's done), so every line can be tagged in order without sharing state between the two readers
+const outputMarker = "\x1finsider:"
+
 // helper function to read and log the logs from python runtime, calling it with goroutines
-func readPipeOutput(pipe io.ReadCloser, pipeName string) {
+// lines are also sent to the controller tagged with the task/test they came from
+func readPipeOutput(pipe io.ReadCloser, pipeName string, logs *logShipper) {
+	var taskID, test string
 	scanner := bufio.NewScanner(pipe)
 	for scanner.Scan() {
-		log.Printf("[%s] %s\n", pipeName, scanner.Text())
+		line := scanner.Text()
+		// not a prefix check, colorama may have put a reset code in front of it
+		if i := strings.Index(line, outputMarker); i >= 0 {
+			kind, value, _ := strings.Cut(line[i+len(outputMarker):], "=")
+			switch kind {
+			case "task":
+				taskID, test = value, ""
+			case "test":
+				test = value
+			}
+			continue
+		}
+		log.Printf("[%s] %s\n", pipeName, line)
+		logs.add(taskID, test, pipeName, line)
 	}
 	if err := scanner.Err(); err != nil {
 		log.Printf("error reading from %s: %v", pipeName, err)